@@ -0,0 +1 @@
+"""Benchmarks running the assistant against a synthetic desktop."""
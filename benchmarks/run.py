@@ -0,0 +1,237 @@
+"""End-to-end benchmark of ``DesktopAssistant`` on a synthetic desktop.
+
+Usage::
+
+    python -m benchmarks.run [--resolutions 1280x720 1920x1080] [--scenarios mentes]
+                             [--repeat 3] [--model-latency-ms 0] [--output results.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from benchmarks.scenarios import SCENARIOS, Scenario
+from benchmarks.stub_model import StubModelProvider
+from benchmarks.synthetic_desktop import SyntheticDesktop
+from src.ai_handler import AIHandler
+from src.assistant import DesktopAssistant
+from src.computer_interface import ComputerInterface
+from src.input_backends import RecordingBackend
+from src.memory_handler import MemoryHandler
+from src.metrics_store import MetricsStore
+from src.program_catalog import ProgramCatalog
+
+DEFAULT_RESOLUTIONS = ["1280x720", "1920x1080", "2560x1440", "3840x2160"]
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+PHASES = ("capture", "encode", "prompt_build", "decision", "execute")
+
+
+class PhaseTimer:
+    """Accumulate wall-clock time per phase by wrapping instance methods."""
+
+    def __init__(self) -> None:
+        self._raw: dict[str, float] = {}
+
+    def wrap(self, target: object, name: str, key: str) -> None:
+        original: Callable = getattr(target, name)
+
+        def timed(*args: Any, **kwargs: Any):
+            started = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self._raw[key] = self._raw.get(key, 0.0) + time.perf_counter() - started
+
+        setattr(target, name, timed)
+
+    def finalize(self) -> dict[str, float]:
+        raw = self._raw
+        return {
+            "capture": raw.get("capture", 0.0),
+            "encode": raw.get("screen_state", 0.0) - raw.get("capture", 0.0),
+            "prompt_build": raw.get("ai_decision", 0.0) - raw.get("provider", 0.0),
+            "decision": raw.get("provider", 0.0),
+            "execute": raw.get("execute", 0.0),
+        }
+
+
+def parse_resolution(value: str) -> tuple[int, int]:
+    width, height = value.lower().split("x", 1)
+    return int(width), int(height)
+
+
+def run_once(
+    scenario: Scenario,
+    resolution: tuple[int, int],
+    model_latency: float,
+    measure_memory: bool = False,
+) -> dict[str, Any]:
+    """Run one scenario on a fresh desktop and return its measurements."""
+
+    desktop = SyntheticDesktop(resolution)
+    scenario.build(desktop)
+    backend = RecordingBackend(size=resolution, on_event=desktop.handle_event)
+    provider = StubModelProvider(desktop, scenario, latency=model_latency)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        catalog = ProgramCatalog(
+            temp_path / "programs.json",
+            temp_path / "program_index.json",
+            path_dirs=[],
+            desktop_dirs=[],
+            start_menu_dirs=[],
+        )
+        computer_interface = ComputerInterface(
+            input_backend=backend,
+            screen_grabber=desktop.grab,
+            program_catalog=catalog,
+        )
+        assistant = DesktopAssistant(
+            ai_handler=AIHandler(
+                provider=provider, metrics_store=MetricsStore(temp_path / "usage_metrics.jsonl")
+            ),
+            computer_interface=computer_interface,
+            memory_handler=MemoryHandler(temp_path / "gui_elements.json"),
+            listen_for_keyboard=False,
+        )
+
+        timer = PhaseTimer()
+        timer.wrap(computer_interface, "capture_screen", "capture")
+        timer.wrap(computer_interface, "get_screen_state", "screen_state")
+        timer.wrap(provider, "complete", "provider")
+        timer.wrap(assistant.ai_handler, "get_ai_decision", "ai_decision")
+        timer.wrap(assistant, "_handle_ai_action", "execute")
+
+        if measure_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        assistant.start_task(scenario.task)
+        wall_time = time.perf_counter() - started
+        peak_memory = 0
+        if measure_memory:
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    phases = timer.finalize()
+    iterations = provider.calls
+    return {
+        "success": desktop.goal_reached,
+        "wall_time": wall_time,
+        "iterations": iterations,
+        "phases": phases,
+        "bytes_per_step": statistics.mean(provider.request_bytes) if provider.request_bytes else 0,
+        "input_events": len(backend.events),
+        "missed_events": desktop.unhandled_events,
+        "peak_memory": peak_memory,
+    }
+
+
+def summarize(runs: list[dict[str, Any]]) -> dict[str, Any]:
+    """Aggregate repeated runs; times are reported in milliseconds."""
+
+    iterations = [run["iterations"] for run in runs]
+    total_steps = sum(iterations) or 1
+    return {
+        "runs": len(runs),
+        "success_rate": sum(run["success"] for run in runs) / len(runs),
+        "wall_time_ms": {
+            "median": statistics.median(run["wall_time"] for run in runs) * 1000,
+            "min": min(run["wall_time"] for run in runs) * 1000,
+        },
+        "iterations": statistics.median(iterations),
+        "phase_ms_per_step": {
+            phase: sum(run["phases"][phase] for run in runs) * 1000 / total_steps for phase in PHASES
+        },
+        "bytes_per_step": statistics.mean(run["bytes_per_step"] for run in runs),
+        "missed_events": sum(run["missed_events"] for run in runs),
+        # tracemalloc csak a Python-allokációkat látja, a Pillow képpuffereit nem.
+        "peak_traced_memory_bytes": max(run["peak_memory"] for run in runs),
+    }
+
+
+def _max_rss_kb() -> int | None:
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - Windows
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="DesktopAssistant benchmark szintetikus asztalon.")
+    parser.add_argument("--resolutions", nargs="+", default=DEFAULT_RESOLUTIONS)
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--model-latency-ms", type=float, default=0.0)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    results = []
+    for resolution_text in args.resolutions:
+        resolution = parse_resolution(resolution_text)
+        for scenario_name in args.scenarios:
+            scenario = SCENARIOS[scenario_name]
+            # Az első futás bemelegít (importok, gyorsítótárak), nem számoljuk.
+            run_once(scenario, resolution, args.model_latency_ms / 1000)
+            runs = [
+                run_once(scenario, resolution, args.model_latency_ms / 1000)
+                for _ in range(max(1, args.repeat))
+            ]
+            # A memóriamérés lassítja a futást, ezért külön menetben történik.
+            runs[0]["peak_memory"] = run_once(
+                scenario, resolution, args.model_latency_ms / 1000, measure_memory=True
+            )["peak_memory"]
+            summary = {"scenario": scenario_name, "resolution": resolution_text, **summarize(runs)}
+            results.append(summary)
+            print(
+                f"{scenario_name:>10} {resolution_text:>10}  "
+                f"{summary['wall_time_ms']['median']:8.1f} ms  "
+                f"{summary['iterations']:>4} lépés  "
+                f"{summary['bytes_per_step'] / 1024:8.1f} KiB/lépés  "
+                f"siker: {summary['success_rate']:.0%}"
+            )
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": _git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "model_latency_ms": args.model_latency_ms,
+        "max_rss_kb": _max_rss_kb(),
+        "results": results,
+    }
+    output = args.output or RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"Eredmények: {output}")
+    return 0 if all(result["success_rate"] == 1 for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
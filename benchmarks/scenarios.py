@@ -0,0 +1,149 @@
+"""Benchmark scenarios: a synthetic desktop layout plus the steps that solve it."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from benchmarks.synthetic_desktop import Element, SyntheticDesktop, Window
+
+Step = tuple[str, str]
+
+
+@dataclass
+class Scenario:
+    """A task, the desktop it runs on and the scripted steps of the stub model."""
+
+    name: str
+    task: str
+    build: Callable[[SyntheticDesktop], None]
+    steps: list[Step]
+
+
+def _build_save_dialog(desktop: SyntheticDesktop) -> None:
+    def confirm_save(target: SyntheticDesktop) -> None:
+        field = target.find("filename")
+        if field is not None and field.text:
+            target.goal_reached = True
+            target.close_window("save_dialog")
+
+    def open_save_dialog(target: SyntheticDesktop) -> None:
+        target.close_window("file_menu")
+        target.open_window(
+            Window(
+                "save_dialog",
+                "Mentés másként",
+                target.rect(0.3, 0.3, 0.4, 0.3),
+                [
+                    Element("filename", "Fájlnév", target.rect(0.33, 0.4, 0.34, 0.05), kind="field"),
+                    Element("save_ok", "Mentés", target.rect(0.55, 0.5, 0.1, 0.05), action=confirm_save),
+                    Element(
+                        "save_cancel",
+                        "Mégse",
+                        target.rect(0.42, 0.5, 0.1, 0.05),
+                        action=lambda t: t.close_window("save_dialog"),
+                    ),
+                ],
+                default_button="save_ok",
+            )
+        )
+
+    def open_file_menu(target: SyntheticDesktop) -> None:
+        target.open_window(
+            Window(
+                "file_menu",
+                "Fájl",
+                target.rect(0.05, 0.1, 0.15, 0.2),
+                [
+                    Element("menu_open", "Megnyitás", target.rect(0.06, 0.14, 0.13, 0.04)),
+                    Element("menu_save", "Mentés", target.rect(0.06, 0.19, 0.13, 0.04), action=open_save_dialog),
+                ],
+            )
+        )
+
+    desktop.open_window(
+        Window(
+            "editor",
+            "Jegyzettömb",
+            desktop.rect(0.02, 0.02, 0.96, 0.9),
+            [
+                Element("file_button", "Fájl", desktop.rect(0.03, 0.06, 0.06, 0.035), action=open_file_menu),
+                Element("editor_text", "", desktop.rect(0.03, 0.11, 0.94, 0.78), kind="field"),
+            ],
+        )
+    )
+
+
+def _build_exit_confirmation(desktop: SyntheticDesktop) -> None:
+    def confirm(target: SyntheticDesktop) -> None:
+        target.goal_reached = True
+        target.close_window("confirm")
+
+    desktop.open_window(
+        Window(
+            "confirm",
+            "Kilépés",
+            desktop.rect(0.35, 0.35, 0.3, 0.2),
+            [
+                Element("yes", "Igen", desktop.rect(0.4, 0.47, 0.08, 0.05), action=confirm),
+                Element("no", "Nem", desktop.rect(0.52, 0.47, 0.08, 0.05), action=lambda t: t.close_window("confirm")),
+            ],
+            default_button="yes",
+        )
+    )
+
+
+def _build_form(desktop: SyntheticDesktop) -> None:
+    def submit(target: SyntheticDesktop) -> None:
+        fields = [target.find("name"), target.find("email")]
+        if all(field is not None and field.text for field in fields):
+            target.goal_reached = True
+
+    desktop.open_window(
+        Window(
+            "form",
+            "Regisztráció",
+            desktop.rect(0.25, 0.15, 0.5, 0.6),
+            [
+                Element("name", "Név", desktop.rect(0.3, 0.25, 0.4, 0.05), kind="field"),
+                Element("email", "E-mail", desktop.rect(0.3, 0.35, 0.4, 0.05), kind="field"),
+                Element("submit", "Küldés", desktop.rect(0.55, 0.6, 0.12, 0.06), action=submit),
+            ],
+        )
+    )
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "mentes": Scenario(
+        "mentes",
+        "Mentsd el a jegyzetet jegyzet.txt néven.",
+        _build_save_dialog,
+        [
+            ("click", "file_button"),
+            ("click", "menu_save"),
+            ("click", "filename"),
+            ("type", "jegyzet.txt"),
+            ("keys", "enter"),
+            ("done", ""),
+        ],
+    ),
+    "kilepes": Scenario(
+        "kilepes",
+        "Erősítsd meg a kilépést.",
+        _build_exit_confirmation,
+        [("click", "yes"), ("done", "")],
+    ),
+    "urlap": Scenario(
+        "urlap",
+        "Töltsd ki a regisztrációs űrlapot és küldd el.",
+        _build_form,
+        [
+            ("click", "name"),
+            ("type", "Teszt Elek"),
+            ("click", "email"),
+            ("type", "teszt@example.com"),
+            ("click", "submit"),
+            ("done", ""),
+        ],
+    ),
+}
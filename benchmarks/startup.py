@@ -0,0 +1,233 @@
+"""Cold-start benchmark of the GUI: first interactive frame and first screenshot.
+
+Usage::
+
+    python -m benchmarks.startup [--repeat 5] [--synthetic] [--import-profile 15]
+                                 [--output startup.json]
+
+Every run starts a fresh interpreter, so imports are measured cold (apart
+from the OS file cache). Reported times are measured from process spawn:
+
+* ``first_frame``: the main window has painted its first frame and accepts input,
+* ``assistant_ready``: the worker thread has built the assistant,
+* ``first_screenshot``: the assistant's first screen capture has returned.
+
+A run is reported as an error if the deferred start-up work (hotkeys,
+worker thread) began before the first frame was painted.
+
+``--synthetic`` swaps the real screen, input and model for the synthetic
+desktop, so the benchmark runs without a display or API key (e.g. with
+``QT_QPA_PLATFORM=offscreen``). An extra run under ``python -X importtime``
+lists the slowest imports up to the first frame.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+MARKS = ("first_frame", "assistant_ready", "first_screenshot")
+TRACKED_MODULES = ("PySide6", "openai", "pyautogui", "pynput", "PIL", "dotenv", "src.assistant", "src.gui.main_window")
+CHILD_TIMEOUT_S = 60.0
+
+
+def _synthetic_assistant_factory():
+    from benchmarks.synthetic_desktop import SyntheticDesktop
+    from src.ai_handler import AIHandler
+    from src.assistant import DesktopAssistant
+    from src.computer_interface import ComputerInterface
+    from src.input_backends import RecordingBackend
+    from src.llm_providers import ScriptedProvider
+    from src.memory_handler import MemoryHandler
+    from src.metrics_store import MetricsStore
+    from src.program_catalog import ProgramCatalog
+
+    temp_path = Path(tempfile.mkdtemp(prefix="ordenador-startup-"))
+    desktop = SyntheticDesktop((1280, 720))
+    return DesktopAssistant(
+        ai_handler=AIHandler(
+            provider=ScriptedProvider(responses=[], latency=0, jitter=0),
+            metrics_store=MetricsStore(temp_path / "usage_metrics.jsonl"),
+        ),
+        computer_interface=ComputerInterface(
+            input_backend=RecordingBackend(size=desktop.size, on_event=desktop.handle_event),
+            screen_grabber=desktop.grab,
+            program_catalog=ProgramCatalog(
+                temp_path / "programs.json",
+                temp_path / "program_index.json",
+                path_dirs=[],
+                desktop_dirs=[],
+                start_menu_dirs=[],
+            ),
+        ),
+        memory_handler=MemoryHandler(temp_path / "gui_elements.json"),
+        listen_for_keyboard=False,
+    )
+
+
+def _child(synthetic: bool) -> int:
+    """Start the GUI the way ``main.py`` does and print the time stamps as JSON."""
+
+    from PySide6.QtCore import QCoreApplication, QEvent, QObject
+    from PySide6.QtWidgets import QApplication
+
+    from src.gui import MainWindow
+    from src.gui.overlay_proxy import overlay_proxy
+
+    app = QApplication(sys.argv[:1])
+    marks: dict[str, float] = {}
+    window = MainWindow(assistant_factory=_synthetic_assistant_factory if synthetic else None)
+
+    class PaintProbe(QObject):
+        def eventFilter(self, watched: QObject, event: QEvent) -> bool:  # noqa: N802 - Qt API naming convention
+            if event.type() == QEvent.Paint:
+                marks.setdefault("first_paint", time.time())
+            return False
+
+    probe = PaintProbe()
+    window.installEventFilter(probe)
+    finish_startup = window._finish_startup
+
+    def timed_finish_startup() -> None:
+        marks["deferred_startup"] = time.time()
+        finish_startup()
+
+    window._finish_startup = timed_finish_startup
+    _, presented = overlay_proxy.show_and_wait(lambda: window, show=MainWindow.show, timeout=CHILD_TIMEOUT_S)
+    marks["first_frame"] = time.time()
+
+    # A _finish_startup az első képkocka után indítja a munkaszálat és az előkészítést.
+    service = window._ensure_task_service()
+    deadline = time.perf_counter() + CHILD_TIMEOUT_S
+    while not service.assistant_ready and time.perf_counter() < deadline:
+        QCoreApplication.processEvents()
+        time.sleep(0.001)
+    error = None
+    if marks.get("deferred_startup", 0.0) < marks.get("first_paint", float("inf")):
+        error = "az indítási munka az első képkocka előtt (vagy egyáltalán nem) futott le"
+    elif service.assistant_ready:
+        marks["assistant_ready"] = time.time()
+        try:
+            service.assistant.computer_interface.capture_screen()
+            marks["first_screenshot"] = time.time()
+        except Exception as exc:  # noqa: BLE001 - az eredményben jelezzük
+            error = f"képernyőkép: {exc}"
+    else:
+        error = "az asszisztens nem készült el (részletek a stderr-en)"
+
+    window.close()
+    app.processEvents()
+    print(json.dumps({"marks": marks, "presented": presented, "error": error}))
+    return 0 if error is None else 1
+
+
+def run_once(synthetic: bool, env: dict[str, str]) -> dict[str, Any]:
+    command = [sys.executable, "-m", "benchmarks.startup", "--child"] + (["--synthetic"] if synthetic else [])
+    spawned = time.time()
+    completed = subprocess.run(command, capture_output=True, text=True, env=env, timeout=CHILD_TIMEOUT_S * 2)
+    lines = [line for line in completed.stdout.splitlines() if line.startswith("{")]
+    if not lines:
+        return {"error": completed.stderr.strip().splitlines()[-1:] or ["ismeretlen hiba"], "ms": {}}
+    data = json.loads(lines[-1])
+    data["ms"] = {name: (stamp - spawned) * 1000 for name, stamp in data.pop("marks").items()}
+    return data
+
+
+def import_profile(env: dict[str, str], top: int) -> dict[str, Any]:
+    """Import times (ms) of the GUI entry modules, from ``python -X importtime``."""
+
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "from src.gui import MainWindow; MainWindow"],
+        capture_output=True,
+        text=True,
+        env=env,
+        timeout=CHILD_TIMEOUT_S,
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000, len(name) - len(name.lstrip())))
+    top_level_total = sum(cumulative for _, _, cumulative, depth in rows if depth <= 1)
+    return {
+        "total_ms": top_level_total,
+        "slowest_self_ms": [
+            {"module": name, "self_ms": round(self_ms, 2), "cumulative_ms": round(cumulative, 2)}
+            for name, self_ms, cumulative, _ in sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+        ],
+        "tracked_cumulative_ms": {
+            name: round(cumulative, 2) for name, _, cumulative, _ in rows if name in TRACKED_MODULES
+        },
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Indítási idő mérése: első képkocka és első képernyőkép.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--synthetic", action="store_true", help="Szintetikus asztal és modell valódi helyett")
+    parser.add_argument("--import-profile", type=int, default=15, help="A leglassabb importok száma (0 = kihagyás)")
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        return _child(args.synthetic)
+
+    from benchmarks.run import RESULTS_DIR, _git_revision
+
+    root = Path(__file__).resolve().parent.parent
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(root), env.get("PYTHONPATH", "")]))
+
+    runs = [run_once(args.synthetic, env) for _ in range(max(1, args.repeat))]
+    errors = [run["error"] for run in runs if run.get("error")]
+    summary = {
+        mark: {
+            "median": statistics.median(values),
+            "min": min(values),
+        }
+        for mark in MARKS
+        if (values := [run["ms"][mark] for run in runs if mark in run["ms"]])
+    }
+    for mark, values in summary.items():
+        print(f"{mark:>18}  medián {values['median']:8.1f} ms   min {values['min']:8.1f} ms")
+    for error in sorted(set(map(str, errors))):
+        print(f"Hiba: {error}")
+
+    profile = import_profile(env, args.import_profile) if args.import_profile else None
+    if profile:
+        print(f"Importok az első képkockáig: {profile['total_ms']:.1f} ms")
+        for row in profile["slowest_self_ms"]:
+            print(f"  {row['self_ms']:8.2f} ms  {row['module']}")
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": _git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "synthetic": args.synthetic,
+        "runs": len(runs),
+        "startup_ms": summary,
+        "import_profile": profile,
+        "errors": errors,
+    }
+    output = args.output or RESULTS_DIR / f"startup-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"Eredmények: {output}")
+    return 0 if not errors else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
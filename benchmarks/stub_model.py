@@ -0,0 +1,88 @@
+"""Deterministic stand-in model that solves benchmark scenarios from the desktop state."""
+
+from __future__ import annotations
+
+import base64
+import io
+import json
+import time
+
+from PIL import Image
+
+from benchmarks.scenarios import Scenario
+from benchmarks.synthetic_desktop import SyntheticDesktop
+from src.llm_providers import LLMProvider, LLMResponse
+
+
+class StubModelProvider(LLMProvider):
+    """Answer each request with the next scripted step of the scenario.
+
+    Click coordinates are computed from the live desktop layout and mapped into
+    the coordinate system of the image actually sent, like a real model would.
+    """
+
+    name = "stub"
+
+    def __init__(self, desktop: SyntheticDesktop, scenario: Scenario, latency: float = 0.0) -> None:
+        self.desktop = desktop
+        self.scenario = scenario
+        self.latency = latency
+        self.calls = 0
+        self.request_bytes: list[int] = []
+        self.model_time = 0.0
+        self._step_index = 0
+
+    @staticmethod
+    def _image_size(messages: list[dict]) -> tuple[int, int] | None:
+        for message in messages:
+            content = message.get("content")
+            if not isinstance(content, list):
+                continue
+            for part in content:
+                url = part.get("image_url", {}).get("url", "") if isinstance(part, dict) else ""
+                if url.startswith("data:") and "," in url:
+                    data = base64.b64decode(url.split(",", 1)[1])
+                    with Image.open(io.BytesIO(data)) as image:
+                        return image.size
+        return None
+
+    def _decision(self, messages: list[dict]) -> dict:
+        if self._step_index >= len(self.scenario.steps):
+            return {"command": "feladat_befejezve", "arguments": {}}
+        kind, value = self.scenario.steps[self._step_index]
+        self._step_index += 1
+
+        if kind == "click":
+            element = self.desktop.find(value)
+            image_size = self._image_size(messages)
+            if element is None or image_size is None:
+                return {"command": "kerj_jobb_minosegu_kepet", "arguments": {"leiras": value}}
+            x, y = element.center
+            return {
+                "command": "kattints",
+                "arguments": {
+                    "x": round(x * image_size[0] / self.desktop.size[0]),
+                    "y": round(y * image_size[1] / self.desktop.size[1]),
+                    "leiras": element.label or element.id,
+                },
+            }
+        if kind == "type":
+            return {"command": "gepelj", "arguments": {"szoveg": value}}
+        if kind == "keys":
+            return {"command": "nyomj_billentyut", "arguments": {"billentyuk": value}}
+        return {"command": "feladat_befejezve", "arguments": {"uzenet": "Kész."}}
+
+    def complete(
+        self,
+        model: str,
+        messages: list[dict],
+        response_format: dict | None = None,
+    ) -> LLMResponse:
+        started = time.perf_counter()
+        self.calls += 1
+        self.request_bytes.append(len(json.dumps(messages, ensure_ascii=False).encode("utf-8")))
+        if self.latency > 0:
+            time.sleep(self.latency)
+        content = json.dumps(self._decision(messages), ensure_ascii=False)
+        self.model_time += time.perf_counter() - started
+        return LLMResponse(content=content, model=model)
@@ -0,0 +1,169 @@
+"""A rendered, scriptable fake desktop used by the benchmarks."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from PIL import Image, ImageDraw, ImageFont
+
+from src.input_backends import InputEvent
+
+Rect = tuple[int, int, int, int]
+
+
+@dataclass
+class Element:
+    """A clickable button or text field inside a window."""
+
+    id: str
+    label: str
+    rect: Rect
+    kind: str = "button"
+    action: Callable[[SyntheticDesktop], None] | None = None
+    text: str = ""
+
+    def contains(self, x: int, y: int) -> bool:
+        left, top, width, height = self.rect
+        return left <= x < left + width and top <= y < top + height
+
+    @property
+    def center(self) -> tuple[int, int]:
+        left, top, width, height = self.rect
+        return left + width // 2, top + height // 2
+
+
+@dataclass
+class Window:
+    """A top-level window or dialog; ``default_button`` reacts to Enter."""
+
+    id: str
+    title: str
+    rect: Rect
+    elements: list[Element] = field(default_factory=list)
+    default_button: str | None = None
+
+
+class SyntheticDesktop:
+    """Render windows and react to recorded input events like a real desktop would."""
+
+    def __init__(self, size: tuple[int, int]) -> None:
+        self.size = size
+        self.windows: list[Window] = []
+        self.focused: Element | None = None
+        self.goal_reached = False
+        self.unhandled_events = 0
+        self._frame: Image.Image | None = None
+        self._font = ImageFont.load_default()
+
+    # -- Állapot -------------------------------------------------------------
+
+    def scale(self, fx: float, fy: float) -> tuple[int, int]:
+        """Convert relative coordinates (0-1) into pixels of this resolution."""
+
+        return int(self.size[0] * fx), int(self.size[1] * fy)
+
+    def rect(self, fx: float, fy: float, fw: float, fh: float) -> Rect:
+        x, y = self.scale(fx, fy)
+        width, height = self.scale(fw, fh)
+        return x, y, max(1, width), max(1, height)
+
+    def open_window(self, window: Window) -> None:
+        self.windows.append(window)
+        self.invalidate()
+
+    def close_window(self, window_id: str) -> None:
+        self.windows = [window for window in self.windows if window.id != window_id]
+        if self.focused and self.find(self.focused.id) is None:
+            self.focused = None
+        self.invalidate()
+
+    def find(self, element_id: str) -> Element | None:
+        for window in reversed(self.windows):
+            for element in window.elements:
+                if element.id == element_id:
+                    return element
+        return None
+
+    def invalidate(self) -> None:
+        self._frame = None
+
+    # -- Bemenet -------------------------------------------------------------
+
+    def handle_event(self, event: InputEvent) -> None:
+        """Apply an event recorded by ``RecordingBackend`` to the desktop."""
+
+        if event.kind == "click":
+            self._click(event.payload["x"], event.payload["y"])
+        elif event.kind == "type" and self.focused is not None and self.focused.kind == "field":
+            self.focused.text += event.payload["text"]
+            self.invalidate()
+        elif event.kind == "keys" and event.payload["keys"] == ["enter"] and self.windows:
+            default_id = self.windows[-1].default_button
+            element = self.find(default_id) if default_id else None
+            if element is not None and element.action is not None:
+                element.action(self)
+                self.invalidate()
+            else:
+                self.unhandled_events += 1
+        else:
+            self.unhandled_events += 1
+
+    def _click(self, x: int, y: int) -> None:
+        if not self.windows:
+            self.unhandled_events += 1
+            return
+        # Csak a legfelső ablak fogad kattintást, mint egy modális párbeszédablaknál.
+        for element in self.windows[-1].elements:
+            if element.contains(x, y):
+                self.focused = element
+                if element.action is not None:
+                    element.action(self)
+                self.invalidate()
+                return
+        self.unhandled_events += 1
+
+    # -- Megjelenítés --------------------------------------------------------
+
+    def grab(self, region: Rect | None = None) -> Image.Image:
+        """Screen grabber compatible with ``ComputerInterface``."""
+
+        if self._frame is None:
+            self._frame = self._render()
+        frame = self._frame.copy()
+        if region is not None:
+            left, top, width, height = region
+            return frame.crop((left, top, left + width, top + height))
+        return frame
+
+    def _render(self) -> Image.Image:
+        image = Image.new("RGB", self.size, (38, 70, 110))
+        draw = ImageDraw.Draw(image)
+        title_height = max(18, self.size[1] // 40)
+
+        for window in self.windows:
+            left, top, width, height = window.rect
+            draw.rectangle((left, top, left + width, top + height), fill=(240, 240, 240), outline=(20, 20, 20))
+            draw.rectangle((left, top, left + width, top + title_height), fill=(0, 90, 170))
+            draw.text((left + 8, top + 4), window.title, fill="white", font=self._font)
+            for element in window.elements:
+                ex, ey, ew, eh = element.rect
+                # A fókuszált elem vastag fekete keretet kap, mint egy valódi asztalon.
+                focus = element is self.focused
+                if element.kind == "field":
+                    draw.rectangle(
+                        (ex, ey, ex + ew, ey + eh),
+                        fill="white",
+                        outline="black" if focus else (90, 90, 90),
+                        width=2 if focus else 1,
+                    )
+                    draw.text((ex + 4, ey + 4), element.text or element.label, fill="black", font=self._font)
+                else:
+                    draw.rectangle(
+                        (ex, ey, ex + ew, ey + eh),
+                        fill=(210, 210, 220),
+                        outline="black" if focus else (60, 60, 60),
+                        width=2 if focus else 1,
+                    )
+                    draw.text((ex + 6, ey + eh // 3), element.label, fill="black", font=self._font)
+        return image
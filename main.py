@@ -1,15 +1,24 @@
-"""Application entry point for the Ordenador assistant GUI."""
+"""Application entry point for the Ordenador assistant GUI.
 
-import sys
-
-from PySide6.QtWidgets import QApplication
+``python main.py --headless [tasks ...]`` runs tasks without the GUI, see
+``src/headless.py``.
+"""
 
-from src.gui import MainWindow
+import sys
 
 
 def main() -> None:
     """Start the Qt application and show the main window."""
 
+    if "--headless" in sys.argv[1:]:
+        from src.headless import main as headless_main
+
+        sys.exit(headless_main([arg for arg in sys.argv[1:] if arg != "--headless"]))
+
+    from PySide6.QtWidgets import QApplication
+
+    from src.gui import MainWindow
+
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
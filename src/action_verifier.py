@@ -0,0 +1,128 @@
+"""Local confirmation that a click or keystroke visibly changed the screen."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable, Sequence
+
+from PIL import Image, ImageDraw
+
+from src.config import (
+    ACTION_VERIFY_MAX_WAIT_MS,
+    ACTION_VERIFY_MIN_WAIT_MS,
+    ACTION_VERIFY_RADIUS,
+    WAIT_POLL_INTERVAL_MS,
+)
+from src.screen_watcher import Region, ScreenGrabber, ScreenWatcher, WaitResult
+
+# A várakozási idő a legutóbbi REACTION_HISTORY reakcióidő maximumának ennyiszerese.
+REACTION_HISTORY = 20
+REACTION_SAFETY_FACTOR = 3.0
+# Az összehasonlított képen ennyi szürkeárnyalat-eltérés egyetlen pontban már változásnak
+# számít: egy gomb lenyomása vagy néhány leütött karakter nem mozdítja meg az átlagot.
+PIXEL_CHANGE_LEVEL = 24.0
+# A művelet körüli kis terület szinte teljes felbontásban kerül összehasonlításra.
+SIGNATURE_WIDTH = 320
+
+Point = tuple[int, int]
+
+
+class ActionVerifier:
+    """Compare a small region around an action before and after it.
+
+    ``baseline`` is taken before the input is injected and ``confirm`` polls
+    the same region until it differs. The wait adapts to the machine: it is
+    a multiple of the slowest recently observed reaction, clamped between
+    ``min_wait`` and ``max_wait``, so a failed click is detected in a few
+    hundred milliseconds instead of one model round trip later.
+
+    ``ignore`` points (global coordinates) are painted over in every frame;
+    they cover the click indicator, which would otherwise count as a change.
+    """
+
+    def __init__(
+        self,
+        grab: ScreenGrabber,
+        screen_size: tuple[int, int] = (0, 0),
+        should_abort: Callable[[], bool] | None = None,
+        radius: int = ACTION_VERIFY_RADIUS,
+        min_wait: float = ACTION_VERIFY_MIN_WAIT_MS / 1000,
+        max_wait: float = ACTION_VERIFY_MAX_WAIT_MS / 1000,
+        ignore_radius: int = 0,
+    ) -> None:
+        self._grab = grab
+        self.screen_size = screen_size
+        self.should_abort = should_abort
+        self.radius = radius
+        self.min_wait = min_wait
+        self.max_wait = max(min_wait, max_wait)
+        self.ignore_radius = ignore_radius
+        self._reactions: deque[float] = deque(maxlen=REACTION_HISTORY)
+
+    @property
+    def timeout(self) -> float:
+        if not self._reactions:
+            return self.max_wait
+        return min(self.max_wait, max(self.min_wait, max(self._reactions) * REACTION_SAFETY_FACTOR))
+
+    def region_around(self, x: int, y: int, full_width: bool = False) -> Region:
+        """Square of ``radius`` around ``(x, y)``; ``full_width`` gives a band across the screen.
+
+        The band suits typing: text in a wide field starts at its left edge,
+        far from where the field was clicked.
+        """
+
+        width, height = self.screen_size
+        left, top = max(0, x - self.radius), max(0, y - self.radius)
+        right, bottom = x + self.radius, y + self.radius
+        if full_width and width > 0:
+            left, right = 0, width
+            top, bottom = max(0, y - self.radius // 2), y + self.radius // 2
+        if width > 0 and height > 0:
+            right, bottom = min(width, right), min(height, bottom)
+        return left, top, max(1, right - left), max(1, bottom - top)
+
+    def _frame(self, region: Region | None, ignore: Sequence[Point]) -> Image.Image:
+        frame = self._grab(region)
+        if not ignore or self.ignore_radius <= 0:
+            return frame
+        offset_x, offset_y = (region[0], region[1]) if region is not None else (0, 0)
+        frame = frame.convert("RGB") if frame.mode not in ("RGB", "RGBA") else frame.copy()
+        draw = ImageDraw.Draw(frame)
+        for x, y in ignore:
+            cx, cy = x - offset_x, y - offset_y
+            draw.rectangle(
+                (cx - self.ignore_radius, cy - self.ignore_radius, cx + self.ignore_radius, cy + self.ignore_radius),
+                fill=(128, 128, 128),
+            )
+        return frame
+
+    def baseline(self, region: Region | None, ignore: Sequence[Point] = ()) -> Image.Image:
+        return ScreenWatcher.signature(self._frame(region, ignore), SIGNATURE_WIDTH)
+
+    def confirm(
+        self,
+        region: Region | None,
+        baseline: Image.Image,
+        ignore: Sequence[Point] = (),
+        timeout: float | None = None,
+        already_waited: float = 0.0,
+    ) -> WaitResult:
+        """Wait (adaptively, or for ``timeout``) until the region differs from ``baseline``.
+
+        ``already_waited`` is added to the learned reaction time, so a reaction
+        caught in a later grace period still lengthens the adaptive wait.
+        """
+
+        watcher = ScreenWatcher(
+            lambda area: self._frame(area, ignore),
+            poll_interval=WAIT_POLL_INTERVAL_MS / 1000,
+            change_threshold=PIXEL_CHANGE_LEVEL,
+            should_abort=self.should_abort,
+            signature_width=SIGNATURE_WIDTH,
+        )
+        wait = self.timeout if timeout is None else timeout
+        result = watcher.wait_for_change(region, wait, baseline=baseline, peak=True)
+        if result.satisfied:
+            self._reactions.append(already_waited + result.elapsed)
+        return result
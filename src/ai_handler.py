@@ -1,23 +1,77 @@
-# src/ai_handler.py
-import json
-from openai import OpenAI
-from src.config import OPENAI_API_KEY, DEBUG_MODE
-
-class AIHandler:
-    def __init__(self):
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
-        self.system_prompt = """
+# src/ai_handler.py
+import textwrap
+import time
+from src.config import DEBUG_MODE
+from src.decision_schema import ValidationResult, parse_json_text, schema_summary, validate_decision_text
+from src.llm_providers import LLMProvider, LLMResponse, create_provider
+from src.metrics_store import CallRecord, MetricsStore, TaskBudget, TaskUsage
+from src.model_router import ModelRoute, ModelRouter, StepSignals
+from src.resilience import ApiError, ResilientCaller, TokenBucket, shared_rate_limiter
+from src.screen_watcher import available_templates
+from src.tracing import tracer
+from src.shortcuts import format_shortcut_table
+
+def _template_note(names: list[str]) -> str:
+    """Tell the model which template images the 'minta' wait condition can use."""
+
+    if not names:
+        return "Nincs elérhető mintakép, ezért a 'varj' parancs 'minta' feltételét ne használd."
+    return f"A 'varj' parancs 'minta' feltételéhez használható mintaképek: {', '.join(names)}."
+
+
+def _decoded_size(image_data: str) -> int:
+    """Size in bytes of the JPEG behind a base64 string, without decoding it."""
+
+    return len(image_data) * 3 // 4 - image_data.count("=", -2)
+
+
+class AIHandler:
+    def __init__(
+        self,
+        provider: LLMProvider | None = None,
+        router: ModelRouter | None = None,
+        metrics_store: MetricsStore | None = None,
+        budget: TaskBudget | None = None,
+        resilience: ResilientCaller | None = None,
+    ) -> None:
+        self.provider = provider or create_provider()
+        self.resilience = resilience or ResilientCaller(
+            limiter=shared_rate_limiter if getattr(self.provider, "rate_limited", False) else TokenBucket(0)
+        )
+        self.router = router or ModelRouter()
+        self.metrics_store = metrics_store or MetricsStore()
+        self.budget = budget or TaskBudget()
+        self.task_usage = TaskUsage(task_id="")
+        # A statikus szegmensek egyszer, behúzás nélkül épülnek fel, így minden kérés
+        # bájtra azonos előtaggal indul, amit a szolgáltató gyorsítótárazni tud.
+        self.system_prompt = textwrap.dedent("""
         Te egy hasznos asztali asszisztens vagy. A feladatod, hogy a felhasználó kérését
         és a képernyő aktuális állapotát figyelembe véve egyetlen, konkrét, végrehajtható
         parancsot adj vissza JSON formátumban. A lehetséges parancsok: 'kattints',
-        'gepelj', 'indits_programot', 'valaszolj_a_felhasznalonak', 'futtass_plugint',
-        'kerj_jobb_minosegu_kepet', 'feladat_befejezve'. A 'futtass_plugint' parancs
+        'gepelj', 'nyomj_billentyut', 'varj', 'indits_programot', 'valaszolj_a_felhasznalonak',
+        'futtass_plugint', 'kerj_jobb_minosegu_kepet', 'feladat_befejezve'. A 'futtass_plugint' parancs
         esetén add meg, hogy melyik plugint kell futtatni a "plugin_nev" mezőben.
         Például:
         {"command": "futtass_plugint", "arguments": {"plugin_nev": "open_notepad"}}
         A 'kattints' parancs formátuma: '- 'kattints': {'x': <szám>, 'y': <szám>,
         'leiras': '<MIT LÁTSZ OTT?>'}. Ha vizuálisan azonosítasz egy elemet a
         képernyőn, KÖTELEZŐ megadnod a 'leiras' mezőt is!
+        A 'nyomj_billentyut' parancs billentyűkombinációt vagy kombinációk sorozatát
+        nyomja le, például:
+        {"command": "nyomj_billentyut", "arguments": {"billentyuk": "ctrl+s"}}
+        {"command": "nyomj_billentyut", "arguments": {"billentyuk": ["ctrl+l", "enter"]}}
+        Ha egy művelethez ismert billentyűparancs tartozik (mentés, bezárás, megerősítés),
+        használd ezt a menük és gombok vizuális keresése helyett, mert gyorsabb és
+        megbízhatóbb.
+        A 'varj' paranccsal helyben, újabb lépés nélkül várhatsz egy feltételre
+        (pl. egy program betöltésére). A "feltetel" értéke 'valtozas' (a terület
+        megváltozik), 'stabil' (a képernyő nem változik tovább) vagy 'minta' (a "minta"
+        mezőben megadott mintakép megjelenik). A "terulet" opcionális, a lekicsinyített
+        kép koordinátáiban add meg, az "idokorlat" másodpercben értendő. Például:
+        {"command": "varj", "arguments": {"feltetel": "stabil", "idokorlat": 10}}
+        {"command": "varj", "arguments": {"feltetel": "valtozas", "terulet": {"x": 0,
+        "y": 0, "szelesseg": 400, "magassag": 300}, "idokorlat": 5}}
+        Betöltő képernyő esetén használd a 'varj' parancsot ahelyett, hogy tippelnél.
         Mindig kapsz egy lekicsinyített képet a teljes képernyőről. A válaszodban a
         'kattints' parancs koordinátáit MINDIG ehhez a lekicsinyített képhez
         viszonyítva, annak a koordináta-rendszerében add meg!
@@ -35,8 +89,11 @@ class AIHandler:
         választanod! Például, ha az 'indits_programot' parancs elbukik, mert a program nem
         található, akkor a következő lépésben próbáld meg vizuálisan megkeresni a program
         ikonját a képernyőn a 'kattints' paranccsal.
-        """
-        self.system_prompt_grid_calibration = """
+        Ismert billentyűparancsok alkalmazásonként:
+        """).strip() + "\n" + format_shortcut_table() + "\n" + _template_note(available_templates())
+        self._plugin_segment_key: tuple | None = None
+        self._plugin_segment: dict = {}
+        self.system_prompt_grid_calibration = textwrap.dedent("""
         Te egy precíz vizuális elem felismerő vagy. Egy képernyőképet kapsz, amin egy kalibrációs
         rács látható feliratozott célpontokkal (A, B, C, stb.). A feladatod, hogy az ÖSSZES LÁTHATÓ
         célpontot azonosítsd, és visszaadd a pozícióikat a lekicsinyített kép koordináta-
@@ -50,7 +107,107 @@ class AIHandler:
           {"label": "D", "coords": {"x": 50, "y": 950}},
           {"label": "E", "coords": {"x": 500, "y": 500}}
         ]
-        """
+        """).strip()
+
+    def select_route(
+        self,
+        failure_count: int = 0,
+        high_detail_requested: bool = False,
+        history_length: int = 0,
+        cache_confidence: float | None = None,
+        budget_exceeded: bool = False,
+    ) -> ModelRoute:
+        """Choose the model and image detail for the next step."""
+
+        return self.router.select(
+            StepSignals(
+                failure_count=failure_count,
+                high_detail_requested=high_detail_requested,
+                history_length=history_length,
+                cache_confidence=cache_confidence,
+                budget_exceeded=budget_exceeded,
+            )
+        )
+
+    def begin_task(self, task_id: str) -> TaskUsage:
+        """Start a fresh usage account; subsequent calls are booked to ``task_id``."""
+
+        self.task_usage = TaskUsage(task_id=task_id)
+        return self.task_usage
+
+    def budget_status(self) -> str:
+        """Return ``"ok"``, ``"downgrade"`` or ``"abort"`` for the current task."""
+
+        return self.budget.check(self.task_usage)
+
+    def _create_completion(
+        self,
+        route: ModelRoute,
+        messages: list[dict],
+        image_bytes: int = 0,
+    ) -> LLMResponse:
+        """Send the request on the given route and record its latency, tokens and cost."""
+
+        started = time.perf_counter()
+        record = CallRecord(
+            task_id=self.task_usage.task_id,
+            model=route.model,
+            route=route.name,
+            detail=route.detail,
+            image_bytes=image_bytes,
+        )
+        try:
+            with tracer.span("api_call", route=route.name, model=route.model) as call_span:
+                response, record.retries = self.resilience.call(
+                    lambda: self.provider.complete(
+                        route.model,
+                        messages,
+                        response_format={"type": "json_object"},
+                    )
+                )
+                call_span.set(retries=record.retries)
+        except ApiError as error:
+            record.success = False
+            record.retries = error.retries
+            record.latency = round(time.perf_counter() - started, 4)
+            self._book(record)
+            raise
+
+        latency = time.perf_counter() - started
+        self.router.record(
+            route,
+            latency,
+            prompt_tokens=response.prompt_tokens,
+            completion_tokens=response.completion_tokens,
+            cached_tokens=response.cached_tokens,
+        )
+        record.model = response.model or route.model
+        record.prompt_tokens = response.prompt_tokens
+        record.completion_tokens = response.completion_tokens
+        record.cached_tokens = response.cached_tokens
+        record.latency = round(latency, 4)
+        record.cost_usd = route.cost(
+            response.prompt_tokens, response.completion_tokens, response.cached_tokens
+        )
+        self._book(record)
+        return response
+
+    def _book(self, record: CallRecord) -> None:
+        self.task_usage.add(record)
+        self.metrics_store.append(record)
+
+    def plugin_segment(self, available_plugins: list[dict[str, str]] | None) -> dict:
+        """Return the plugin catalogue message, rebuilt only when the plugin list changes."""
+
+        key = tuple((plugin["name"], plugin["description"]) for plugin in available_plugins or [])
+        if key != self._plugin_segment_key:
+            plugins_text = "\n".join(f"- {name}: {description}" for name, description in key)
+            self._plugin_segment_key = key
+            self._plugin_segment = {
+                "role": "system",
+                "content": f"Elérhető pluginek:\n{plugins_text or 'Nincsenek elérhető pluginek.'}",
+            }
+        return self._plugin_segment
 
     def get_ai_decision(
         self,
@@ -59,17 +216,12 @@ class AIHandler:
         available_plugins: list[dict[str, str]] | None = None,
         detail_level: str = "low",
         history: str = "",
+        route: ModelRoute | None = None,
     ) -> dict:
         print("🧠 AI gondolkodik...")
+        if route is None:
+            route = self.router.route("detailed" if detail_level == "high" else "fast")
         try:
-            plugins_text = "Nincsenek elérhető pluginek."
-            if available_plugins:
-                plugin_lines = [
-                    f"- {plugin['name']}: {plugin['description']}"
-                    for plugin in available_plugins
-                ]
-                plugins_text = "\n".join(plugin_lines)
-
             image_data = screen_info.get("image_data", "") if isinstance(screen_info, dict) else ""
             image_width = screen_info.get("width", 0) if isinstance(screen_info, dict) else 0
             image_height = screen_info.get("height", 0) if isinstance(screen_info, dict) else 0
@@ -79,25 +231,28 @@ class AIHandler:
                 print("SZÖVEGES PROMPT:")
                 print(f"    Feladat: '{user_prompt}'")
                 print(f"    Előzmények: {history if history else 'Nincs'}")
-                print(f"    Pluginek: {plugins_text}")
+                print(f"    Pluginek: {len(available_plugins or [])} db")
                 print(f"KÉP ADAT (hossz): {len(image_data)} karakter")
                 print(f"    KÉP MÉRET: {image_width}x{image_height}")
                 print(f"KÉP MINŐSÉG: {detail_level}")
+                print(f"MODELL ÚTVONAL: {route.name} ({route.model}, {route.detail})")
                 print("--------------------------")
 
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
+            # Sorrend: a legstabilabb tartalomtól a lépésenként változóig
+            # (rendszerprompt, pluginek, feladat, majd előzmények és kép).
+            with tracer.span("prompt_assembly"):
+                messages = [
                     {"role": "system", "content": self.system_prompt},
+                    self.plugin_segment(available_plugins),
+                    {"role": "user", "content": f"Eredeti Feladat: '{user_prompt}'."},
                     {
                         "role": "user",
                         "content": [
                             {
                                 "type": "text",
                                 "text": (
-                                    f"Eredeti Feladat: '{user_prompt}'.\n{history}\n\n"
+                                    f"{history}\n\n"
                                     f"A mellékelt kép mérete {image_width}x{image_height} pixel. "
-                                    f"A pluginek: {plugins_text}. "
                                     "Mi a következő lépés?"
                                 ),
                             },
@@ -105,34 +260,80 @@ class AIHandler:
                                 "type": "image_url",
                                 "image_url": {
                                     "url": f"data:image/jpeg;base64,{image_data}",
-                                    "detail": detail_level,
+                                    "detail": route.detail,
                                 },
                             },
                         ],
                     },
-                ],
-                response_format={"type": "json_object"}
+                ]
+            response = self._create_completion(
+                route, messages, image_bytes=_decoded_size(image_data)
             )
-            decision_str = response.choices[0].message.content
+            decision_str = response.content
             if DEBUG_MODE:
                 print("\n--- NYERS AI VÁLASZ ---")
                 print(decision_str)
                 print("----------------------")
-            return json.loads(decision_str)
+            with tracer.span("json_parse") as parse_span:
+                result = validate_decision_text(decision_str)
+                parse_span.set(repairs=len(result.repairs), valid=result.ok)
+            if not result.ok:
+                result = self._request_correction(decision_str, result)
+            if result.repairs and DEBUG_MODE:
+                print(f"🔧 Helyben javított válasz: {'; '.join(result.repairs)}")
+            if result.ok or result.decision is not None:
+                return result.decision
+            return {"command": "api_hiba", "arguments": {"hiba_uzenet": result.error}}
+        except ApiError as e:
+            print(f"Hiba az API hívás során ({e.kind}, {e.retries} újrapróbálás után): {e}")
+            return {
+                "command": "api_hiba",
+                "arguments": {"hiba_uzenet": str(e), "tipus": e.kind, "atmeneti": e.transient},
+            }
         except Exception as e:
             print(f"Hiba az API hívás során: {e}")
             return {"command": "api_hiba", "arguments": {"hiba_uzenet": str(e)}}
 
+    def _request_correction(self, raw_response: str, failed: ValidationResult) -> ValidationResult:
+        """Ask the cheapest route, text only, to fix a response that could not be repaired locally."""
+
+        print(f"⚠️ Érvénytelen AI válasz ({failed.error}), javítás kérése...")
+        route = self.router.route("fast")
+        try:
+            response = self._create_completion(
+                route,
+                [
+                    {
+                        "role": "system",
+                        "content": (
+                            "Egy asztali asszisztens válasza nem felel meg a sémának. Add vissza "
+                            "ugyanazt a szándékot egyetlen érvényes JSON objektumként "
+                            '{"command": ..., "arguments": {...}} alakban, magyarázat nélkül. '
+                            "Érvényes parancsok és argumentumok (? = opcionális):\n" + schema_summary()
+                        ),
+                    },
+                    {"role": "user", "content": f"Hiba: {failed.error}\nVálasz:\n{raw_response}"},
+                ],
+            )
+        except Exception as exc:
+            print(f"A javítási kérés nem sikerült: {exc}")
+            return failed
+        corrected = validate_decision_text(response.content)
+        corrected.repairs.insert(0, "javítási kérés")
+        return corrected if corrected.ok else failed
+
     def get_grid_calibration_points(self, screen_info: dict) -> list:
         print("🔬 Kalibrációs rács elemzése...")
         image_data = screen_info.get("image_data", "") if isinstance(screen_info, dict) else ""
         image_width = screen_info.get("width", 0) if isinstance(screen_info, dict) else 0
         image_height = screen_info.get("height", 0) if isinstance(screen_info, dict) else 0
 
+        route = self.router.route("calibration")
+
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
+            response = self._create_completion(
+                route,
+                [
                     {"role": "system", "content": self.system_prompt_grid_calibration},
                     {
                         "role": "user",
@@ -145,15 +346,16 @@ class AIHandler:
                                 "type": "image_url",
                                 "image_url": {
                                     "url": f"data:image/jpeg;base64,{image_data}",
-                                    "detail": "high",
+                                    "detail": route.detail,
                                 },
                             },
                         ],
                     },
                 ],
-                response_format={"type": "json_object"},
+                image_bytes=_decoded_size(image_data),
             )
-            result_data = json.loads(response.choices[0].message.content)
+            with tracer.span("json_parse"):
+                result_data, _ = parse_json_text(response.content)
             if isinstance(result_data, list):
                 return result_data
             if isinstance(result_data, dict):
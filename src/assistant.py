@@ -3,20 +3,28 @@
 
 from __future__ import annotations
 
+import threading
 import time
+from collections.abc import Callable
+from datetime import datetime
+from typing import TYPE_CHECKING
 
-from PySide6.QtCore import QMetaObject, QObject, Qt, Signal, Slot
-from PySide6.QtWidgets import QApplication
-
-from pynput.keyboard import Key, Listener
+from PySide6.QtCore import QObject, Signal, Slot
 
 from src.ai_handler import AIHandler
 from src.computer_interface import ComputerInterface
 from src.context_handler import ContextHandler
 from src.gui.calibration_grid import CalibrationGrid
+from src.gui.overlay_proxy import overlay_proxy
+from src.hotkeys import hotkey_service
 from src.memory_handler import MemoryHandler
 from src.plugin_handler import PluginHandler
-from src.config import DEBUG_MODE
+from src.task_guard import TaskGuard
+from src.config import DEBUG_MODE, EPISODE_RECORD_DIR, TRACE_DIR
+from src.tracing import tracer
+
+if TYPE_CHECKING:
+    from src.episode import EpisodeRecorder
 
 
 class DesktopAssistant(QObject):
@@ -27,22 +35,52 @@ class DesktopAssistant(QObject):
     log_message = Signal(str)
     task_finished = Signal()
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        ai_handler: AIHandler | None = None,
+        computer_interface: ComputerInterface | None = None,
+        memory_handler: MemoryHandler | None = None,
+        plugin_handler: PluginHandler | None = None,
+        context_handler: ContextHandler | None = None,
+        listen_for_keyboard: bool = True,
+        task_guard: TaskGuard | None = None,
+    ) -> None:
         super().__init__()
-        self.ai_handler = AIHandler()
-        self.computer_interface = ComputerInterface()
-        self.memory_handler = MemoryHandler()
-        self.plugin_handler = PluginHandler()
-        self.context_handler = ContextHandler()
+        self.ai_handler = ai_handler or AIHandler()
+        self.computer_interface = computer_interface or ComputerInterface()
+        self.task_guard = task_guard or TaskGuard()
+        # A helyi várakozások a feladat időkeretének lejártakor is megszakadnak.
+        self.computer_interface.abort_check = (
+            lambda: self._stop_requested or self.task_guard.time_expired()
+        )
+        self.ai_handler.resilience.should_abort = self.computer_interface.abort_check
+        self.memory_handler = memory_handler or MemoryHandler()
+        self.plugin_handler = plugin_handler or PluginHandler()
+        self.context_handler = context_handler or ContextHandler()
         self._stop_requested = False
         self._stop_notified = False
-        self._keyboard_listener: Listener | None = None
+        # Törölve = szüneteltetve; a gyorsbillentyű-szál állítja, a munkaszál a lépéshatáron várakozik rajta.
+        self._resumed = threading.Event()
+        self._resumed.set()
         self.failure_counter = 0
         self.max_failures = 3
+        # Az utolsó feladat kimenetele (állapot, lépésszám, korlátesemények) fej nélküli futtatáshoz.
+        self.last_outcome: dict = {}
+        # A feladatsor állítja be: igaz, ha sürgősebb feladat vár, és a lépéshatáron át kell adni a helyet.
+        self.preemption_check: Callable[[], bool] | None = None
+        if listen_for_keyboard:
+            # Egyetlen, alkalmazásszintű figyelő; feladatonként nem indul és áll le szál.
+            hotkey_service.add_stop_handler(self.request_stop)
+            hotkey_service.add_pause_handler(self.toggle_pause)
+            hotkey_service.start()
 
     @Slot(str)
-    def start_task(self, user_input: str) -> None:
-        """Execute the assistant workflow for the provided user input."""
+    def start_task(self, user_input: str, resume_context: dict | None = None) -> None:
+        """Execute the assistant workflow for the provided user input.
+
+        ``resume_context`` (a ``ContextHandler.snapshot``) continues a preempted
+        task from its recorded history instead of starting over.
+        """
 
         if not user_input.strip():
             self.log_message.emit("Nem érkezett parancs a feldolgozáshoz.")
@@ -52,174 +90,327 @@ class DesktopAssistant(QObject):
             return
 
         self._reset_stop_state()
-        self._start_keyboard_listener()
+        self.ai_handler.begin_task(datetime.now().strftime("%Y%m%d-%H%M%S-%f"))
+        self.task_guard.start()
+        outcome = "incomplete"
+        recorder = self._start_episode_recording(user_input)
 
         self.progress_updated.emit(0)
         self.status_updated.emit("Feladat indítása...")
         self.log_message.emit(f"Felhasználói utasítás: {user_input}")
 
         try:
-            if self._check_for_stop():
-                return
-
-            if self._try_handle_from_memory(user_input):
-                return
-
-            iteration = 0
-            detail_level = "low"
-
-            self.context_handler.start_new_task(user_input)
-            self.failure_counter = 0
-
-            while not self._stop_requested and self.failure_counter < self.max_failures:
-                iteration += 1
-
-                if DEBUG_MODE:
-                    print("\n" + "=" * 20 + f" CIKLUS #{iteration} " + "=" * 20)
-                    print(f"HIBA SZÁMLÁLÓ: {self.failure_counter}/{self.max_failures}")
-                    print(f"KÉP MINŐSÉG A KÖR ELEJÉN: {detail_level}")
-                    print("AKTUÁLIS ELŐZMÉNYEK:")
-                    print(self.context_handler.get_formatted_history())
-                    print("=" * 55)
-
+            with tracer.span("task", task=user_input):
                 if self._check_for_stop():
-                    break
+                    return
 
-                self.status_updated.emit("Képernyőállapot lekérése...")
-                screen_info = self.computer_interface.get_screen_state(
-                    detail_level=detail_level
-                )
-                self.progress_updated.emit(min(30, 10 + iteration * 5))
+                if resume_context is None and self._try_handle_from_memory(user_input):
+                    outcome = "completed"
+                    return
 
-                if self._check_for_stop():
-                    break
-
-                self.status_updated.emit("AI döntés előkészítése...")
-                available_plugins = self.plugin_handler.get_available_plugins()
-                history_for_ai = self.context_handler.get_formatted_history()
-                ai_action = self.ai_handler.get_ai_decision(
-                    self.context_handler.original_task,
-                    screen_info,
-                    available_plugins,
-                    detail_level=detail_level,
-                    history=history_for_ai,
-                )
-                self.progress_updated.emit(min(60, 40 + iteration * 5))
+                detail_level = "low"
 
-                if self._check_for_stop():
-                    break
-
-                command = ai_action.get("command") if isinstance(ai_action, dict) else None
-                arguments = (
-                    ai_action.get("arguments", {}) if isinstance(ai_action, dict) else {}
-                )
-
-                recognized_commands = [
-                    "kattints",
-                    "gepelj",
-                    "indits_programot",
-                    "futtass_plugint",
-                    "feladat_befejezve",
-                    "kerj_jobb_minosegu_kepet",
-                ]
-
-                if command not in recognized_commands:
-                    command_label = command if command else "ismeretlen parancs"
-                    self.failure_counter += 1
+                if resume_context is not None:
+                    self.context_handler.restore(resume_context)
                     self.log_message.emit(
-                        f"Értelmezhetetlen vagy hibás parancs: {command}. "
-                        f"Próbálkozás: {self.failure_counter}/{self.max_failures}"
-                    )
-                    self.status_updated.emit(
-                        f"Hiba észlelve, újrapróbálkozás... ({self.failure_counter})"
+                        f"A feladat folytatódik a {self.context_handler.step_count}. előzménybejegyzés után."
                     )
                     self.context_handler.add_system_feedback(
-                        (
-                            f"Az előző parancsod ('{command_label}') sikertelen volt. "
-                            "Hiba: Ismeretlen parancs. Próbálj egy másik megoldást, például egy vizuális keresést!"
+                        "A feladatot egy sürgősebb feladat megszakította, most innen folytatódik. "
+                        "A képernyő közben megváltozhatott; a már elvégzett lépéseket (pl. gépelést) ne ismételd meg!"
+                    )
+                else:
+                    self.context_handler.start_new_task(user_input)
+                self.failure_counter = 0
+
+                while not self._stop_requested and self.failure_counter < self.max_failures:
+                    self._wait_while_paused()
+                    if self._check_for_stop():
+                        break
+                    if self.preemption_check is not None and self.preemption_check():
+                        outcome = "preempted"
+                        self.log_message.emit("Sürgősebb feladat érkezett, ez a feladat visszakerül a sorba.")
+                        self.status_updated.emit("Feladat felfüggesztve.")
+                        break
+                    limit_event = self.task_guard.next_iteration()
+                    if limit_event is not None:
+                        outcome = limit_event.kind
+                        self.log_message.emit(f"Feladat leállítva: {limit_event.detail}.")
+                        self.status_updated.emit("A feladat túllépte a megengedett keretet.")
+                        break
+                    iteration = self.task_guard.iteration
+                    tracer.instant("iteration", number=iteration)
+
+                    if DEBUG_MODE:
+                        print("\n" + "=" * 20 + f" CIKLUS #{iteration} " + "=" * 20)
+                        print(f"HIBA SZÁMLÁLÓ: {self.failure_counter}/{self.max_failures}")
+                        print(f"KÉP MINŐSÉG A KÖR ELEJÉN: {detail_level}")
+                        print("AKTUÁLIS ELŐZMÉNYEK:")
+                        print(self.context_handler.get_formatted_history())
+                        print("=" * 55)
+
+                    if self._check_for_stop():
+                        break
+
+                    budget_status = self.ai_handler.budget_status()
+                    if budget_status == "abort":
+                        outcome = "budget"
+                        self.log_message.emit("A feladat elérte a token- vagy költségkeretét, leállítás.")
+                        self.status_updated.emit("A feladatkeret elfogyott.")
+                        break
+
+                    # Ha az előző lépés képkészítése vagy döntése túllépte a határidejét,
+                    # ez a lépés a legolcsóbb, alacsony felbontású útvonalon megy.
+                    overruns = self.task_guard.take_overruns()
+                    slow_phases = overruns & {"screen", "decision"}
+                    if "execute" in overruns:
+                        # A túl hosszú végrehajtás kudarcnak számít: a modell gyorsabb utat keres,
+                        # ismétlődés esetén pedig a sikertelen próbálkozások korlátja állítja le a feladatot.
+                        self.failure_counter += 1
+                        self.log_message.emit(
+                            f"A parancs végrehajtása túllépte a határidejét ({self.failure_counter}/{self.max_failures})."
+                        )
+                        self.context_handler.add_system_feedback(
+                            "Az előző parancsod végrehajtása túllépte a megengedett időt. Kerüld a hosszú "
+                            "várakozásokat és a lassú műveleteket, válassz gyorsabb megoldást!"
                         )
+                        if self.failure_counter >= self.max_failures:
+                            break
+                    route = self.ai_handler.select_route(
+                        failure_count=self.failure_counter,
+                        high_detail_requested=detail_level == "high",
+                        history_length=self.context_handler.step_count,
+                        budget_exceeded=budget_status == "downgrade" or bool(slow_phases),
                     )
-                    detail_level = "low"
-                    if command != "valaszolj_a_felhasznalonak":
-                        continue
+                    detail_level = route.detail
 
-                if command == "kerj_jobb_minosegu_kepet":
-                    self.log_message.emit(
-                        "AI jobb minőségű képet kért, újrapróbálkozás..."
-                    )
-                    self.status_updated.emit("Képminőség növelése...")
-                    detail_level = "high"
-                    self.context_handler.add_assistant_action(ai_action)
-                    continue
-
-                if command == "feladat_befejezve":
-                    if isinstance(arguments, dict):
-                        message = arguments.get("uzenet")
-                        if isinstance(message, str) and message.strip():
-                            self.status_updated.emit(message.strip())
-                            self.log_message.emit(f"AI üzenet: {message.strip()}")
-                    detail_level = "low"
-                    self.context_handler.add_assistant_action(ai_action)
-                    break
-
-                if command and isinstance(arguments, dict):
-                    self.status_updated.emit("Parancs végrehajtása...")
-                    if command == "kattints":
-                        ai_coords = self._extract_coordinates(arguments)
-                        if ai_coords:
-                            real_coords = self._transform_coordinates(
-                                ai_coords,
-                                screen_info if isinstance(screen_info, dict) else {},
-                            )
-                            arguments.update(real_coords)
-                    self.log_message.emit(f"Parancs: {command} {arguments}")
-                    execution_result = self._handle_ai_action(
-                        {"command": command, "arguments": arguments}
+                    self.status_updated.emit("Képernyőállapot lekérése...")
+                    with self.task_guard.phase("screen"), tracer.span("screen_state", detail=detail_level):
+                        screen_info = self.computer_interface.get_screen_state(
+                            detail_level=detail_level
+                        )
+                    self.progress_updated.emit(min(30, 10 + iteration * 5))
+
+                    if self._check_for_stop():
+                        break
+
+                    self.status_updated.emit("AI döntés előkészítése...")
+                    available_plugins = self.plugin_handler.get_available_plugins()
+                    history_for_ai = self.context_handler.get_formatted_history()
+                    with self.task_guard.phase("decision"), tracer.span("decision", route=route.name):
+                        ai_action = self.ai_handler.get_ai_decision(
+                            self.context_handler.original_task,
+                            screen_info,
+                            available_plugins,
+                            detail_level=detail_level,
+                            history=history_for_ai,
+                            route=route,
+                        )
+                    self.progress_updated.emit(min(60, 40 + iteration * 5))
+
+                    if self._check_for_stop():
+                        break
+
+                    command = ai_action.get("command") if isinstance(ai_action, dict) else None
+                    arguments = (
+                        ai_action.get("arguments", {}) if isinstance(ai_action, dict) else {}
                     )
-                    self.progress_updated.emit(min(90, 70 + iteration * 5))
-                    detail_level = "low"
-                    if execution_result.get("success"):
-                        self.failure_counter = 0
-                        self.context_handler.add_assistant_action(ai_action)
-                    else:
+
+                    if command == "api_hiba" and isinstance(arguments, dict) and "tipus" in arguments:
+                        error_kind = arguments.get("tipus")
+                        if arguments.get("atmeneti") and error_kind != "circuit_open":
+                            # Az újrapróbálások már lefutottak; ez nem a modell hibája, nem számít kudarcnak.
+                            self.log_message.emit(f"Átmeneti API hiba ({error_kind}), a lépés megismétlődik.")
+                            self.status_updated.emit("Az AI szolgáltatás lassan válaszol, újrapróbálkozás...")
+                            continue
+                        if error_kind != "bad_request":
+                            # Hitelesítési hiba vagy nyitott megszakító: a további kérések is elbuknának.
+                            outcome = "api_error"
+                            self.log_message.emit(f"API hiba, a feladat leáll: {arguments.get('hiba_uzenet')}")
+                            self.status_updated.emit("Az AI szolgáltatás nem érhető el.")
+                            break
+
+                    recognized_commands = [
+                        "kattints",
+                        "gepelj",
+                        "nyomj_billentyut",
+                        "varj",
+                        "indits_programot",
+                        "futtass_plugint",
+                        "feladat_befejezve",
+                        "kerj_jobb_minosegu_kepet",
+                    ]
+
+                    if command not in recognized_commands:
                         command_label = command if command else "ismeretlen parancs"
                         self.failure_counter += 1
-                        error_message = execution_result.get(
-                            "error", "Ismeretlen hiba."
+                        self.log_message.emit(
+                            f"Értelmezhetetlen vagy hibás parancs: {command}. "
+                            f"Próbálkozás: {self.failure_counter}/{self.max_failures}"
                         )
-                        self.log_message.emit(f"Parancs sikertelen: {error_message}")
                         self.status_updated.emit(
                             f"Hiba észlelve, újrapróbálkozás... ({self.failure_counter})"
                         )
                         self.context_handler.add_system_feedback(
                             (
                                 f"Az előző parancsod ('{command_label}') sikertelen volt. "
-                                f"Hiba: {error_message}. Próbálj egy másik megoldást, például egy vizuális keresést!"
+                                "Hiba: Ismeretlen parancs. Próbálj egy másik megoldást, például egy vizuális keresést!"
                             )
                         )
+                        detail_level = "low"
+                        if command != "valaszolj_a_felhasznalonak":
+                            continue
+
+                    if command == "kerj_jobb_minosegu_kepet":
+                        self.log_message.emit(
+                            "AI jobb minőségű képet kért, újrapróbálkozás..."
+                        )
+                        self.status_updated.emit("Képminőség növelése...")
+                        detail_level = "high"
+                        self.context_handler.add_assistant_action(ai_action)
                         continue
 
-                if self._check_for_stop():
-                    break
+                    if command == "feladat_befejezve":
+                        if isinstance(arguments, dict):
+                            message = arguments.get("uzenet")
+                            if isinstance(message, str) and message.strip():
+                                self.status_updated.emit(message.strip())
+                                self.log_message.emit(f"AI üzenet: {message.strip()}")
+                        detail_level = "low"
+                        self.context_handler.add_assistant_action(ai_action)
+                        outcome = "completed"
+                        break
+
+                    screen_signature = screen_info.get("signature") if isinstance(screen_info, dict) else None
+                    if self.task_guard.observe_action(screen_signature, command, arguments):
+                        if self.task_guard.loops_detected > 1:
+                            outcome = "loop"
+                            self.log_message.emit(
+                                f"Feladat leállítva: a '{command}' lépés figyelmeztetés után is ismétlődött."
+                            )
+                            self.status_updated.emit("A feladat ismétlődő lépésekbe ragadt.")
+                            break
+                        self.failure_counter += 1
+                        self.log_message.emit(
+                            f"Ismétlődő lépés észlelve ({command}), változatlan képernyőn. "
+                            f"Próbálkozás: {self.failure_counter}/{self.max_failures}"
+                        )
+                        self.context_handler.add_system_feedback(
+                            f"A '{command}' parancsot többször egymás után ugyanazzal az eredménnyel "
+                            "adtad ki, és a képernyő nem változott. Válassz egy teljesen más stratégiát!"
+                        )
+                        detail_level = "low"
+                        continue
 
-            if self.failure_counter >= self.max_failures:
-                self.log_message.emit(
-                    f"A feladat leállt {self.max_failures} sikertelen próbálkozás után."
-                )
-                self.status_updated.emit("A feladatot nem sikerült végrehajtani.")
+                    if command and isinstance(arguments, dict):
+                        self.status_updated.emit("Parancs végrehajtása...")
+                        with tracer.span("coordinate_transform"):
+                            if command == "kattints":
+                                ai_coords = self._extract_coordinates(arguments)
+                                if ai_coords:
+                                    real_coords = self._transform_coordinates(
+                                        ai_coords,
+                                        screen_info if isinstance(screen_info, dict) else {},
+                                    )
+                                    arguments.update(real_coords)
+                            elif command == "varj" and isinstance(arguments.get("terulet"), dict):
+                                arguments["terulet"] = self._transform_region(
+                                    arguments["terulet"],
+                                    screen_info if isinstance(screen_info, dict) else {},
+                                )
+                        self.log_message.emit(f"Parancs: {command} {arguments}")
+                        # A kért várakozás nem számít túllépésnek: a 'varj' határideje az időkorlátjával nő.
+                        allowance = self.computer_interface.wait_timeout(arguments) if command == "varj" else 0.0
+                        with self.task_guard.phase("execute", allowance), tracer.span("execute", command=command):
+                            execution_result = self._handle_ai_action(
+                                {"command": command, "arguments": arguments}
+                            )
+                        self.progress_updated.emit(min(90, 70 + iteration * 5))
+                        detail_level = "low"
+                        if execution_result.get("success"):
+                            if not self.task_guard.overran("execute"):
+                                self.failure_counter = 0
+                            self.context_handler.add_assistant_action(ai_action)
+                            if execution_result.get("condition_met") is False:
+                                self.context_handler.add_system_feedback(
+                                    "A 'varj' feltétele nem teljesült "
+                                    f"{execution_result.get('elapsed', 0)} mp alatt "
+                                    f"({execution_result.get('detail', 'időtúllépés')})."
+                                )
+                            elif execution_result.get("verified") is False:
+                                self.log_message.emit(
+                                    f"A(z) '{command}' után nem változott a képernyő "
+                                    f"({execution_result.get('attempts', 1)} helyi próbálkozás)."
+                                )
+                                self.context_handler.add_system_feedback(
+                                    f"A(z) '{command}' parancs után a művelet környékén "
+                                    f"{execution_result.get('attempts', 1)} helyi próbálkozás után sem "
+                                    "változott a képernyő. Ellenőrizd a célpontot (pozíció, fókusz)!"
+                                )
+                        else:
+                            command_label = command if command else "ismeretlen parancs"
+                            self.failure_counter += 1
+                            error_message = execution_result.get(
+                                "error", "Ismeretlen hiba."
+                            )
+                            self.log_message.emit(f"Parancs sikertelen: {error_message}")
+                            self.status_updated.emit(
+                                f"Hiba észlelve, újrapróbálkozás... ({self.failure_counter})"
+                            )
+                            self.context_handler.add_system_feedback(
+                                (
+                                    f"Az előző parancsod ('{command_label}') sikertelen volt. "
+                                    f"Hiba: {error_message}. Próbálj egy másik megoldást, például egy vizuális keresést!"
+                                )
+                            )
+                            continue
+
+                    if self._check_for_stop():
+                        break
+
+                if self.failure_counter >= self.max_failures:
+                    outcome = "failed"
+                    self.log_message.emit(
+                        f"A feladat leállt {self.max_failures} sikertelen próbálkozás után."
+                    )
+                    self.status_updated.emit("A feladatot nem sikerült végrehajtani.")
 
         except Exception as exc:  # pragma: no cover - defensive logging
+            outcome = "error"
             self.log_message.emit(f"Hiba történt: {exc}")
             self.status_updated.emit("Hiba történt a feldolgozás során.")
         finally:
-            self._stop_keyboard_listener()
+            if self._stop_requested and outcome == "incomplete":
+                outcome = "stopped"
+            self.last_outcome = {
+                "status": outcome,
+                "iterations": self.task_guard.iteration,
+                "elapsed": round(self.task_guard.elapsed, 3),
+                "limit_events": [event.to_dict() for event in self.task_guard.events],
+                "usage": {
+                    "calls": self.ai_handler.task_usage.calls,
+                    "tokens": self.ai_handler.task_usage.total_tokens,
+                    "cost_usd": round(self.ai_handler.task_usage.cost_usd, 6),
+                },
+            }
+            tracer.instant("task_outcome", status=outcome, iterations=self.task_guard.iteration)
+            self._finish_episode_recording(recorder)
+            self._export_trace("task")
+            if DEBUG_MODE and self.ai_handler.router.stats:
+                print(f"MODELL ÚTVONAL STATISZTIKA: {self.ai_handler.router.summary()}")
+            usage = self.ai_handler.task_usage
+            if usage.calls:
+                self.log_message.emit(
+                    f"Felhasználás: {usage.calls} hívás, {usage.total_tokens} token "
+                    f"({usage.cache_hit_rate:.0%} gyorsítótárból), "
+                    f"{sum(usage.image_bytes.values()) / 1024:.0f} KiB kép, ${usage.cost_usd:.4f}"
+                )
             self.progress_updated.emit(100)
             if self._stop_requested:
                 self.log_message.emit("Feladat megszakítva.")
                 self.status_updated.emit("Feladat megszakítva.")
-            else:
-                if self.failure_counter < self.max_failures:
-                    self.status_updated.emit("Feladat befejezve.")
+            elif outcome == "completed":
+                self.status_updated.emit("Feladat befejezve.")
             self.task_finished.emit()
             self._stop_requested = False
             self._stop_notified = False
@@ -229,7 +420,6 @@ class DesktopAssistant(QObject):
         """Runs the active grid-based calibration routine."""
 
         self._reset_stop_state()
-        self._start_keyboard_listener()
 
         self.progress_updated.emit(0)
         self.status_updated.emit("Kalibráció indítása...")
@@ -237,67 +427,71 @@ class DesktopAssistant(QObject):
         grid_widget: CalibrationGrid | None = None
 
         try:
-            self.status_updated.emit("Kalibrációs rács előkészítése...")
-            self.progress_updated.emit(10)
-
-            grid_widget = CalibrationGrid()
-            grid_widget.showFullScreen()
+            with tracer.span("calibration"):
+                self.status_updated.emit("Kalibrációs rács előkészítése...")
+                self.progress_updated.emit(10)
+
+                with tracer.span("grid_show") as span:
+                    # A rácsot a grafikus szál hozza létre; addig várunk, amíg az első
+                    # képkockája ténylegesen kirajzolódik, így a képernyőkép már tartalmazza.
+                    grid_widget, presented = overlay_proxy.show_and_wait(
+                        CalibrationGrid, show=CalibrationGrid.showFullScreen
+                    )
+                    span.set(presented=presented)
+                if grid_widget is None:
+                    self.log_message.emit("❌ Kalibráció sikertelen: a grafikus felület nem jelenítette meg a rácsot.")
+                    return
+                if not presented:
+                    self.log_message.emit("A kalibrációs rács kirajzolása nem igazolódott időben, folytatás.")
 
-            # ÚJ, MEGBÍZHATÓ MEGOLDÁS:
-            # Arra kényszerítjük a Qt eseményhurkot, hogy azonnal dolgozza fel
-            # az összes függőben lévő eseményt, beleértve a widget kirajzolását is.
-            # Ez a parancs addig blokkolja a futást, amíg a rács ténylegesen láthatóvá nem válik.
-            QApplication.processEvents()
-            time.sleep(0.1)  # Egy nagyon rövid extra várakozás a biztonság kedvéért, ha a rendszer lassú.
+                if self._check_for_stop():
+                    return
 
-            if self._check_for_stop():
-                return
+                self.status_updated.emit("Képernyő elemzése...")
+                with tracer.span("screen_state", detail="high"):
+                    screen_info = self.computer_interface.get_screen_state(detail_level="high")
+                self.progress_updated.emit(30)
 
-            self.status_updated.emit("Képernyő elemzése...")
-            screen_info = self.computer_interface.get_screen_state(detail_level="high")
-            self.progress_updated.emit(30)
+                if self._check_for_stop():
+                    return
 
-            if self._check_for_stop():
-                return
+                self.status_updated.emit("AI elemzi a rácsot...")
+                with tracer.span("decision", route="calibration"):
+                    perceived_points = self.ai_handler.get_grid_calibration_points(screen_info)
+                self.progress_updated.emit(70)
 
-            self.status_updated.emit("AI elemzi a rácsot...")
-            perceived_points = self.ai_handler.get_grid_calibration_points(screen_info)
-            self.progress_updated.emit(70)
+                overlay_proxy.post(grid_widget.hide)
 
-            if grid_widget:
-                grid_widget.hide()
+                if not perceived_points:
+                    self.log_message.emit(
+                        "❌ Kalibráció sikertelen: Az AI nem tudta azonosítani a pontokat."
+                    )
+                    return
+
+                real_points = grid_widget.points
+                calibration_results = []
+                for p_point in perceived_points:
+                    label = p_point.get("label") if isinstance(p_point, dict) else None
+                    if label in real_points:
+                        calibration_results.append(
+                            {
+                                "real": {
+                                    "x": real_points[label][0],
+                                    "y": real_points[label][1],
+                                },
+                                "perceived": p_point.get("coords"),
+                            }
+                        )
 
-            if not perceived_points:
                 self.log_message.emit(
-                    "❌ Kalibráció sikertelen: Az AI nem tudta azonosítani a pontokat."
+                    f"✅ AI által azonosított pontok: {len(calibration_results)} db"
                 )
-                return
-
-            real_points = grid_widget.points if grid_widget else {}
-            calibration_results = []
-            for p_point in perceived_points:
-                label = p_point.get("label") if isinstance(p_point, dict) else None
-                if label in real_points:
-                    calibration_results.append(
-                        {
-                            "real": {
-                                "x": real_points[label][0],
-                                "y": real_points[label][1],
-                            },
-                            "perceived": p_point.get("coords"),
-                        }
-                    )
-
-            self.log_message.emit(
-                f"✅ AI által azonosított pontok: {len(calibration_results)} db"
-            )
-            self._calculate_and_save_calibration(calibration_results)
+                self._calculate_and_save_calibration(calibration_results)
 
         finally:
             if grid_widget:
-                grid_widget.hide()
-                grid_widget.deleteLater()
-            self._stop_keyboard_listener()
+                overlay_proxy.close(grid_widget)
+            self._export_trace("calibration")
             self.progress_updated.emit(100)
             if self._stop_requested:
                 self.log_message.emit("Kalibráció megszakítva.")
@@ -308,41 +502,92 @@ class DesktopAssistant(QObject):
             self._stop_requested = False
             self._stop_notified = False
 
-    def _start_keyboard_listener(self) -> None:
-        """Start the global keyboard listener to capture ESC presses."""
+    def _start_episode_recording(self, user_input: str) -> EpisodeRecorder | None:
+        """Attach an episode recorder when EPISODE_RECORD_DIR is configured."""
+
+        if not EPISODE_RECORD_DIR:
+            return None
+
+        from src.episode import EpisodeRecorder
 
-        if self._keyboard_listener is None:
-            self._keyboard_listener = Listener(on_press=self._handle_key_press)
-            self._keyboard_listener.start()
+        recorder = EpisodeRecorder(user_input)
+        recorder.attach(self)
+        return recorder
 
-    def _stop_keyboard_listener(self) -> None:
-        """Ensure the keyboard listener is stopped and cleaned up."""
+    def _finish_episode_recording(self, recorder: EpisodeRecorder | None) -> None:
+        if recorder is None:
+            return
+        recorder.detach()
+        try:
+            path = recorder.save_to_directory(EPISODE_RECORD_DIR)
+            self.log_message.emit(f"Epizód elmentve: {path}")
+        except OSError as exc:
+            self.log_message.emit(f"Az epizód mentése nem sikerült: {exc}")
 
-        if self._keyboard_listener is not None:
-            self._keyboard_listener.stop()
-            self._keyboard_listener.join()
-            self._keyboard_listener = None
+    def _export_trace(self, prefix: str) -> None:
+        """Write the collected spans as Chrome trace JSON when tracing is enabled."""
+
+        if not tracer.enabled or not TRACE_DIR:
+            return
+        try:
+            path = tracer.export_to_directory(TRACE_DIR, prefix=prefix)
+        except OSError as exc:
+            self.log_message.emit(f"A trace mentése nem sikerült: {exc}")
+            return
+        if path is not None:
+            self.log_message.emit(f"Trace elmentve: {path}")
 
     def _reset_stop_state(self) -> None:
-        """Reset stop flags before starting a new task."""
+        """Reset stop and pause flags before starting a new task."""
 
         self._stop_requested = False
         self._stop_notified = False
-
-    def _handle_key_press(self, key: Key) -> None:
-        """React to ESC key presses by queueing a stop request."""
-
-        if key == Key.esc:
-            print("ESC lenyomva, leállítás kérése...")
-            QMetaObject.invokeMethod(self, "request_stop", Qt.QueuedConnection)
+        # A szünet gyorsbillentyűje mindig él: az előző feladat végén vagy tétlenül
+        # leütött szünet nem tarthatja vissza a következő feladatot.
+        self._resumed.set()
 
     @Slot()
     def request_stop(self) -> None:
-        """Idempotent stop request that can be triggered from multiple sources."""
+        """Idempotent stop request; safe to call directly from any thread."""
 
         if not self._stop_requested:
             self._stop_requested = True
             self._stop_notified = False
+        # Szüneteltetett feladat is azonnal leállhasson.
+        self._resumed.set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._resumed.is_set()
+
+    def pause(self) -> None:
+        """Hold the task at its next iteration boundary; safe from any thread."""
+
+        self._resumed.clear()
+
+    def resume(self) -> None:
+        self._resumed.set()
+
+    def toggle_pause(self) -> None:
+        if self.paused:
+            self.resume()
+        else:
+            self.pause()
+
+    def _wait_while_paused(self) -> None:
+        """Block between iterations while paused; paused time does not count against the budget."""
+
+        if not self.paused:
+            return
+        self.status_updated.emit("Feladat szüneteltetve.")
+        self.log_message.emit("Feladat szüneteltetve, folytatás a gyorsbillentyűvel.")
+        started = time.monotonic()
+        self._resumed.wait()
+        paused_for = time.monotonic() - started
+        self.task_guard.exclude(paused_for)
+        if not self._stop_requested:
+            self.status_updated.emit("Feladat folytatása...")
+            self.log_message.emit(f"Feladat folytatva {paused_for:.0f} mp szünet után.")
 
     def _check_for_stop(self) -> bool:
         """Check whether a stop was requested and emit user feedback once."""
@@ -433,9 +678,13 @@ class DesktopAssistant(QObject):
         )
 
     def _transform_coordinates(
-        self, ai_coords: dict, image_dims: dict | None = None
+        self, ai_coords: dict, image_dims: dict | None = None, announce: bool = True
     ) -> dict:
-        """Scales coordinates using pre-saved calibration data."""
+        """Scales coordinates using pre-saved calibration data.
+
+        ``announce=False`` suppresses the missing-calibration warning, e.g. for
+        the second corner of a region.
+        """
 
         ai_x = ai_coords.get("x") if isinstance(ai_coords, dict) else None
         ai_y = ai_coords.get("y") if isinstance(ai_coords, dict) else None
@@ -456,13 +705,49 @@ class DesktopAssistant(QObject):
 
             return {"x": real_x, "y": real_y}
 
-        if self.log_message:
+        image_width = image_dims.get("width", 0) if isinstance(image_dims, dict) else 0
+        image_height = image_dims.get("height", 0) if isinstance(image_dims, dict) else 0
+        screen_width = self.computer_interface.screen_width
+        screen_height = self.computer_interface.screen_height
+
+        if image_width and image_height and screen_width and screen_height:
+            if announce and self.log_message:
+                self.log_message.emit(
+                    "⚠️ Nincs kalibrációs adat. A koordinátákat a kép és a képernyő méretarányával skálázzuk."
+                )
+            return {
+                "x": int(float(ai_x) * screen_width / image_width),
+                "y": int(float(ai_y) * screen_height / image_height),
+            }
+
+        if announce and self.log_message:
             self.log_message.emit(
                 "⚠️ Nincs kalibrációs adat. Az AI koordinátáit változtatás nélkül használjuk."
             )
 
         return {"x": int(ai_x), "y": int(ai_y)}
 
+    def _transform_region(self, region: dict, image_dims: dict | None = None) -> dict:
+        """Transforms a region given in AI image coordinates into screen coordinates."""
+
+        width = region.get("szelesseg", region.get("width"))
+        height = region.get("magassag", region.get("height"))
+        if not isinstance(width, (int, float)) or not isinstance(height, (int, float)):
+            return region
+
+        top_left = self._transform_coordinates(region, image_dims)
+        if not isinstance(top_left.get("x"), (int, float)):
+            return region
+        bottom_right = self._transform_coordinates(
+            {"x": region["x"] + width, "y": region["y"] + height}, image_dims, announce=False
+        )
+        return {
+            "x": top_left["x"],
+            "y": top_left["y"],
+            "szelesseg": max(1, bottom_right["x"] - top_left["x"]),
+            "magassag": max(1, bottom_right["y"] - top_left["y"]),
+        }
+
     def _handle_ai_action(self, ai_action: dict) -> dict:
         command = ai_action.get("command")
         arguments = ai_action.get("arguments", {}) or {}
@@ -477,7 +762,8 @@ class DesktopAssistant(QObject):
                 }
 
             try:
-                self.plugin_handler.execute_plugin(plugin_name)
+                with tracer.span("plugin_run", plugin=plugin_name):
+                    self.plugin_handler.execute_plugin(plugin_name)
                 self.log_message.emit(f"Plugin futtatva: {plugin_name}")
             except Exception as exc:
                 error_message = f"Plugin futtatása sikertelen ({plugin_name}): {exc}"
@@ -512,13 +798,13 @@ class DesktopAssistant(QObject):
                     )
 
             if coords:
-                self.computer_interface.click_at(
+                return self.computer_interface.click_at(
                     coords["x"],
                     coords["y"],
                     element_name,
                     source=click_source,
+                    verify=True,
                 )
-                return {"success": True}
 
             error_message = "A kattintáshoz érvényes koordináták szükségesek."
             self.log_message.emit(error_message)
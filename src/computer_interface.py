@@ -6,26 +6,69 @@ import base64
 import io
 import json
 import subprocess
-from collections.abc import Sequence
+from collections.abc import Callable, Sequence
 from pathlib import Path
 
-import pyautogui
 from PIL import Image
-from PySide6.QtCore import QMetaObject, Qt
 from PySide6.QtGui import QGuiApplication
 
-from src.gui.widgets import ClickIndicator
+from src.action_verifier import ActionVerifier
+from src.config import (
+    ACTION_VERIFY,
+    ACTION_VERIFY_OFFSET_PX,
+    ACTION_VERIFY_RETRIES,
+    ACTION_VERIFY_RETRY_GRACE_MS,
+    WAIT_CHANGE_THRESHOLD,
+    WAIT_DEFAULT_TIMEOUT_S,
+    WAIT_MAX_TIMEOUT_S,
+    WAIT_POLL_INTERVAL_MS,
+)
+from src.gui.capture_exclusion import capture_exclusion
+from src.gui.overlay_proxy import overlay_proxy
+from src.gui.widgets import CLICK_INDICATOR_DIAMETER, ClickIndicatorPool
+from src.input_backends import InputBackend, create_input_backend, injection_tracker
+from src.program_catalog import ProgramCatalog, default_catalog
+from src.screen_watcher import TEMPLATE_DIR, Region, ScreenGrabber, ScreenWatcher
+from src.shortcuts import parse_key_sequence
+from src.tracing import tracer
+
+# Ezeknél a célpontoknál a dupla kattintás a várt művelet, nem egy gomb ismételt megnyomása.
+DOUBLE_CLICK_HINTS = ("ikon", "icon", "fájl", "file", "mappa", "folder", "parancsikon", "shortcut")
+# Beviteli mezőbe kattintva gyakran csak a (kitakart) kurzor jelenik meg; ott az újrapróbálás
+# (különösen a dupla kattintás, amely kijelöl egy szót) többet ártana, mint használna.
+TEXT_FIELD_HINTS = (
+    "mező", "mezo", "field", "input", "beviteli", "szövegdoboz", "textbox", "text box", "címsor", "address bar"
+)
 
 
 class ComputerInterface:
-    def __init__(self) -> None:
-        self._active_indicators: list[ClickIndicator] = []
+    def __init__(
+        self,
+        input_backend: InputBackend | None = None,
+        screen_grabber: ScreenGrabber | None = None,
+        program_catalog: ProgramCatalog | None = None,
+    ) -> None:
         self.program_paths: dict[str, str | Sequence[str]] = {}
+        self.input_backend = input_backend or create_input_backend()
+        self._screen_grabber = screen_grabber
+        self.abort_check: Callable[[], bool] | None = None
         try:
-            self.screen_width, self.screen_height = pyautogui.size()
+            self.screen_width, self.screen_height = self.input_backend.screen_size()
         except Exception:  # pragma: no cover - környezeti korlátok
             self.screen_width, self.screen_height = 0, 0
         self._load_program_paths()
+        self.program_catalog = program_catalog or default_catalog()
+        self.verify_actions = ACTION_VERIFY
+        self.action_verifier = ActionVerifier(
+            self.capture_screen,
+            screen_size=(self.screen_width, self.screen_height),
+            should_abort=self._aborted,
+            ignore_radius=CLICK_INDICATOR_DIAMETER,
+        )
+        self._last_click: tuple[int, int] | None = None
+
+    def _aborted(self) -> bool:
+        return self.abort_check is not None and self.abort_check()
 
     def _load_program_paths(self) -> None:
         """Loads program shortcuts from the root programs.json file."""
@@ -38,11 +81,26 @@ class ComputerInterface:
         except (json.JSONDecodeError, OSError) as exc:
             print(f"Hiba a programs.json betöltése közben: {exc}")
 
+    def capture_screen(self, region: Region | None = None) -> Image.Image:
+        """Grab the whole screen or a ``(left, top, width, height)`` region.
+
+        The assistant's own windows are masked out, see ``capture_exclusion``.
+        """
+
+        if self._screen_grabber is not None:
+            image = self._screen_grabber(region)
+        else:
+            import pyautogui
+
+            image = pyautogui.screenshot(region=region)
+        return capture_exclusion.mask(image, region)
+
     def get_screen_state(self, detail_level: str = "low") -> dict:
         """Készítsen teljes képernyőképet és adja vissza a lekicsinyített kép adatait."""
 
         try:
-            screenshot = pyautogui.screenshot()
+            with tracer.span("capture"):
+                screenshot = self.capture_screen()
 
             if detail_level == "high":
                 max_size = (2048, 2048)
@@ -51,22 +109,30 @@ class ComputerInterface:
                 max_size = (1024, 1024)
                 quality = 80
 
-            screenshot.thumbnail(max_size, Image.Resampling.LANCZOS)
+            with tracer.span("thumbnail", detail=detail_level):
+                screenshot.thumbnail(max_size, Image.Resampling.LANCZOS)
 
             downscaled_width, downscaled_height = screenshot.size
-
-            buffer = io.BytesIO()
-            screenshot.save(buffer, format="JPEG", quality=quality)
-            img_bytes = buffer.getvalue()
-            encoded = base64.b64encode(img_bytes).decode("ascii")
+            # Kis szürkeárnyalatos lenyomat: az ismétlődés-észlelés ezzel hasonlítja a képeket,
+            # mert a JPEG bájtjai egy villogó kurzortól vagy órától is megváltoznak.
+            signature = ScreenWatcher.signature(screenshot)
+
+            with tracer.span("encode") as span:
+                buffer = io.BytesIO()
+                screenshot.save(buffer, format="JPEG", quality=quality)
+                img_bytes = buffer.getvalue()
+                span.set(bytes=len(img_bytes))
+            with tracer.span("base64"):
+                encoded = base64.b64encode(img_bytes).decode("ascii")
             return {
                 "image_data": encoded,
                 "width": downscaled_width,
                 "height": downscaled_height,
+                "signature": signature,
             }
         except Exception as exc:  # pragma: no cover - vizuális környezet hiánya esetén
             print(f"Nem sikerült képernyőképet készíteni: {exc}")
-            return {"image_data": "", "width": 0, "height": 0}
+            return {"image_data": "", "width": 0, "height": 0, "signature": None}
 
     def click_at(
         self,
@@ -74,18 +140,123 @@ class ComputerInterface:
         y: int,
         description: str | None = None,
         source: str | None = None,
-    ) -> None:
+        verify: bool = False,
+    ) -> dict:
+        """Click at ``(x, y)``; with ``verify`` confirm locally that the screen reacted.
+
+        An unconfirmed click is retried here first (a few pixels off, or as a
+        double-click on icons), so a miss costs milliseconds instead of a model
+        round trip.
+        """
+
         details = f" ({description})" if description else ""
         origin = f" forrás: {source}" if source else ""
         print(f"🖱️  Kattintás a {x}, {y} pozíción{details}.{origin}")
-        self._display_click_indicator(x, y)
+        self._last_click = (x, y)
+
+        verify = verify and self.verify_actions
+        region = self.action_verifier.region_around(x, y) if verify else None
+        attempts = [(x, y, 1)]
+        if verify:
+            attempts += self._retry_attempts(x, y, description)[: max(0, ACTION_VERIFY_RETRIES)]
+        # Minden próbálkozás jelzőjét előre kitakarjuk, így az alapkép végig érvényes marad.
+        targets = [(target_x, target_y) for target_x, target_y, _ in attempts] if self._shows_indicator() else []
+
+        waited = 0.0
         try:
-            pyautogui.click(x, y)
+            baseline = self.action_verifier.baseline(region, targets) if verify else None
+            for index, (target_x, target_y, clicks) in enumerate(attempts):
+                if index:
+                    # Türelmi idő: egy lassan reagáló gombot nem nyomunk meg még egyszer.
+                    with tracer.span("verify", action="click_grace", attempt=index):
+                        late = self.action_verifier.confirm(
+                            region, baseline, targets, timeout=ACTION_VERIFY_RETRY_GRACE_MS / 1000, already_waited=waited
+                        )
+                    if late.satisfied:
+                        return {
+                            "success": True,
+                            "verified": True,
+                            "attempts": index,
+                            "elapsed": round(waited + late.elapsed, 3),
+                        }
+                    if late.detail == "megszakítva":
+                        break
+                    waited += late.elapsed
+                    kind = "dupla kattintás" if clicks == 2 else f"kattintás itt: {target_x}, {target_y}"
+                    print(f"🔁 Nem látszott változás, helyi újrapróbálás: {kind}.")
+                self._display_click_indicator(target_x, target_y)
+                with tracer.span("input_injection", action="click", clicks=clicks):
+                    self.input_backend.click(target_x, target_y, clicks=clicks)
+                if baseline is None:
+                    return {"success": True}
+                with tracer.span("verify", action="click", attempt=index + 1):
+                    result = self.action_verifier.confirm(region, baseline, targets)
+                if result.satisfied:
+                    return {
+                        "success": True,
+                        "verified": True,
+                        "attempts": index + 1,
+                        "elapsed": round(result.elapsed, 3),
+                    }
+                if result.detail == "megszakítva":
+                    break
+                waited = result.elapsed
         except Exception as exc:  # pragma: no cover - vizuális környezet hiánya esetén
-            print(f"A kattintás végrehajtása nem sikerült: {exc}")
+            error_message = f"A kattintás végrehajtása nem sikerült: {exc}"
+            print(error_message)
+            return {"success": False, "error": error_message}
+
+        print(f"⚠️  A kattintás után nem változott a képernyő ({index + 1} próbálkozás).")
+        return {"success": True, "verified": False, "attempts": index + 1}
+
+    @staticmethod
+    def _retry_attempts(x: int, y: int, description: str | None) -> list[tuple[int, int, int]]:
+        """Local retries after an unconfirmed click, as ``(x, y, clicks)``.
+
+        A double-click is only tried for targets that usually need one (desktop
+        icons, files, folders), and text fields are not retried at all.
+        """
+
+        text = (description or "").lower()
+        if any(hint in text for hint in TEXT_FIELD_HINTS):
+            return []
+        offset = ACTION_VERIFY_OFFSET_PX
+        shifted = [(x + offset, y + offset, 1), (x - offset, y - offset, 1)]
+        if any(hint in text for hint in DOUBLE_CLICK_HINTS):
+            return [(x, y, 2), *shifted]
+        return shifted
+
+    def type_text(self, text: str, verify: bool = False) -> dict:
+        """Type ``text``; with ``verify`` check that the row of the last click changed.
+
+        Typing is not repeated when nothing changed, as it is not idempotent;
+        the result only tells the model that the text may have been lost.
+        """
+
+        verify = verify and self.verify_actions and bool(text)
+        region = None
+        ignore: list[tuple[int, int]] = []
+        if self._last_click is not None:
+            region = self.action_verifier.region_around(*self._last_click, full_width=True)
+            ignore = [self._last_click] if self._shows_indicator() else []
+        try:
+            baseline = self.action_verifier.baseline(region, ignore) if verify else None
+            with tracer.span("input_injection", action="type", length=len(text)), injection_tracker.injecting():
+                self.input_backend.type_text(text)
+            if baseline is None:
+                return {"success": True}
+            with tracer.span("verify", action="type"):
+                result = self.action_verifier.confirm(region, baseline, ignore)
+        except Exception as exc:  # pragma: no cover - vizuális környezet hiánya esetén
+            error_message = f"A gépelés nem sikerült: {exc}"
+            print(error_message)
+            return {"success": False, "error": error_message}
+        if not result.satisfied:
+            print("⚠️  A gépelés után nem változott a képernyő.")
+        return {"success": True, "verified": result.satisfied, "attempts": 1}
 
     def execute_command(self, command: str, arguments: dict) -> dict:
-        """Valódi parancsok végrehajtása PyAutoGUI és subprocess segítségével."""
+        """Valódi parancsok végrehajtása a bemeneti háttér és subprocess segítségével."""
 
         args = arguments if isinstance(arguments, dict) else {}
 
@@ -93,8 +264,9 @@ class ComputerInterface:
             x = args.get("x")
             y = args.get("y")
             if isinstance(x, (int, float)) and isinstance(y, (int, float)):
-                self.click_at(int(x), int(y), args.get("description"))
-                return {"success": True}
+                return self.click_at(
+                    int(x), int(y), args.get("leiras") or args.get("description"), verify=True
+                )
             print("A 'kattints' parancshoz érvényes x és y koordináták szükségesek.")
             return {
                 "success": False,
@@ -107,14 +279,35 @@ class ComputerInterface:
                 error_message = "A 'gepelj' parancshoz szöveg szükséges."
                 print(error_message)
                 return {"success": False, "error": error_message}
+            return self.type_text(text, verify=True)
+
+        if command == "nyomj_billentyut":
+            keys_argument = (
+                args.get("billentyuk")
+                or args.get("billentyu")
+                or args.get("keys")
+                or args.get("key")
+            )
             try:
-                pyautogui.typewrite(text)
+                key_sequence = parse_key_sequence(keys_argument)
+            except ValueError as exc:
+                error_message = f"A 'nyomj_billentyut' parancs hibás: {exc}"
+                print(error_message)
+                return {"success": False, "error": error_message}
+            print(f"⌨️  Billentyűk: {', '.join('+'.join(combo) for combo in key_sequence)}")
+            try:
+                with tracer.span("input_injection", action="keys"), injection_tracker.injecting():
+                    for combo in key_sequence:
+                        self.input_backend.press_keys(combo)
             except Exception as exc:  # pragma: no cover - vizuális környezet hiánya esetén
-                error_message = f"A gépelés nem sikerült: {exc}"
+                error_message = f"A billentyűparancs végrehajtása nem sikerült: {exc}"
                 print(error_message)
                 return {"success": False, "error": error_message}
             return {"success": True}
 
+        if command == "varj":
+            return self._wait_for_condition(args)
+
         if command == "indits_programot":
             program_alias = (
                 args.get("program_nev")
@@ -134,6 +327,12 @@ class ComputerInterface:
             else:
                 executable_path: str | Sequence[str] | None = self.program_paths.get(program_alias)
 
+                if not executable_path:
+                    entry = self.program_catalog.resolve(str(program_alias))
+                    if entry is not None:
+                        print(f"🔎 Program a katalógusból: {program_alias} -> {entry.name} ({entry.source})")
+                        executable_path = entry.command
+
                 if not executable_path:
                     executable_path = program_alias
 
@@ -153,37 +352,107 @@ class ComputerInterface:
                 return {"success": True}
             except FileNotFoundError:
                 program_display = command_sequence[0] if command_sequence else str(program_alias)
-                return {
-                    "success": False,
-                    "error": f"A(z) '{program_display}' program nem található.",
-                }
+                error_message = f"A(z) '{program_display}' program nem található."
+                suggestions = self.program_catalog.suggestions(str(program_alias))
+                if suggestions:
+                    error_message += f" Hasonló programok: {', '.join(suggestions)}."
+                return {"success": False, "error": error_message}
             except Exception as exc:  # pragma: no cover - rendszerfüggő hibák
                 return {"success": False, "error": str(exc)}
 
         print(f"Ismeretlen parancs: {command} {arguments}")
         return {"success": False, "error": f"Ismeretlen parancs: {command}"}
 
-    def _display_click_indicator(self, x: int, y: int) -> None:
-        """Display the click indicator centred on the provided coordinates."""
+    @staticmethod
+    def wait_timeout(args: dict) -> float:
+        """The timeout of a 'varj' command in seconds, defaulted and clamped."""
 
-        app = QGuiApplication.instance()
-        if app is None:
-            return
+        timeout = args.get("idokorlat", args.get("timeout", WAIT_DEFAULT_TIMEOUT_S))
+        if not isinstance(timeout, (int, float)) or timeout <= 0:
+            timeout = WAIT_DEFAULT_TIMEOUT_S
+        return min(float(timeout), WAIT_MAX_TIMEOUT_S)
 
-        def spawn_indicator() -> None:
-            indicator = ClickIndicator()
-            indicator.move(x - indicator.width() // 2, y - indicator.height() // 2)
-            indicator.show()
-            indicator.raise_()
-            self._active_indicators.append(indicator)
-            indicator.destroyed.connect(
-                lambda _=None, ref=indicator: self._remove_indicator(ref)
-            )
+    def _wait_for_condition(self, args: dict) -> dict:
+        """Poll the screen locally until the requested condition holds or times out."""
+
+        condition = str(args.get("feltetel") or args.get("condition") or "stabil").lower()
+        timeout = self.wait_timeout(args)
 
-        QMetaObject.invokeMethod(app, spawn_indicator, Qt.QueuedConnection)
+        region = self._extract_region(args.get("terulet") or args.get("region"))
+        watcher = ScreenWatcher(
+            self.capture_screen,
+            poll_interval=WAIT_POLL_INTERVAL_MS / 1000,
+            change_threshold=WAIT_CHANGE_THRESHOLD,
+            should_abort=self.abort_check,
+        )
 
-    def _remove_indicator(self, indicator: ClickIndicator) -> None:
         try:
-            self._active_indicators.remove(indicator)
-        except ValueError:
-            pass
+            if condition in ("valtozas", "change"):
+                result = watcher.wait_for_change(region, timeout)
+            elif condition in ("stabil", "stable"):
+                stable_for = args.get("stabil_ido", 0.5)
+                if not isinstance(stable_for, (int, float)) or stable_for <= 0:
+                    stable_for = 0.5
+                result = watcher.wait_for_stable(region, timeout, float(stable_for))
+            elif condition in ("minta", "template"):
+                template_path = self._resolve_template(args.get("minta") or args.get("template"))
+                if template_path is None:
+                    return {
+                        "success": False,
+                        "error": "A 'minta' feltételhez létező mintakép (minta) megadása kötelező.",
+                    }
+                with Image.open(template_path) as template:
+                    result = watcher.wait_for_template(template.copy(), region, timeout)
+            else:
+                return {
+                    "success": False,
+                    "error": f"Ismeretlen várakozási feltétel: {condition}",
+                }
+        except Exception as exc:  # pragma: no cover - vizuális környezet hiánya esetén
+            return {"success": False, "error": f"A várakozás nem sikerült: {exc}"}
+
+        print(
+            f"⏳ Várakozás ({condition}): "
+            f"{'teljesült' if result.satisfied else result.detail} "
+            f"{result.elapsed:.2f} mp alatt, {result.frames} képkocka."
+        )
+        return {
+            "success": True,
+            "condition_met": result.satisfied,
+            "elapsed": round(result.elapsed, 3),
+            "detail": result.detail,
+        }
+
+    @staticmethod
+    def _extract_region(value: object) -> Region | None:
+        if not isinstance(value, dict):
+            return None
+        x = value.get("x")
+        y = value.get("y")
+        width = value.get("szelesseg", value.get("width"))
+        height = value.get("magassag", value.get("height"))
+        if all(isinstance(item, (int, float)) for item in (x, y, width, height)):
+            if width > 0 and height > 0:
+                return int(x), int(y), int(width), int(height)
+        return None
+
+    @staticmethod
+    def _resolve_template(name: object) -> Path | None:
+        if not isinstance(name, str) or not name.strip():
+            return None
+        candidate = Path(name.strip())
+        if not candidate.is_absolute():
+            candidate = TEMPLATE_DIR / candidate
+        return candidate if candidate.is_file() else None
+
+    @staticmethod
+    def _shows_indicator() -> bool:
+        return QGuiApplication.instance() is not None
+
+    def _display_click_indicator(self, x: int, y: int) -> None:
+        """Flash a pooled click indicator centred on the provided coordinates."""
+
+        if not self._shows_indicator():
+            return
+
+        overlay_proxy.post(lambda: ClickIndicatorPool.shared().flash(x, y))
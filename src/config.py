@@ -1,15 +1,113 @@
-# src/config.py
-import os
-from dotenv import load_dotenv
-
-# .env fájl betöltése
-load_dotenv()
-
-# API kulcs kiolvasása a környezeti változókból
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-
-# Ellenőrzés, hogy a kulcs meg van-e adva
-if not OPENAI_API_KEY:
-    raise ValueError("Az OPENAI_API_KEY nincs beállítva! Hozd létre a .env fájlt a .env.example alapján.")
+# src/config.py
+import os
+from dotenv import load_dotenv
+
+# .env fájl betöltése
+load_dotenv()
+
+# API kulcs kiolvasása a környezeti változókból. A hiányát az OpenAI szolgáltató
+# jelzi létrehozáskor, így a helyi és szkriptelt szolgáltatók kulcs nélkül is futnak.
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+# Nyelvi modell szolgáltató: "openai", "local" (OpenAI-kompatibilis végpont) vagy "scripted"
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai").strip().lower()
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "http://localhost:8000/v1")
+LLM_LOCAL_MODEL = os.getenv("LLM_LOCAL_MODEL", "")
+LLM_SCRIPT_PATH = os.getenv("LLM_SCRIPT_PATH", "")
+# Mesterséges késleltetés a szkriptelt szolgáltatóhoz (ezredmásodpercben)
+LLM_LATENCY_MS = float(os.getenv("LLM_LATENCY_MS", "0"))
+LLM_LATENCY_JITTER_MS = float(os.getenv("LLM_LATENCY_JITTER_MS", "0"))
 
 DEBUG_MODE = os.getenv("DEBUG_MODE", "False").lower() in ("true", "1", "t")
+
+# Bemeneti (egér/billentyűzet) háttérrendszer: "auto", "xtest", "pyautogui" vagy "recording"
+INPUT_BACKEND = os.getenv("INPUT_BACKEND", "auto").strip().lower()
+
+# Explicit időzítések az egyes bemeneti események között (ezredmásodpercben)
+INPUT_KEY_DELAY_MS = float(os.getenv("INPUT_KEY_DELAY_MS", "4"))
+INPUT_CLICK_DELAY_MS = float(os.getenv("INPUT_CLICK_DELAY_MS", "8"))
+INPUT_MOVE_SETTLE_MS = float(os.getenv("INPUT_MOVE_SETTLE_MS", "4"))
+
+# A 'varj' parancs helyi képernyőfigyelésének beállításai
+WAIT_POLL_INTERVAL_MS = float(os.getenv("WAIT_POLL_INTERVAL_MS", "33"))
+WAIT_DEFAULT_TIMEOUT_S = float(os.getenv("WAIT_DEFAULT_TIMEOUT_S", "10"))
+WAIT_MAX_TIMEOUT_S = float(os.getenv("WAIT_MAX_TIMEOUT_S", "60"))
+WAIT_CHANGE_THRESHOLD = float(os.getenv("WAIT_CHANGE_THRESHOLD", "2.0"))
+
+# Lépésenkénti modellválasztás: útvonalak felülírása JSON-ban, pl.
+# MODEL_ROUTES={"strong": {"model": "gpt-4o", "detail": "high"}}
+MODEL_ROUTES = os.getenv("MODEL_ROUTES", "")
+ROUTE_ESCALATE_AFTER_FAILURES = int(os.getenv("ROUTE_ESCALATE_AFTER_FAILURES", "2"))
+ROUTE_LONG_HISTORY = int(os.getenv("ROUTE_LONG_HISTORY", "16"))
+ROUTE_CACHE_CONFIDENCE = float(os.getenv("ROUTE_CACHE_CONFIDENCE", "0.9"))
+
+# Ha meg van adva, minden feladat epizódja (képek, AI válaszok, eredmények) ide kerül
+EPISODE_RECORD_DIR = os.getenv("EPISODE_RECORD_DIR", "")
+
+# Ha meg van adva, a feladatok fázisainak időzítése Chrome trace JSON-ként ide kerül
+TRACE_DIR = os.getenv("TRACE_DIR", "")
+
+# Hívásonkénti token-, képméret- és költségnapló helye
+METRICS_PATH = os.getenv("METRICS_PATH", "")
+# Feladatonkénti keretek (0 = korlátlan) és a túllépéskor követendő eljárás ("downgrade" vagy "abort")
+TASK_TOKEN_BUDGET = int(os.getenv("TASK_TOKEN_BUDGET", "0"))
+TASK_COST_BUDGET_USD = float(os.getenv("TASK_COST_BUDGET_USD", "0"))
+TASK_BUDGET_ACTION = os.getenv("TASK_BUDGET_ACTION", "downgrade").strip().lower()
+
+# Elszabadult feladatok elleni korlátok: lépésszám, teljes időkeret (mp, 0 = korlátlan),
+# fázisonkénti határidők (mp) és az azonos képernyőn ismételt azonos lépések küszöbe
+TASK_MAX_ITERATIONS = int(os.getenv("TASK_MAX_ITERATIONS", "40"))
+TASK_TIME_BUDGET_S = float(os.getenv("TASK_TIME_BUDGET_S", "300"))
+PHASE_DEADLINE_SCREEN_S = float(os.getenv("PHASE_DEADLINE_SCREEN_S", "2"))
+PHASE_DEADLINE_DECISION_S = float(os.getenv("PHASE_DEADLINE_DECISION_S", "30"))
+PHASE_DEADLINE_EXECUTE_S = float(os.getenv("PHASE_DEADLINE_EXECUTE_S", "20"))
+LOOP_REPEAT_LIMIT = int(os.getenv("LOOP_REPEAT_LIMIT", "3"))
+
+# Az AI-nak küldött előzmények korlátai: ennyi legutóbbi bejegyzés szó szerint,
+# legfeljebb ennyi karakter, a régebbiek helyben készült összefoglalóként
+HISTORY_WINDOW = int(os.getenv("HISTORY_WINDOW", "8"))
+HISTORY_MAX_CHARS = int(os.getenv("HISTORY_MAX_CHARS", "3000"))
+HISTORY_SUMMARY = os.getenv("HISTORY_SUMMARY", "True").lower() == "true"
+
+# API-hívások újrapróbálása: kísérletek száma, exponenciális várakozás (mp), kérésenkénti
+# időkorlát (mp), percenként engedélyezett kérések (0 = korlátlan) és megszakító
+API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "4"))
+API_BACKOFF_BASE_S = float(os.getenv("API_BACKOFF_BASE_S", "0.5"))
+API_BACKOFF_MAX_S = float(os.getenv("API_BACKOFF_MAX_S", "20"))
+API_TIMEOUT_S = float(os.getenv("API_TIMEOUT_S", "60"))
+API_RATE_LIMIT_PER_MIN = float(os.getenv("API_RATE_LIMIT_PER_MIN", "60"))
+API_CIRCUIT_FAILURES = int(os.getenv("API_CIRCUIT_FAILURES", "5"))
+API_CIRCUIT_RESET_S = float(os.getenv("API_CIRCUIT_RESET_S", "30"))
+
+# Párhuzamos (flotta) futtatásnál a munkafolyamatok saját memóriája és metrikái ide kerülnek
+FLEET_DIR = os.getenv("FLEET_DIR", "")
+
+# A saját ablakok (overlay, kattintásjelző) kihagyása a képernyőképekből: Windows alatt
+# a rendszer kihagyja őket a rögzítésből, máshol ismert helyük semleges színnel takarva
+CAPTURE_EXCLUDE_OWN_WINDOWS = os.getenv("CAPTURE_EXCLUDE_OWN_WINDOWS", "True").lower() == "true"
+
+# Ennyi mp-ig várunk, hogy egy overlay (pl. a kalibrációs rács) első képkockája kirajzolódjon
+OVERLAY_PRESENT_TIMEOUT_S = float(os.getenv("OVERLAY_PRESENT_TIMEOUT_S", "2"))
+
+# Az overlay naplója: ennyi sor marad a nézetben (a teljes napló exportálható),
+# az új sorok és állapotjelzések ennyi ms-onként, kötegben jelennek meg
+LOG_VIEW_CAPACITY = int(os.getenv("LOG_VIEW_CAPACITY", "2000"))
+LOG_FLUSH_INTERVAL_MS = int(os.getenv("LOG_FLUSH_INTERVAL_MS", "100"))
+
+# Globális gyorsbillentyűk (pynput formátum, üres = kikapcsolva) és a makrókat
+# ("<ctrl>+<alt>+1": "feladat szövege") tartalmazó fájl, alapból a hotkeys.json
+HOTKEY_STOP = os.getenv("HOTKEY_STOP", "<esc>")
+HOTKEY_PAUSE = os.getenv("HOTKEY_PAUSE", "<ctrl>+<alt>+p")
+HOTKEYS_PATH = os.getenv("HOTKEYS_PATH", "")
+
+# Kattintás és gépelés utáni helyi ellenőrzés: a művelet körüli terület (sugár, px)
+# változását figyeljük a korábbi reakcióidőkből számolt, e határok közé eső ideig
+# (ms); változás hiányában még ennyi ms türelmi idő után jön legfeljebb ennyi helyi
+# újrapróbálás (eltolt, ikonoknál előbb dupla kattintás)
+ACTION_VERIFY = os.getenv("ACTION_VERIFY", "True").lower() == "true"
+ACTION_VERIFY_RADIUS = int(os.getenv("ACTION_VERIFY_RADIUS", "120"))
+ACTION_VERIFY_MIN_WAIT_MS = float(os.getenv("ACTION_VERIFY_MIN_WAIT_MS", "400"))
+ACTION_VERIFY_MAX_WAIT_MS = float(os.getenv("ACTION_VERIFY_MAX_WAIT_MS", "1000"))
+ACTION_VERIFY_RETRY_GRACE_MS = float(os.getenv("ACTION_VERIFY_RETRY_GRACE_MS", "300"))
+ACTION_VERIFY_RETRIES = int(os.getenv("ACTION_VERIFY_RETRIES", "2"))
+ACTION_VERIFY_OFFSET_PX = int(os.getenv("ACTION_VERIFY_OFFSET_PX", "6"))
@@ -1,38 +1,137 @@
+import copy
+from collections import Counter
 from typing import Any, Dict, List
 
+from src.config import HISTORY_MAX_CHARS, HISTORY_SUMMARY, HISTORY_WINDOW
+
+# Egyetlen bejegyzés sem foglalhatja el a teljes keretet (pl. hosszú gépelt szöveg).
+MAX_ENTRY_CHARS = 300
+
 
 class ContextHandler:
-    def __init__(self) -> None:
+    """Keeps a bounded, incrementally formatted history of the current task.
+
+    The last ``window`` entries are sent verbatim; older ones are folded into a
+    short locally generated summary, and consecutive identical entries are
+    collapsed into one line with a repeat count.
+    """
+
+    def __init__(
+        self,
+        window: int = HISTORY_WINDOW,
+        max_chars: int = HISTORY_MAX_CHARS,
+        summarize: bool = HISTORY_SUMMARY,
+    ) -> None:
+        self.window = max(1, window)
+        self.max_chars = max_chars
+        self.summarize = summarize
         self.original_task: str = ""
         self.history: List[Dict[str, Any]] = []
+        self.step_count = 0
+        self._older_commands: Counter = Counter()
+        self._older_failures = 0
+        self._older_last_failure = ""
+        self._formatted: str | None = None
 
     def start_new_task(self, original_task: str) -> None:
         """Resets the context for a new task."""
         self.original_task = original_task
         self.history = []
+        self.step_count = 0
+        self._older_commands = Counter()
+        self._older_failures = 0
+        self._older_last_failure = ""
+        self._formatted = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns a copy of the task state, so an interrupted task can resume later."""
+        return copy.deepcopy(
+            {
+                "original_task": self.original_task,
+                "history": self.history,
+                "step_count": self.step_count,
+                "older_commands": self._older_commands,
+                "older_failures": self._older_failures,
+                "older_last_failure": self._older_last_failure,
+            }
+        )
+
+    def restore(self, snapshot: Dict[str, Any]) -> None:
+        """Continues a task from a state returned by ``snapshot``."""
+        state = copy.deepcopy(snapshot)
+        self.original_task = state["original_task"]
+        self.history = state["history"]
+        self.step_count = state["step_count"]
+        self._older_commands = state["older_commands"]
+        self._older_failures = state["older_failures"]
+        self._older_last_failure = state["older_last_failure"]
+        self._formatted = None
 
     def add_assistant_action(self, action: Dict[str, Any]) -> None:
         """Adds a successful AI action to the history."""
-        self.history.append({"role": "assistant", "action": action})
+        text = f"- Asszisztens Lépés: {action.get('command')} {action.get('arguments', '')}"
+        self._append({"role": "assistant", "action": action}, text)
 
     def add_system_feedback(self, feedback: str) -> None:
         """Adds system feedback (e.g., an error message) to the history."""
-        self.history.append({"role": "system", "feedback": feedback})
+        self._append({"role": "system", "feedback": feedback}, f"- Rendszer Visszajelzés: {feedback}")
+
+    def _append(self, item: Dict[str, Any], text: str) -> None:
+        self.step_count += 1
+        self._formatted = None
+        if len(text) > MAX_ENTRY_CHARS:
+            text = text[: MAX_ENTRY_CHARS - 3] + "..."
+
+        # Az egymás utáni azonos bejegyzések (pl. ugyanaz a hiba) egy sorba olvadnak.
+        if self.history and self.history[-1]["text"] == text:
+            self.history[-1]["repeats"] += 1
+            return
+
+        self.history.append({**item, "text": text, "repeats": 1})
+        while len(self.history) > self.window:
+            self._fold(self.history.pop(0))
+
+    def _fold(self, item: Dict[str, Any]) -> None:
+        """Move an entry out of the window into the summary counters."""
+        if item["role"] == "assistant":
+            self._older_commands[str(item["action"].get("command"))] += item["repeats"]
+        else:
+            self._older_failures += item["repeats"]
+            self._older_last_failure = item["feedback"][:MAX_ENTRY_CHARS]
+
+    def _summary_line(self) -> str:
+        if not self.summarize or not (self._older_commands or self._older_failures):
+            return ""
+        commands = ", ".join(f"{name} {count}x" for name, count in self._older_commands.most_common())
+        line = (
+            f"- Korábbi lépések összefoglalója: {sum(self._older_commands.values())} lépés"
+            f"{f' ({commands})' if commands else ''}, {self._older_failures} rendszer visszajelzés."
+        )
+        if self._older_last_failure:
+            line += f" Utolsó korábbi visszajelzés: {self._older_last_failure}"
+        return line
 
     def get_formatted_history(self) -> str:
         """Creates a concise string summary of the task history for the AI."""
-        if not self.history:
-            return "Ez az első lépés."
+        if self._formatted is not None:
+            return self._formatted
+        if not self.history and not self.step_count:
+            self._formatted = "Ez az első lépés."
+            return self._formatted
+
+        lines = [
+            item["text"] + (f" (ismételve {item['repeats']}x)" if item["repeats"] > 1 else "")
+            for item in self.history
+        ]
+        # A karakterkeret túllépésekor a legrégebbi sorok is az összefoglalóba kerülnek.
+        while len(lines) > 1 and len("\n".join(["Előzmények:", self._summary_line(), *lines])) > self.max_chars:
+            self._fold(self.history.pop(0))
+            lines.pop(0)
 
         summary = ["Előzmények:"]
-        for item in self.history:
-            if item["role"] == "assistant":
-                action = item["action"]
-                summary.append(
-                    f"- Asszisztens Lépés: {action.get('command')} "
-                    f"{action.get('arguments', '')}"
-                )
-            elif item["role"] == "system":
-                summary.append(f"- Rendszer Visszajelzés: {item['feedback']}")
-
-        return "\n".join(summary)
+        summary_line = self._summary_line()
+        if summary_line:
+            summary.append(summary_line)
+        summary.extend(lines)
+        self._formatted = "\n".join(summary)
+        return self._formatted
@@ -0,0 +1,347 @@
+"""Local validation and repair of the model's JSON decisions.
+
+Near misses (code fences, single quotes, trailing commas, ``"Click"`` instead
+of ``"kattints"``, ``"text"`` instead of ``"szoveg"``, ``"120"`` instead of
+``120``) are fixed here without another model round trip. Only a decision
+that cannot be repaired is reported as invalid.
+"""
+
+from __future__ import annotations
+
+import ast
+import difflib
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.program_catalog import normalize_name
+
+# Parancs -> {kanonikus argumentum: (elfogadott típusok, álnevek, kötelező)}
+COMMAND_SCHEMA: dict[str, dict[str, tuple[tuple[type, ...], tuple[str, ...], bool]]] = {
+    "kattints": {
+        # Koordináta nélkül a leírás alapján a memóriából is lehet kattintani.
+        "x": ((int,), ("left", "koordinata_x"), False),
+        "y": ((int,), ("top", "koordinata_y"), False),
+        "leiras": ((str,), ("description", "elem", "element", "element_name", "elem_leirasa", "label"), False),
+    },
+    "gepelj": {
+        "szoveg": ((str,), ("text", "content", "ertek", "value", "input"), True),
+    },
+    "nyomj_billentyut": {
+        "billentyuk": ((str, list), ("billentyu", "keys", "key", "hotkey", "kombinacio", "shortcut"), True),
+    },
+    "varj": {
+        "feltetel": ((str,), ("condition", "mode"), False),
+        "terulet": ((dict,), ("region", "area"), False),
+        "idokorlat": ((float,), ("timeout", "ido", "seconds", "masodperc"), False),
+        "stabil_ido": ((float,), ("stable_for",), False),
+        "minta": ((str,), ("template", "image"), False),
+    },
+    "indits_programot": {
+        "program_nev": ((str, list), ("program", "path", "command", "exe", "name", "nev", "app"), True),
+    },
+    "futtass_plugint": {
+        "plugin_nev": ((str,), ("plugin", "name", "nev"), True),
+    },
+    "valaszolj_a_felhasznalonak": {
+        "uzenet": ((str,), ("message", "text", "valasz", "answer"), False),
+    },
+    "kerj_jobb_minosegu_kepet": {
+        "leiras": ((str,), ("reason", "description", "indok"), False),
+    },
+    "feladat_befejezve": {
+        "uzenet": ((str,), ("message", "text", "summary"), False),
+    },
+}
+
+COMMAND_ALIASES: dict[str, str] = {
+    "click": "kattints",
+    "kattintas": "kattints",
+    "kattint": "kattints",
+    "type": "gepelj",
+    "type_text": "gepelj",
+    "write": "gepelj",
+    "irj": "gepelj",
+    "gepeld": "gepelj",
+    "press": "nyomj_billentyut",
+    "hotkey": "nyomj_billentyut",
+    "key": "nyomj_billentyut",
+    "keys": "nyomj_billentyut",
+    "billentyu": "nyomj_billentyut",
+    "nyomd_meg": "nyomj_billentyut",
+    "wait": "varj",
+    "varakozas": "varj",
+    "launch": "indits_programot",
+    "open": "indits_programot",
+    "start_program": "indits_programot",
+    "inditsd": "indits_programot",
+    "run_plugin": "futtass_plugint",
+    "plugin": "futtass_plugint",
+    "reply": "valaszolj_a_felhasznalonak",
+    "answer": "valaszolj_a_felhasznalonak",
+    "valaszolj": "valaszolj_a_felhasznalonak",
+    "zoom": "kerj_jobb_minosegu_kepet",
+    "higher_quality": "kerj_jobb_minosegu_kepet",
+    "jobb_kep": "kerj_jobb_minosegu_kepet",
+    "done": "feladat_befejezve",
+    "finish": "feladat_befejezve",
+    "finished": "feladat_befejezve",
+    "task_complete": "feladat_befejezve",
+    "kesz": "feladat_befejezve",
+}
+
+_COMMAND_KEYS = ("command", "parancs", "action", "cmd")
+_ARGUMENT_KEYS = ("arguments", "argumentumok", "args", "params", "parameters")
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_NUMBER = re.compile(r"-?\d+(?:[.,]\d+)?")
+
+
+@dataclass
+class ValidationResult:
+    """Outcome of validating one raw response."""
+
+    decision: dict[str, Any] | None
+    repairs: list[str] = field(default_factory=list)
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _canonical_key(name: Any) -> str:
+    return normalize_name(str(name)).replace(" ", "_")
+
+
+def parse_json_text(text: str) -> tuple[Any, list[str]]:
+    """Parse ``text`` as JSON, repairing common formatting mistakes; raise ``ValueError``."""
+
+    repairs: list[str] = []
+    candidate = text.strip()
+    try:
+        return json.loads(candidate), repairs
+    except json.JSONDecodeError:
+        pass
+
+    if candidate.startswith("```"):
+        candidate = re.sub(r"^```[a-zA-Z]*\s*|\s*```$", "", candidate)
+        repairs.append("kódblokk eltávolítva")
+
+    start = min((index for index in (candidate.find("{"), candidate.find("[")) if index >= 0), default=-1)
+    end = max(candidate.rfind("}"), candidate.rfind("]"))
+    if start > 0 or (start >= 0 and end < len(candidate) - 1):
+        candidate = candidate[start : end + 1]
+        repairs.append("JSON kivágva a szövegből")
+
+    without_commas = _TRAILING_COMMA.sub(r"\1", candidate)
+    if without_commas != candidate:
+        candidate = without_commas
+        repairs.append("fölösleges vessző törölve")
+    try:
+        return json.loads(candidate), repairs
+    except json.JSONDecodeError:
+        pass
+
+    # Egyszeres idézőjelek, True/False/None: Python-szótárként még értelmezhető.
+    try:
+        value = ast.literal_eval(candidate)
+    except (ValueError, SyntaxError, MemoryError, RecursionError) as exc:
+        raise ValueError(f"A válasz nem értelmezhető JSON-ként: {exc}") from exc
+    repairs.append("Python-literál JSON-ná alakítva")
+    return value, repairs
+
+
+def normalize_command(name: Any) -> str | None:
+    """Map a command name with different casing, accents or wording to a known command."""
+
+    if not isinstance(name, str) or not name.strip():
+        return None
+    key = _canonical_key(name)
+    if key in COMMAND_SCHEMA:
+        return key
+    if key in COMMAND_ALIASES:
+        return COMMAND_ALIASES[key]
+    close = difflib.get_close_matches(key, list(COMMAND_SCHEMA), n=1, cutoff=0.8)
+    return close[0] if close else None
+
+
+def _coerce(value: Any, types: tuple[type, ...]) -> Any:
+    """Convert ``value`` to one of ``types``; raise ``ValueError`` when impossible."""
+
+    if isinstance(value, bool):
+        raise ValueError("logikai érték nem megengedett")
+    if any(isinstance(value, kind) for kind in types) and not (int in types and isinstance(value, float)):
+        return value
+    if int in types or float in types:
+        if isinstance(value, (int, float)):
+            return int(round(value)) if int in types else float(value)
+        if isinstance(value, str):
+            match = _NUMBER.search(value)
+            if match:
+                number = float(match.group().replace(",", "."))
+                return int(round(number)) if int in types else number
+    if str in types and isinstance(value, (int, float)):
+        return str(value)
+    if list in types and isinstance(value, tuple):
+        return list(value)
+    raise ValueError(f"nem alakítható át ({type(value).__name__})")
+
+
+def _split_coordinates(arguments: dict[str, Any], repairs: list[str]) -> None:
+    """Pull ``x``/``y`` out of ``coords``/``position`` objects, pairs or "x, y" strings."""
+
+    if "x" in arguments and "y" in arguments:
+        return
+    for key in ("coords", "koordinatak", "position", "pozicio", "point"):
+        value = arguments.get(key)
+        if isinstance(value, dict) and "x" in value and "y" in value:
+            arguments.setdefault("x", value["x"])
+            arguments.setdefault("y", value["y"])
+        elif isinstance(value, (list, tuple)) and len(value) == 2:
+            arguments.setdefault("x", value[0])
+            arguments.setdefault("y", value[1])
+        elif isinstance(value, str) and len(_NUMBER.findall(value)) == 2:
+            x, y = _NUMBER.findall(value)
+            arguments.setdefault("x", x)
+            arguments.setdefault("y", y)
+        else:
+            continue
+        repairs.append(f"koordináták kiolvasva: {key}")
+        return
+
+
+def _shape(data: Any, repairs: list[str]) -> tuple[Any, dict[str, Any]]:
+    """Return ``(command, arguments)`` from the many shapes a decision may take."""
+
+    if isinstance(data, list) and data:
+        repairs.append("lista első eleme használva")
+        data = data[0]
+    if not isinstance(data, dict):
+        raise ValueError("A válasz nem JSON objektum.")
+
+    keys = {_canonical_key(key): key for key in data}
+    command_key = next((keys[name] for name in _COMMAND_KEYS if name in keys), None)
+    arguments_key = next((keys[name] for name in _ARGUMENT_KEYS if name in keys), None)
+
+    if command_key is None:
+        # {"kattints": {"x": 1, "y": 2}} alakú válasz
+        if len(data) == 1:
+            (name, value), = data.items()
+            if normalize_command(name) and isinstance(value, dict):
+                repairs.append("parancs kulcsként megadva")
+                return name, dict(value)
+        raise ValueError("Hiányzik a 'command' mező.")
+
+    if command_key != "command":
+        repairs.append(f"'{command_key}' -> 'command'")
+    arguments = data.get(arguments_key) if arguments_key else None
+    if arguments_key is not None and arguments_key != "arguments":
+        repairs.append(f"'{arguments_key}' -> 'arguments'")
+    if arguments is None:
+        arguments = {}
+    if not isinstance(arguments, dict):
+        raise ValueError("Az 'arguments' mezőnek objektumnak kell lennie.")
+    arguments = dict(arguments)
+
+    extras = {key: value for key, value in data.items() if key not in (command_key, arguments_key)}
+    if extras:
+        repairs.append("legfelső szintű argumentumok áthelyezve")
+        for key, value in extras.items():
+            arguments.setdefault(key, value)
+    return data[command_key], arguments
+
+
+def validate_decision(data: Any) -> ValidationResult:
+    """Validate an already parsed decision against ``COMMAND_SCHEMA``, repairing it in place."""
+
+    repairs: list[str] = []
+    try:
+        raw_command, arguments = _shape(data, repairs)
+    except ValueError as exc:
+        return ValidationResult(None, repairs, str(exc))
+
+    command = normalize_command(raw_command)
+    if command is None:
+        return ValidationResult(
+            {"command": raw_command, "arguments": arguments},
+            repairs,
+            f"Ismeretlen parancs: {raw_command}",
+        )
+    if command != raw_command:
+        repairs.append(f"parancs: {raw_command} -> {command}")
+
+    schema = COMMAND_SCHEMA[command]
+    if command == "kattints":
+        _split_coordinates(arguments, repairs)
+
+    normalized: dict[str, Any] = {}
+    for key, value in arguments.items():
+        canonical = _canonical_key(key)
+        target = next(
+            (name for name, (_, aliases, _) in schema.items() if canonical == name or canonical in aliases),
+            None,
+        )
+        if target is None:
+            normalized.setdefault(key, value)
+            continue
+        if target != key:
+            repairs.append(f"argumentum: {key} -> {target}")
+        # A kanonikus név elsőbbséget élvez az álnevekkel szemben.
+        if key == target or target not in normalized:
+            normalized[target] = value
+
+    for name, (types, _, required) in schema.items():
+        if name not in normalized or normalized[name] is None:
+            if required:
+                return ValidationResult(
+                    {"command": command, "arguments": normalized},
+                    repairs,
+                    f"A '{command}' parancshoz hiányzik a(z) '{name}' argumentum.",
+                )
+            normalized.pop(name, None)
+            continue
+        try:
+            coerced = _coerce(normalized[name], types)
+        except ValueError as exc:
+            return ValidationResult(
+                {"command": command, "arguments": normalized},
+                repairs,
+                f"A(z) '{name}' argumentum hibás: {exc}.",
+            )
+        if coerced != normalized[name] or type(coerced) is not type(normalized[name]):
+            repairs.append(f"típus: {name}")
+        normalized[name] = coerced
+
+    if command == "kattints" and not ({"x", "y"} <= normalized.keys() or normalized.get("leiras")):
+        return ValidationResult(
+            {"command": command, "arguments": normalized},
+            repairs,
+            "A 'kattints' parancshoz x és y koordináta vagy 'leiras' szükséges.",
+        )
+    return ValidationResult({"command": command, "arguments": normalized}, repairs)
+
+
+def validate_decision_text(text: str) -> ValidationResult:
+    """Parse and validate a raw model response."""
+
+    try:
+        data, repairs = parse_json_text(text)
+    except ValueError as exc:
+        return ValidationResult(None, [], str(exc))
+    result = validate_decision(data)
+    result.repairs[:0] = repairs
+    return result
+
+
+def schema_summary() -> str:
+    """Compact, text-only description of the valid commands for correction requests."""
+
+    lines = []
+    for command, arguments in COMMAND_SCHEMA.items():
+        parts = [
+            f"{name}{'' if required else '?'}: {'/'.join(kind.__name__ for kind in types)}"
+            for name, (types, _, required) in arguments.items()
+        ]
+        lines.append(f"- {command}: {{{', '.join(parts)}}}")
+    return "\n".join(lines)
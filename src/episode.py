@@ -0,0 +1,444 @@
+"""Record and replay complete assistant episodes.
+
+An episode file is gzip-compressed JSON. Large strings (screenshots, prompt
+history) are stored once in a content-addressed ``blobs`` table keyed by their
+SHA-256 hash, and the ``events`` list only references them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import gzip
+import hashlib
+import io
+import json
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from src.assistant import DesktopAssistant
+
+EPISODE_VERSION = 1
+
+
+def _hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EpisodeRecorder:
+    """Hook a ``DesktopAssistant`` and capture everything needed to replay a task."""
+
+    def __init__(self, task: str) -> None:
+        self.task = task
+        self.events: list[dict[str, Any]] = []
+        self.blobs: dict[str, str] = {}
+        self.memory: dict[str, Any] = {}
+        self.screen_size: tuple[int, int] = (0, 0)
+        self._hooks: list[tuple[object, str]] = []
+        self._last_raw_response: str | None = None
+        self._last_error: dict[str, Any] | None = None
+        self._executing = False
+        self._started = time.perf_counter()
+
+    def _store_blob(self, text: str) -> str:
+        key = _hash_text(text)
+        self.blobs.setdefault(key, text)
+        return key
+
+    def _event(self, kind: str, **payload: Any) -> None:
+        self.events.append(
+            {"type": kind, "t": round(time.perf_counter() - self._started, 4), **payload}
+        )
+
+    def _hook(self, target: object, name: str, wrapper_factory: Callable[[Callable], Callable]) -> None:
+        original = getattr(target, name)
+        setattr(target, name, wrapper_factory(original))
+        self._hooks.append((target, name))
+
+    def attach(self, assistant: DesktopAssistant) -> None:
+        """Install the recording hooks on the assistant's handlers."""
+
+        from src.resilience import classify_error
+
+        self.memory = assistant.memory_handler._load_memory()
+        interface = assistant.computer_interface
+        self.screen_size = (interface.screen_width, interface.screen_height)
+
+        def screen_hook(original: Callable) -> Callable:
+            def wrapper(detail_level: str = "low") -> dict:
+                started = time.perf_counter()
+                state = original(detail_level=detail_level)
+                self._event(
+                    "screen",
+                    detail=detail_level,
+                    image=self._store_blob(state.get("image_data", "")),
+                    width=state.get("width", 0),
+                    height=state.get("height", 0),
+                    duration=round(time.perf_counter() - started, 4),
+                )
+                return state
+
+            return wrapper
+
+        def provider_hook(original: Callable) -> Callable:
+            def wrapper(*args: Any, **kwargs: Any):
+                try:
+                    response = original(*args, **kwargs)
+                except Exception as exc:
+                    error = classify_error(exc)
+                    self._last_error = {"kind": error.kind, "message": str(error)}
+                    raise
+                self._last_raw_response = response.content
+                self._last_error = None
+                return response
+
+            return wrapper
+
+        def decision_hook(original: Callable) -> Callable:
+            def wrapper(user_prompt: str, screen_info: dict | None, *args: Any, **kwargs: Any) -> dict:
+                self._last_raw_response = None
+                self._last_error = None
+                started = time.perf_counter()
+                decision = original(user_prompt, screen_info, *args, **kwargs)
+                route = kwargs.get("route")
+                self._event(
+                    "decision",
+                    history=self._store_blob(str(kwargs.get("history", ""))),
+                    detail=kwargs.get("detail_level", "low"),
+                    route=getattr(route, "name", None),
+                    raw=self._last_raw_response,
+                    error=self._last_error if self._last_raw_response is None else None,
+                    decision=decision,
+                    duration=round(time.perf_counter() - started, 4),
+                )
+                return decision
+
+            return wrapper
+
+        def execute_hook(original: Callable) -> Callable:
+            def wrapper(command: str, arguments: dict) -> dict:
+                started = time.perf_counter()
+                self._executing = True
+                try:
+                    result = original(command, arguments)
+                finally:
+                    self._executing = False
+                self._event(
+                    "execute",
+                    command=command,
+                    arguments=arguments,
+                    result=result,
+                    duration=round(time.perf_counter() - started, 4),
+                )
+                return result
+
+            return wrapper
+
+        def click_hook(original: Callable) -> Callable:
+            def wrapper(x: int, y: int, *args: Any, **kwargs: Any) -> dict:
+                if self._executing:
+                    # A 'kattints' parancs kattintása már az execute eseményben szerepel.
+                    return original(x, y, *args, **kwargs)
+                started = time.perf_counter()
+                result = original(x, y, *args, **kwargs)
+                self._event(
+                    "click",
+                    x=x,
+                    y=y,
+                    result=result,
+                    duration=round(time.perf_counter() - started, 4),
+                )
+                return result
+
+            return wrapper
+
+        def plugin_hook(original: Callable) -> Callable:
+            def wrapper(name: str, *args: Any, **kwargs: Any):
+                try:
+                    result = original(name, *args, **kwargs)
+                except Exception as exc:
+                    self._event("plugin", name=name, error=str(exc))
+                    raise
+                self._event("plugin", name=name, error=None)
+                return result
+
+            return wrapper
+
+        self._hook(assistant.computer_interface, "get_screen_state", screen_hook)
+        self._hook(assistant.ai_handler.provider, "complete", provider_hook)
+        self._hook(assistant.ai_handler, "get_ai_decision", decision_hook)
+        self._hook(assistant.computer_interface, "execute_command", execute_hook)
+        self._hook(assistant.computer_interface, "click_at", click_hook)
+        self._hook(assistant.plugin_handler, "execute_plugin", plugin_hook)
+
+    def detach(self) -> None:
+        """Remove the hooks, restoring the original bound methods."""
+
+        for target, name in reversed(self._hooks):
+            try:
+                delattr(target, name)
+            except AttributeError:
+                pass
+        self._hooks.clear()
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": EPISODE_VERSION,
+            "task": self.task,
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+            "memory": self.memory,
+            "screen_size": list(self.screen_size),
+            "events": self.events,
+            "blobs": self.blobs,
+        }
+
+    def save(self, path: str | Path) -> Path:
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(target, "wt", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, ensure_ascii=False, separators=(",", ":"))
+        return target
+
+    def save_to_directory(self, directory: str | Path) -> Path:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        digest = _hash_text(self.task)[:8]
+        return self.save(Path(directory) / f"{stamp}-{digest}.episode.json.gz")
+
+
+def load_episode(path: str | Path) -> dict[str, Any]:
+    with gzip.open(Path(path), "rt", encoding="utf-8") as file:
+        data = json.load(file)
+    if not isinstance(data, dict) or data.get("version") != EPISODE_VERSION:
+        raise ValueError(f"Nem támogatott epizódfájl: {path}")
+    return data
+
+
+@dataclass
+class ReplayReport:
+    """Timings and consistency information of one replay run."""
+
+    task: str
+    wall_time: float = 0.0
+    iterations: int = 0
+    stage_times: dict[str, float] = field(default_factory=dict)
+    divergences: list[str] = field(default_factory=list)
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        self.stage_times[stage] = self.stage_times.get(stage, 0.0) + seconds
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "task": self.task,
+            "wall_time": round(self.wall_time, 4),
+            "iterations": self.iterations,
+            "stage_times": {stage: round(value, 4) for stage, value in self.stage_times.items()},
+            "divergences": self.divergences,
+        }
+
+
+class EpisodeReplayer:
+    """Drive ``DesktopAssistant.start_task`` from a recorded episode.
+
+    Screenshots are fed back through the real capture/encode pipeline, the
+    recorded raw responses through the real prompt building and parsing code,
+    while command execution and plugins return their recorded results. No
+    display, input device or network access is needed.
+    """
+
+    def __init__(self, episode: dict[str, Any]) -> None:
+        self.episode = episode
+        self.events = episode.get("events", [])
+        self.blobs = episode.get("blobs", {})
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> EpisodeReplayer:
+        return cls(load_episode(path))
+
+    def _events_of(self, kind: str) -> list[dict[str, Any]]:
+        return [event for event in self.events if event.get("type") == kind]
+
+    def _decode_frames(self) -> list[Any]:
+        from PIL import Image
+
+        frames = []
+        for event in self._events_of("screen"):
+            image_data = self.blobs.get(event.get("image", ""), "")
+            if image_data:
+                with Image.open(io.BytesIO(base64.b64decode(image_data))) as image:
+                    frames.append(image.convert("RGB"))
+            else:
+                frames.append(Image.new("RGB", (max(1, event.get("width", 1)), max(1, event.get("height", 1)))))
+        return frames
+
+    def run(self) -> ReplayReport:
+        from src.ai_handler import AIHandler
+        from src.assistant import DesktopAssistant
+        from src.computer_interface import ComputerInterface
+        from src.input_backends import RecordingBackend
+        from src.llm_providers import ScriptedProvider
+        from src.memory_handler import MemoryHandler
+        from src.metrics_store import MetricsStore
+        from src.plugin_handler import PluginHandler
+        from src.program_catalog import ProgramCatalog
+        from src.resilience import ApiError, CircuitBreaker, ResilientCaller, RetryPolicy, TokenBucket
+
+        report = ReplayReport(task=self.episode.get("task", ""))
+        width, height = self.episode.get("screen_size") or (0, 0)
+        screen_size = (int(width), int(height)) if width and height else RecordingBackend.size
+        frames = self._decode_frames()
+        frame_iter = iter(frames)
+        last_frame = {"image": frames[0] if frames else None}
+
+        def grabber(region):
+            image = next(frame_iter, last_frame["image"])
+            last_frame["image"] = image
+            if image is None:
+                from PIL import Image
+
+                image = Image.new("RGB", (1, 1))
+            if region is not None:
+                left, top, width, height = region
+                return image.crop((left, top, left + width, top + height))
+            return image
+
+        raw_responses: list[str | dict | ApiError] = []
+        for event in self._events_of("decision"):
+            if event.get("raw") is not None:
+                raw_responses.append(event["raw"])
+            elif event.get("error"):
+                # A szolgáltató hibáját hibaként kell visszajátszani, nem modellválaszként.
+                raw_responses.append(ApiError(event["error"]["kind"], event["error"]["message"]))
+            # Egyébként a hiba még a kérés előtt keletkezett, a visszajátszás is ott hibázik.
+        executions = iter(self._events_of("execute"))
+        clicks = iter(self._events_of("click"))
+        plugin_calls = iter(self._events_of("plugin"))
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            memory_path = temp_path / "gui_elements.json"
+            memory_path.write_text(json.dumps(self.episode.get("memory", {})), encoding="utf-8")
+
+            catalog = ProgramCatalog(
+                temp_path / "programs.json",
+                temp_path / "program_index.json",
+                path_dirs=[],
+                desktop_dirs=[],
+                start_menu_dirs=[],
+            )
+            computer_interface = ComputerInterface(
+                # A koordináták skálázása a képernyőmérettől függ, ezért a rögzítettet használjuk.
+                input_backend=RecordingBackend(size=screen_size),
+                screen_grabber=grabber,
+                program_catalog=catalog,
+            )
+            # A rögzített képkockák sorban fogynak: a helyi ellenőrzés felélné őket,
+            # és minden kattintás a teljes időkorlátig várna, majd újrapróbálna.
+            computer_interface.verify_actions = False
+            assistant = DesktopAssistant(
+                ai_handler=AIHandler(
+                    provider=ScriptedProvider(responses=raw_responses, latency=0.0, jitter=0.0),
+                    metrics_store=MetricsStore(temp_path / "usage_metrics.jsonl"),
+                    # A rögzített hibák már az újrapróbálások eredményei: egyetlen
+                    # hívásként, várakozás és közös megszakító nélkül játszódnak le.
+                    resilience=ResilientCaller(
+                        policy=RetryPolicy(max_retries=0),
+                        limiter=TokenBucket(0),
+                        breaker=CircuitBreaker(failure_threshold=0),
+                    ),
+                ),
+                computer_interface=computer_interface,
+                memory_handler=MemoryHandler(memory_path),
+                plugin_handler=PluginHandler(),
+                listen_for_keyboard=False,
+            )
+
+            def replay_execute(command: str, arguments: dict) -> dict:
+                recorded = next(executions, None)
+                if recorded is None:
+                    report.divergences.append(f"Nem rögzített végrehajtás: {command}")
+                    return {"success": False, "error": "A felvétel nem tartalmaz több végrehajtást."}
+                if recorded.get("command") != command:
+                    report.divergences.append(
+                        f"Eltérő parancs: rögzített {recorded.get('command')}, most {command}"
+                    )
+                return recorded.get("result", {"success": True})
+
+            def replay_click(x: int, y: int, *args: Any, **kwargs: Any) -> dict:
+                recorded = next(clicks, None)
+                if recorded is None:
+                    report.divergences.append(f"Nem rögzített kattintás: ({x}, {y})")
+                    return {"success": False, "error": "A felvétel nem tartalmaz több kattintást."}
+                if (recorded.get("x"), recorded.get("y")) != (x, y):
+                    report.divergences.append(
+                        f"Eltérő kattintás: rögzített ({recorded.get('x')}, {recorded.get('y')}), most ({x}, {y})"
+                    )
+                return recorded.get("result", {"success": True})
+
+            def replay_plugin(name: str, *args: Any, **kwargs: Any) -> None:
+                recorded = next(plugin_calls, None)
+                if recorded is None or recorded.get("name") != name:
+                    report.divergences.append(f"Eltérő plugin hívás: {name}")
+                    return None
+                if recorded.get("error"):
+                    raise RuntimeError(recorded["error"])
+                return None
+
+            computer_interface.execute_command = replay_execute
+            computer_interface.click_at = replay_click
+            assistant.plugin_handler.execute_plugin = replay_plugin
+            self._time_stage(report, computer_interface, "get_screen_state", "screen")
+            self._time_stage(report, assistant.ai_handler, "get_ai_decision", "decision")
+            self._time_stage(report, computer_interface, "execute_command", "execute")
+            self._time_stage(report, computer_interface, "click_at", "click")
+
+            started = time.perf_counter()
+            assistant.start_task(report.task)
+            report.wall_time = time.perf_counter() - started
+
+        report.iterations = assistant.ai_handler.provider.request_count
+        if report.iterations != len(raw_responses):
+            report.divergences.append(
+                f"Eltérő lépésszám: rögzített {len(raw_responses)}, most {report.iterations}"
+            )
+        return report
+
+    @staticmethod
+    def _time_stage(report: ReplayReport, target: object, name: str, stage: str) -> None:
+        original = getattr(target, name)
+
+        def timed(*args: Any, **kwargs: Any):
+            started = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                report.add_time(stage, time.perf_counter() - started)
+
+        setattr(target, name, timed)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Rögzített epizódok visszajátszása.")
+    parser.add_argument("episodes", nargs="+", help="*.episode.json.gz fájlok")
+    parser.add_argument("--repeat", type=int, default=1, help="Ismétlések száma epizódonként")
+    args = parser.parse_args(argv)
+
+    exit_code = 0
+    for path in args.episodes:
+        replayer = EpisodeReplayer.from_file(path)
+        for run in range(args.repeat):
+            report = replayer.run()
+            print(json.dumps({"episode": path, "run": run, **report.to_dict()}, ensure_ascii=False))
+            if report.divergences:
+                exit_code = 1
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,350 @@
+"""Run independent tasks in parallel, one worker process per virtual X display.
+
+Usage::
+
+    python -m src.fleet tasks.txt --workers 4 [--size 1920x1080] [--output results.jsonl]
+    python -m src.fleet tasks.txt --displays :1 :2   # already running displays
+
+Every worker gets its own Xvfb server (unless ``--displays`` is given), XTEST
+input backend, screen grabber, memory file, program index and usage metrics
+under ``FLEET_DIR/worker-<n>``. Tasks are read in the same format as
+``src.headless`` and handed out from a shared queue; results are written as
+JSON lines tagged with the worker that ran them. The API rate limiter and
+circuit breaker are shared by all workers, so ``API_RATE_LIMIT_PER_MIN`` caps
+the whole fleet, not each worker.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+from src.config import FLEET_DIR
+from src.headless import (
+    EXIT_INTERRUPTED,
+    EXIT_NO_TASKS,
+    EXIT_OK,
+    EXIT_SETUP_FAILED,
+    EXIT_TASK_FAILED,
+    HeadlessRunner,
+    TaskSpec,
+    iter_task_sources,
+)
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+    from src.assistant import DesktopAssistant
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+class VirtualDisplay:
+    """An Xvfb server started for one worker and stopped with it."""
+
+    def __init__(self, number: int, size: tuple[int, int] = (1920, 1080), depth: int = 24) -> None:
+        self.number = number
+        self.size = size
+        self.depth = depth
+        self._process: subprocess.Popen | None = None
+
+    @property
+    def name(self) -> str:
+        return f":{self.number}"
+
+    @staticmethod
+    def free_numbers(count: int, start: int) -> list[int]:
+        """Return ``count`` display numbers from ``start`` that have no X lock file."""
+
+        numbers = []
+        number = start
+        while len(numbers) < count:
+            if not Path(f"/tmp/.X{number}-lock").exists():
+                numbers.append(number)
+            number += 1
+        return numbers
+
+    def start(self, timeout: float = 10.0) -> None:
+        executable = shutil.which("Xvfb")
+        if executable is None:
+            raise RuntimeError(
+                "Az Xvfb nem található; telepítsd, vagy adj meg kijelzőket a --displays kapcsolóval."
+            )
+        width, height = self.size
+        self._process = subprocess.Popen(
+            [executable, self.name, "-screen", "0", f"{width}x{height}x{self.depth}", "-nolisten", "tcp"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        socket = Path(f"/tmp/.X11-unix/X{self.number}")
+        deadline = time.monotonic() + timeout
+        while not socket.exists():
+            if self._process.poll() is not None or time.monotonic() > deadline:
+                self.stop()
+                raise RuntimeError(f"Nem sikerült elindítani az Xvfb-t a(z) {self.name} kijelzőn.")
+            time.sleep(0.05)
+
+    def stop(self) -> None:
+        if self._process is None:
+            return
+        self._process.terminate()
+        try:
+            self._process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+        self._process = None
+
+    def __enter__(self) -> VirtualDisplay:
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+
+@dataclass
+class WorkerStats:
+    """Per-worker totals reported when the worker exits."""
+
+    worker: int
+    display: str
+    tasks: int = 0
+    completed: int = 0
+    busy_time: float = 0.0
+    tokens: int = 0
+    cost_usd: float = 0.0
+    error: str | None = None
+
+
+def _grab_display(display_name: str, region: tuple[int, int, int, int] | None) -> Image.Image:
+    from PIL import ImageGrab
+
+    bbox = None
+    if region is not None:
+        left, top, width, height = region
+        bbox = (left, top, left + width, top + height)
+    return ImageGrab.grab(bbox=bbox, xdisplay=display_name)
+
+
+def build_worker_assistant(display_name: str, worker_dir: Path) -> DesktopAssistant:
+    """Assemble an assistant bound to one display and one private state directory."""
+
+    from src.ai_handler import AIHandler
+    from src.assistant import DesktopAssistant
+    from src.computer_interface import ComputerInterface
+    from src.input_backends import XTestBackend
+    from src.memory_handler import MemoryHandler
+    from src.metrics_store import MetricsStore
+    from src.program_catalog import ProgramCatalog
+
+    catalog = ProgramCatalog(ROOT_DIR / "programs.json", worker_dir / "program_index.json")
+    catalog.start_background_build()
+    return DesktopAssistant(
+        ai_handler=AIHandler(metrics_store=MetricsStore(worker_dir / "usage_metrics.jsonl")),
+        computer_interface=ComputerInterface(
+            input_backend=XTestBackend(display_name=display_name),
+            screen_grabber=lambda region: _grab_display(display_name, region),
+            program_catalog=catalog,
+        ),
+        memory_handler=MemoryHandler(worker_dir / "gui_elements.json"),
+        listen_for_keyboard=False,
+    )
+
+
+def _worker_main(
+    worker: int,
+    display_number: int | None,
+    display_name: str,
+    size: tuple[int, int],
+    fleet_dir: str,
+    tasks: multiprocessing.Queue,
+    results: multiprocessing.Queue,
+    assistant_factory: Callable[[str, Path], DesktopAssistant],
+    api_state: tuple[Any, Any] | None = None,
+) -> None:
+    # A gyermekfolyamatok (indits_programot) is ezen a kijelzőn nyílnak meg.
+    os.environ["DISPLAY"] = display_name
+    if api_state is not None:
+        from src.resilience import shared_circuit_breaker, shared_rate_limiter
+
+        # Minden munkafolyamat ugyanabból a keretből fogyaszt, és közös a megszakító is.
+        limiter_state, breaker_state = api_state
+        shared_rate_limiter.attach(limiter_state)
+        shared_circuit_breaker.attach(breaker_state)
+    worker_dir = Path(fleet_dir) / f"worker-{worker}"
+    worker_dir.mkdir(parents=True, exist_ok=True)
+    stats = WorkerStats(worker=worker, display=display_name)
+
+    with contextlib.ExitStack() as stack, contextlib.redirect_stdout(sys.stderr):
+        runner: HeadlessRunner | None = None
+        try:
+            if display_number is not None:
+                stack.enter_context(VirtualDisplay(display_number, size))
+            runner = HeadlessRunner(lambda: assistant_factory(display_name, worker_dir))
+            stack.callback(runner.close)
+            runner.assistant
+        except Exception as exc:
+            stats.error = str(exc)
+            print(f"[{worker}] A munkafolyamat nem indult el: {exc}", file=sys.stderr)
+
+        while stats.error is None:
+            item = tasks.get()
+            if item is None:
+                break
+            spec = TaskSpec(**item)
+            try:
+                result = runner.run(spec)
+            except KeyboardInterrupt:
+                break
+            stats.tasks += 1
+            stats.completed += result["success"]
+            stats.busy_time += result["wall_time"]
+            stats.tokens += result.get("usage", {}).get("tokens", 0)
+            stats.cost_usd += result.get("usage", {}).get("cost_usd", 0.0)
+            results.put({"type": "result", "worker": worker, "display": display_name, **result})
+
+    results.put({"type": "worker", **asdict(stats)})
+
+
+def run_fleet(
+    specs: list[TaskSpec],
+    workers: int,
+    output: IO[str],
+    size: tuple[int, int] = (1920, 1080),
+    displays: list[str] | None = None,
+    display_base: int = 90,
+    fleet_dir: Path | None = None,
+    assistant_factory: Callable[[str, Path], DesktopAssistant] = build_worker_assistant,
+) -> tuple[int, int, list[dict[str, Any]]]:
+    """Run ``specs`` on ``workers`` processes; return ``(total, completed, worker stats)``."""
+
+    fleet_dir = fleet_dir or (Path(FLEET_DIR) if FLEET_DIR else ROOT_DIR / "fleet")
+    if displays:
+        workers = len(displays)
+        assignments: list[tuple[int | None, str]] = [(None, name) for name in displays]
+    else:
+        numbers = VirtualDisplay.free_numbers(workers, display_base)
+        assignments = [(number, f":{number}") for number in numbers]
+
+    # A "spawn" tiszta folyamatot ad: nincs örökölt Qt- vagy X-kapcsolat.
+    context = multiprocessing.get_context("spawn")
+    task_queue = context.Queue()
+    result_queue = context.Queue()
+    for spec in specs:
+        task_queue.put(asdict(spec))
+    for _ in assignments:
+        task_queue.put(None)
+
+    from src.resilience import shared_circuit_breaker, shared_rate_limiter
+
+    api_state = (
+        shared_rate_limiter.new_shared_state(context),
+        shared_circuit_breaker.new_shared_state(context),
+    )
+    processes = [
+        context.Process(
+            target=_worker_main,
+            name=f"ordenador-worker-{index}",
+            args=(index, number, name, size, str(fleet_dir), task_queue, result_queue, assistant_factory, api_state),
+        )
+        for index, (number, name) in enumerate(assignments)
+    ]
+    for process in processes:
+        process.start()
+
+    total = completed = 0
+    worker_stats: list[dict[str, Any]] = []
+    try:
+        while len(worker_stats) < len(processes):
+            try:
+                message = result_queue.get(timeout=1.0)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    break
+                continue
+            if message.pop("type") == "worker":
+                worker_stats.append(message)
+                continue
+            total += 1
+            completed += message["success"]
+            output.write(json.dumps(message, ensure_ascii=False) + "\n")
+            output.flush()
+    finally:
+        # Ha egy munkafolyamat nem indult el, a ki nem osztott feladatok ne tartsák fel a kilépést.
+        task_queue.cancel_join_thread()
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+    return total, completed, sorted(worker_stats, key=lambda stats: stats["worker"])
+
+
+def _parse_size(value: str) -> tuple[int, int]:
+    width, height = value.lower().split("x", 1)
+    return int(width), int(height)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Párhuzamos feladatfuttatás virtuális kijelzőkön.")
+    parser.add_argument("tasks", nargs="*", default=["-"], help="Feladatfájlok, '-' = szabványos bemenet")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--size", type=_parse_size, default=(1920, 1080), help="Kijelzőméret, pl. 1920x1080")
+    parser.add_argument("--displays", nargs="+", default=None, help="Már futó kijelzők Xvfb indítása helyett")
+    parser.add_argument("--display-base", type=int, default=90, help="Az első kipróbált kijelzőszám")
+    parser.add_argument("--output", type=Path, default=None, help="JSON lines eredményfájl (alapból stdout)")
+    args = parser.parse_args(argv)
+
+    specs = list(iter_task_sources(args.tasks))
+    if not specs:
+        return EXIT_NO_TASKS
+
+    output: IO[str] = args.output.open("a", encoding="utf-8") if args.output else sys.stdout
+    started = time.perf_counter()
+    try:
+        total, completed, worker_stats = run_fleet(
+            specs,
+            max(1, min(args.workers, len(specs))),
+            output,
+            size=args.size,
+            displays=args.displays,
+            display_base=args.display_base,
+        )
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    elapsed = time.perf_counter() - started
+
+    for stats in worker_stats:
+        utilisation = stats["busy_time"] / elapsed if elapsed else 0.0
+        print(
+            f"[{stats['worker']}] {stats['display']}: {stats['completed']}/{stats['tasks']} sikeres, "
+            f"kihasználtság {utilisation:.0%}, {stats['tokens']} token, ${stats['cost_usd']:.4f}"
+            + (f", hiba: {stats['error']}" if stats["error"] else ""),
+            file=sys.stderr,
+        )
+    print(
+        f"{completed}/{total} feladat sikeres {len(worker_stats)} munkafolyamattal, {elapsed:.1f} mp "
+        f"({total / elapsed * 60 if elapsed else 0:.1f} feladat/perc)",
+        file=sys.stderr,
+    )
+    if not total and worker_stats and all(stats["error"] for stats in worker_stats):
+        return EXIT_SETUP_FAILED
+    return EXIT_OK if completed == total == len(specs) else EXIT_TASK_FAILED
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,20 @@
 """GUI package providing application windows and widgets."""
 
-from .main_window import MainWindow
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .main_window import MainWindow
 
 __all__ = ["MainWindow"]
+
+
+def __getattr__(name: str):
+    # A MainWindow az asszisztens teljes láncát importálja, ezért csak igény
+    # szerint töltjük be; így a widgetek körkörös import nélkül is elérhetők.
+    if name == "MainWindow":
+        from .main_window import MainWindow
+
+        return MainWindow
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
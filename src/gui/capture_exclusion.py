@@ -0,0 +1,124 @@
+"""Keep the assistant's own windows out of the screenshots sent to the model."""
+
+from __future__ import annotations
+
+import sys
+import threading
+from typing import TYPE_CHECKING
+
+from PySide6.QtCore import QEvent, QObject, QPoint, QRect
+from PySide6.QtWidgets import QWidget
+
+from src.config import CAPTURE_EXCLUDE_OWN_WINDOWS
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+# Windows 10 2004 óta: az ablak látszik a képernyőn, de a képernyőképeken nem.
+WDA_EXCLUDEFROMCAPTURE = 0x11
+MASK_COLOR = (128, 128, 128)
+
+Rect = tuple[int, int, int, int]
+
+
+class CaptureExclusion(QObject):
+    """Registry of own widgets that must not appear in captures.
+
+    Where the platform supports it the window is excluded from capture
+    natively, so nothing is hidden or repainted and nothing flickers.
+    Otherwise the widget's on-screen geometry is tracked from its show, move,
+    resize and hide events, and ``mask`` paints over it in the captured frame.
+    ``mask`` runs on the worker thread, so the geometry lives under a lock.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        super().__init__()
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._rects: dict[int, Rect] = {}
+        self._native: set[int] = set()
+
+    def register(self, widget: QWidget) -> None:
+        """Track ``widget``; call from the GUI thread, typically in its constructor."""
+
+        if not self.enabled:
+            return
+        widget.installEventFilter(self)
+        key = id(widget)
+        widget.destroyed.connect(lambda _=None, key=key: self._forget(key))
+        if widget.isVisible():
+            self._update(widget)
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:  # noqa: N802 - Qt API naming convention
+        kind = event.type()
+        if kind in (QEvent.Show, QEvent.Move, QEvent.Resize):
+            self._update(watched)
+        elif kind == QEvent.Hide:
+            with self._lock:
+                self._rects.pop(id(watched), None)
+        return False
+
+    def _forget(self, key: int) -> None:
+        with self._lock:
+            self._rects.pop(key, None)
+            self._native.discard(key)
+
+    def _update(self, widget: QWidget) -> None:
+        key = id(widget)
+        if key in self._native or (widget.isWindow() and self._exclude_natively(widget)):
+            self._native.add(key)
+            return
+        geometry = widget.frameGeometry() if widget.isWindow() else QRect(widget.mapToGlobal(QPoint(0, 0)), widget.size())
+        # A Qt logikai képpontokban számol, a képernyőkép fizikai képpontokban készül.
+        ratio = widget.devicePixelRatioF()
+        rect = (
+            round(geometry.x() * ratio),
+            round(geometry.y() * ratio),
+            round(geometry.width() * ratio),
+            round(geometry.height() * ratio),
+        )
+        with self._lock:
+            self._rects[key] = rect
+
+    @staticmethod
+    def _exclude_natively(widget: QWidget) -> bool:
+        if sys.platform != "win32":
+            return False
+        try:
+            import ctypes
+
+            return bool(ctypes.windll.user32.SetWindowDisplayAffinity(int(widget.winId()), WDA_EXCLUDEFROMCAPTURE))
+        except (AttributeError, OSError):
+            return False
+
+    def visible_rects(self) -> list[Rect]:
+        with self._lock:
+            return list(self._rects.values())
+
+    def mask(self, image: Image.Image, region: Rect | None = None) -> Image.Image:
+        """Paint over tracked windows inside ``image``, captured at ``region``."""
+
+        rects = self.visible_rects() if self.enabled else []
+        if not rects:
+            return image
+        offset_x, offset_y = (region[0], region[1]) if region is not None else (0, 0)
+        draw = None
+        for left, top, width, height in rects:
+            box = (
+                max(0, left - offset_x),
+                max(0, top - offset_y),
+                min(image.width, left - offset_x + width),
+                min(image.height, top - offset_y + height),
+            )
+            if box[0] >= box[2] or box[1] >= box[3]:
+                continue
+            if draw is None:
+                from PIL import ImageDraw
+
+                image = image.convert("RGB") if image.mode not in ("RGB", "RGBA") else image
+                draw = ImageDraw.Draw(image)
+            draw.rectangle((box[0], box[1], box[2] - 1, box[3] - 1), fill=MASK_COLOR)
+        return image
+
+
+capture_exclusion = CaptureExclusion(enabled=CAPTURE_EXCLUDE_OWN_WINDOWS)
@@ -0,0 +1,95 @@
+"""Bounded log model for the overlay with thread-safe, batched appends."""
+
+from __future__ import annotations
+
+import shutil
+import tempfile
+import threading
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QObject, Qt
+
+
+class RingLogModel(QAbstractListModel):
+    """Keeps the last ``capacity`` lines for display; the whole log is spilled to a temp file.
+
+    ``append`` may be called from any thread and only queues the line;
+    ``flush`` runs on the GUI thread (from a timer) and inserts everything
+    queued since the last flush as a single row batch, so the view repaints
+    once per batch instead of once per message.
+    """
+
+    def __init__(self, capacity: int = 2000, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.capacity = max(1, capacity)
+        self._rows: deque[str] = deque()
+        self._pending: list[tuple[datetime, str]] = []
+        self._lock = threading.Lock()
+        self._spill = tempfile.TemporaryFile("w+", encoding="utf-8")
+        self.dropped = 0
+        self.total = 0
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:  # noqa: N802 - Qt API naming convention
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if role == Qt.DisplayRole and index.isValid() and 0 <= index.row() < len(self._rows):
+            return self._rows[index.row()]
+        return None
+
+    def append(self, text: str) -> None:
+        with self._lock:
+            self._pending.append((datetime.now(), str(text)))
+
+    def flush(self) -> int:
+        """Move queued lines into the model; return how many were added."""
+
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+
+        self._spill.writelines(f"{stamp:%H:%M:%S} {text}\n" for stamp, text in batch)
+        self.total += len(batch)
+        lines = [text for _, text in batch][-self.capacity:]
+
+        overflow = len(self._rows) + len(lines) - self.capacity
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            for _ in range(overflow):
+                self._rows.popleft()
+            self.endRemoveRows()
+        self.dropped = self.total - len(self._rows) - len(lines)
+
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(lines) - 1)
+        self._rows.extend(lines)
+        self.endInsertRows()
+        return len(batch)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pending = []
+        self.beginResetModel()
+        self._rows.clear()
+        self.endResetModel()
+        self._spill.seek(0)
+        self._spill.truncate()
+        self.dropped = self.total = 0
+
+    def export(self, path: str | Path) -> int:
+        """Write every line since the last ``clear`` (with timestamps) to ``path``."""
+
+        self.flush()
+        self._spill.flush()
+        self._spill.seek(0)
+        with Path(path).open("w", encoding="utf-8") as file:
+            shutil.copyfileobj(self._spill, file)
+        self._spill.seek(0, 2)
+        return self.total
+
+    def lines(self) -> list[str]:
+        return list(self._rows)
@@ -1,126 +1,261 @@
 # src/gui/main_window.py
 
-from PySide6.QtCore import QThread, Signal, Slot
+import time
+
+from PySide6.QtCore import QMetaObject, Qt, QThread, QTimer, Signal, Slot
 from PySide6.QtWidgets import (
-    QApplication, QInputDialog, QLineEdit, QMainWindow,
+    QApplication, QCheckBox, QInputDialog, QLineEdit, QMainWindow,
     QPushButton, QSystemTrayIcon, QVBoxLayout, QWidget, QStyle
 )
 from PySide6.QtGui import QIcon
 
-from src.assistant import DesktopAssistant
 from src.gui.click_interceptor import ClickInterceptor
+from src.gui.overlay_proxy import overlay_proxy
 from src.gui.overlay_window import OverlayWindow
+from src.hotkeys import hotkey_service
 from src.memory_handler import MemoryHandler
+from src.task_queue import (
+    PRIORITY_NORMAL, PRIORITY_URGENT, TASK_KIND_CALIBRATION, TASK_KIND_TASK, TaskQueueService
+)
 
 class MainWindow(QMainWindow):
     stop_task_requested = Signal() # Csak a leállításhoz kell jel
 
-    def __init__(self):
+    def __init__(self, assistant_factory=None):
         super().__init__()
         self.setWindowTitle("Ordenador")
 
+        # Az asszisztens a munkaszálon, az első képkocka után készül el (lásd _finish_startup).
+        self._assistant_factory = assistant_factory
         self.assistant = None
         self.assistant_thread = None
+        self.task_service = None
         self.click_interceptor = None
         self.memory_handler = MemoryHandler()
 
         self._setup_ui()
         self.overlay = OverlayWindow(self)
         self.tray_icon = QSystemTrayIcon(self)
+        # A várakozási idők kijelzését másodpercenként frissítjük, amíg az overlay látszik.
+        self.queue_timer = QTimer(self)
+        self.queue_timer.setInterval(1000)
         self._setup_connections()
 
+        # Ami az első megjelenéshez nem kell, az az első kirajzolt képkocka után fut (paintEvent).
+        self._startup_scheduled = False
+
+    def paintEvent(self, event):  # noqa: N802 - Qt API naming convention
+        super().paintEvent(event)
+        if not self._startup_scheduled:
+            self._startup_scheduled = True
+            # A 0 ms-os időzítő a kirajzolás és a képernyőre írás után jelez.
+            QTimer.singleShot(0, self._finish_startup)
+
+    def _finish_startup(self):
+        # A globális gyorsbillentyűk induláskor egyszer indulnak, és minden feladat osztozik rajtuk.
+        hotkey_service.add_macro_handler(self._on_macro_hotkey)
+        hotkey_service.start()
+        # Az asszisztens (API-kliens, bemeneti háttér, pluginok) a munkaszálon készül el,
+        # így az első feladatnak már nem kell rá várnia.
+        service = self._ensure_task_service()
+        QMetaObject.invokeMethod(service, "warm_up", Qt.QueuedConnection)
+
     def _setup_ui(self):
         central_widget = QWidget(self)
         self.setCentralWidget(central_widget)
         layout = QVBoxLayout(central_widget)
 
         self.input_field = QLineEdit(placeholderText="Mit szeretnél tenni?")
+        self.urgent_check = QCheckBox("Sürgős")
         self.start_button = QPushButton("Indítás")
         self.training_button = QPushButton("Elem tanítása")
         self.calibration_button = QPushButton("Kalibráció")
 
         layout.addWidget(self.input_field)
+        layout.addWidget(self.urgent_check)
         layout.addWidget(self.start_button)
         layout.addWidget(self.training_button)
         layout.addWidget(self.calibration_button)
 
     def _setup_connections(self):
         self.start_button.clicked.connect(self._on_start_clicked)
+        self.input_field.returnPressed.connect(self._on_start_clicked)
         self.training_button.clicked.connect(self._on_train_element_clicked)
         self.calibration_button.clicked.connect(self._on_start_calibration)
         self.tray_icon.activated.connect(self._on_tray_icon_activated)
         self.overlay.stop_button.clicked.connect(self.stop_task_requested.emit)
+        self.overlay.pause_button.clicked.connect(self._on_pause_clicked)
+        self.overlay.task_submitted.connect(self._on_overlay_task_submitted)
+        self.overlay.cancel_requested.connect(self._on_cancel_queued)
+        self.queue_timer.timeout.connect(self._refresh_queue_view)
 
-    def _run_task(self, start_slot, *args):
-        if self.assistant_thread and self.assistant_thread.isRunning():
-            return
+    def _ensure_task_service(self):
+        """Start the persistent worker thread; the assistant is built there on demand."""
 
-        self.hide()
-        self.tray_icon.setIcon(self.style().standardIcon(QStyle.SP_ComputerIcon))
-        self.tray_icon.show()
-        self.overlay.prepare_ui()
-        self.overlay.show()
+        if self.task_service is not None:
+            return self.task_service
 
         self.assistant_thread = QThread()
-        self.assistant = DesktopAssistant()
-        self.assistant.moveToThread(self.assistant_thread)
+        self.task_service = TaskQueueService(
+            self._assistant_factory, on_assistant_created=self._wire_assistant
+        )
+        self.task_service.moveToThread(self.assistant_thread)
+
+        self.task_service.queue_changed.connect(self._refresh_queue_view)
+        self.task_service.task_started.connect(self._on_queued_task_started)
+        self.task_service.task_done.connect(self._on_queued_task_done)
+        self.task_service.idle.connect(self._on_queue_idle)
 
-        # Signal-slot kapcsolatok
-        self.stop_task_requested.connect(self.assistant.request_stop)
-        self.assistant.status_updated.connect(self.overlay.status_label.setText)
-        self.assistant.progress_updated.connect(self.overlay.progress_bar.setValue)
-        self.assistant.log_message.connect(self.overlay.log_list.addItem)
-        self.assistant.task_finished.connect(self._on_task_finished)
-        
         # A szál leállítása után a worker törlődik
-        self.assistant_thread.finished.connect(self.assistant.deleteLater)
+        self.assistant_thread.finished.connect(self.task_service.deleteLater)
         self.assistant_thread.finished.connect(self.assistant_thread.deleteLater)
-        self.assistant_thread.finished.connect(self._cleanup_thread_references)
-
-        # KÖZVETLEN METÓDUSHÍVÁS A SZÁL INDULÁSAKOR
-        # A 'start_slot' a worker metódusa (pl. start_task), amit átadunk.
-        # A lambda biztosítja, hogy a paraméterek is átadódjanak.
-        self.assistant_thread.started.connect(lambda: start_slot(*args))
 
         self.assistant_thread.start()
+        return self.task_service
+
+    def _wire_assistant(self, assistant):
+        # A munkaszálon fut, közvetlenül a létrehozás után, még az első feladat előtt.
+        self.assistant = assistant
+        # Signal-slot kapcsolatok
+        # Közvetlen hívás: a foglalt munkaszál sorában a leállítás csak a feladat végén futna le.
+        self.stop_task_requested.connect(assistant.request_stop, Qt.DirectConnection)
+        # Közvetlen kapcsolat: a munkaszál csak sorba teszi az üzenetet, az overlay
+        # időzítője kötegben rajzolja ki, így nem keletkezik üzenetenként egy esemény.
+        assistant.status_updated.connect(self.overlay.set_status, Qt.DirectConnection)
+        assistant.progress_updated.connect(self.overlay.set_progress, Qt.DirectConnection)
+        assistant.log_message.connect(self.overlay.append_log, Qt.DirectConnection)
+        self.assistant_thread.finished.connect(assistant.deleteLater)
+
+    def _enqueue(self, kind, text="", urgent=False):
+        """Queue a task; a second click no longer gets dropped while one is running."""
+
+        service = self._ensure_task_service()
+        was_active = service.busy or len(service.queue) > 0
+        if not was_active:
+            self.hide()
+            self.tray_icon.setIcon(self.style().standardIcon(QStyle.SP_ComputerIcon))
+            self.tray_icon.show()
+            self.overlay.prepare_ui()
+            self.overlay.show()
+            self.queue_timer.start()
+
+        priority = PRIORITY_URGENT if urgent else PRIORITY_NORMAL
+        task, merged = service.enqueue(kind, text, priority)
+        if merged:
+            note = " (sürgősként előresorolva)" if urgent else ""
+            self.overlay.append_log(f"Már a sorban van{note}: {task.label()}")
+        elif was_active:
+            # A munkaszál közben már el is indíthatta a feladatot; ekkor nincs helye a sorban.
+            position = service.queue.position(task.id)
+            prefix = "Sürgős feladat sorba állítva" if urgent else "Sorba állítva"
+            place = f" ({position}. hely)" if position is not None else ""
+            self.overlay.append_log(f"{prefix}{place}: {task.label()}")
 
     def _on_start_clicked(self):
         command = self.input_field.text().strip()
         if command:
-            # Itt a DesktopAssistant.start_task metódusát adjuk át
-            self._run_task(DesktopAssistant.start_task, command)
+            self._enqueue(TASK_KIND_TASK, command, self.urgent_check.isChecked())
+            self.input_field.clear()
+            self.urgent_check.setChecked(False)
 
     def _on_start_calibration(self):
-        # Itt a DesktopAssistant.start_calibration_task metódusát adjuk át
-        self._run_task(DesktopAssistant.start_calibration_task)
+        self._enqueue(TASK_KIND_CALIBRATION)
+
+    def _on_macro_hotkey(self, text):
+        # A gyorsbillentyű-szálról hívódik; a sorba állítás a grafikus szálon történik.
+        overlay_proxy.post(lambda: self._enqueue(TASK_KIND_TASK, text, urgent=True))
+
+    def _on_pause_clicked(self):
+        if self.assistant is not None:
+            self.assistant.toggle_pause()
+
+    @Slot(str, bool)
+    def _on_overlay_task_submitted(self, text, urgent):
+        self._enqueue(TASK_KIND_TASK, text, urgent)
+
+    @Slot(int)
+    def _on_cancel_queued(self, task_id):
+        if self.task_service and self.task_service.cancel(task_id):
+            self.overlay.append_log("Várakozó feladat törölve a sorból.")
+
+    @Slot(object)
+    def _on_queued_task_started(self, task):
+        waited = task.wait_time()
+        if waited >= 1 or task.preemptions:
+            suffix = f", {task.preemptions}. újrakezdés" if task.preemptions else ""
+            self.overlay.append_log(
+                f"Következő feladat: {task.label()} (várakozott {waited:.0f} mp{suffix})"
+            )
+
+    @Slot(object, str)
+    def _on_queued_task_done(self, task, status):
+        if status == "setup_error":
+            self.overlay.append_log(
+                f"Az asszisztens nem indítható el, a feladat kimaradt: {task.label()} (részletek a konzolon)"
+            )
+        elif status == "error":
+            self.overlay.append_log(f"A feladat hibával leállt: {task.label()} (részletek a konzolon)")
+
+    @Slot()
+    def _refresh_queue_view(self):
+        if self.task_service is None:
+            return
+        pending = self.task_service.queue.snapshot()
+        now = time.monotonic()
+        entries = [
+            (
+                task.id,
+                f"{'[!] ' if task.priority > PRIORITY_NORMAL else ''}{task.label()} "
+                f"({task.wait_time(now):.0f} mp)",
+            )
+            for task in pending
+        ]
+        if pending:
+            longest = max(task.wait_time(now) for task in pending)
+            summary = f"Sorban: {len(pending)} feladat, leghosszabb várakozás {longest:.0f} mp"
+        else:
+            summary = "A sor üres."
+        self.overlay.set_queue(entries, summary)
+
+    @Slot()
+    def _on_queue_idle(self):
+        if self.task_service and (self.task_service.busy or len(self.task_service.queue)):
+            return
+        self.queue_timer.stop()
+        self._on_task_finished()
 
     def _on_task_finished(self):
-        if self.assistant_thread:
-            self.assistant_thread.quit()
-            self.assistant_thread.wait()
-        
         self.overlay.hide()
         self.tray_icon.hide()
         self.showNormal()
         self.activateWindow()
 
-    def _cleanup_thread_references(self):
-        # A lecsatlakoztatást ide helyezzük, hogy biztosan megtörténjen
-        if self.assistant:
-            try:
-                self.stop_task_requested.disconnect(self.assistant.request_stop)
-            except RuntimeError:
-                pass
+    def _shutdown_task_service(self):
+        hotkey_service.stop()
+        if self.assistant_thread is None:
+            return
+        self.task_service.clear()
+        if self.assistant is not None:
+            hotkey_service.remove_handlers(self.assistant.request_stop, self.assistant.toggle_pause)
+            # A futó feladat a következő ellenőrzési pontnál áll meg; a szál csak utána állítható le.
+            self.assistant.request_stop()
+        self.assistant_thread.quit()
+        self.assistant_thread.wait()
+        self.task_service = None
         self.assistant = None
         self.assistant_thread = None
-        
+
+    def closeEvent(self, event):  # noqa: N802 - Qt API naming convention
+        self._shutdown_task_service()
+        super().closeEvent(event)
+
     def _on_tray_icon_activated(self, reason):
         if reason == QSystemTrayIcon.ActivationReason.Trigger:
-            if self.assistant_thread and self.assistant_thread.isRunning():
+            if self.task_service and self.task_service.busy:
                 self.stop_task_requested.emit()
             else:
                 self._on_task_finished()
-                
+
     # A "Tanítás" módhoz tartozó metódusok
     def _on_train_element_clicked(self):
         if self.click_interceptor: return
@@ -0,0 +1,161 @@
+"""Create and drive overlay widgets on the GUI thread on behalf of worker code."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from PySide6.QtCore import QCoreApplication, QEvent, QObject, QThread, QTimer
+from PySide6.QtWidgets import QWidget
+
+from src.config import OVERLAY_PRESENT_TIMEOUT_S
+
+WidgetT = TypeVar("WidgetT", bound=QWidget)
+
+
+class _Job:
+    def __init__(self, fn: Callable[[], Any]) -> None:
+        self.fn = fn
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class OverlayProxy(QObject):
+    """GUI-thread proxy for overlay widgets used by the assistant worker.
+
+    Widgets must be created, shown and hidden on the GUI thread. ``call`` runs
+    a function there and waits for its result; ``show_and_wait`` additionally
+    blocks until the widget's first frame has been painted and flushed to the
+    screen, so a capture taken afterwards is guaranteed to contain it.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._paint_waiters: dict[int, Callable[[], None]] = {}
+
+    def _on_gui_thread(self) -> bool:
+        return QThread.currentThread() is self.thread()
+
+    def _post(self, job: _Job) -> None:
+        # Tartós jel-kapcsolat helyett egyszeri hívás: az élő Python-kapcsolatok
+        # a PySide-ot a leállításkori szemétgyűjtésnél összeomlaszthatják.
+        QTimer.singleShot(0, self, lambda: self._run_job(job))
+
+    def post(self, fn: Callable[[], Any]) -> None:
+        """Run ``fn`` on the GUI thread without waiting for it."""
+
+        if self._on_gui_thread():
+            fn()
+        else:
+            self._post(_Job(fn))
+
+    @staticmethod
+    def _run_job(job: _Job) -> None:
+        try:
+            job.result = job.fn()
+        except BaseException as exc:  # noqa: BLE001 - a hívó szálon dobjuk újra
+            job.error = exc
+        finally:
+            job.done.set()
+
+    def call(self, fn: Callable[[], Any], timeout: float | None = OVERLAY_PRESENT_TIMEOUT_S) -> Any:
+        """Run ``fn`` on the GUI thread and return its result."""
+
+        if self._on_gui_thread():
+            return fn()
+        job = _Job(fn)
+        self._post(job)
+        if not job.done.wait(timeout):
+            raise TimeoutError("A grafikus szál nem válaszolt időben.")
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def show_and_wait(
+        self,
+        factory: Callable[[], WidgetT],
+        show: Callable[[WidgetT], None] = QWidget.show,
+        timeout: float = OVERLAY_PRESENT_TIMEOUT_S,
+    ) -> tuple[WidgetT | None, bool]:
+        """Create and show a widget; return it and whether its frame was presented in time.
+
+        If the GUI thread is too busy to even create the widget within
+        ``timeout``, ``(None, False)`` is returned and the pending creation is
+        cancelled, so no orphaned widget appears later.
+        """
+
+        presented = threading.Event()
+        lock = threading.Lock()
+        state: dict[str, Any] = {"cancelled": False, "widget": None}
+
+        def create() -> WidgetT | None:
+            with lock:
+                if state["cancelled"]:
+                    return None
+                widget = factory()
+                self._paint_waiters[id(widget)] = presented.set
+                widget.installEventFilter(self)
+                show(widget)
+                state["widget"] = widget
+                return widget
+
+        started = time.perf_counter()
+        if self._on_gui_thread():
+            create()
+        else:
+            job = _Job(create)
+            self._post(job)
+            if not job.done.wait(timeout):
+                with lock:
+                    # Ha a létrehozás még el sem indult, már nem is fog; ha közben
+                    # lefutott, a widgetet a szokásos módon kezeljük tovább.
+                    state["cancelled"] = True
+            if job.error is not None:
+                raise job.error
+        widget = state["widget"]
+        if widget is None:
+            return None, False
+
+        remaining = max(0.0, timeout - (time.perf_counter() - started))
+        if self._on_gui_thread():
+            # A saját szálunkon nem blokkolhatunk: az eseményhurkot pörgetjük a kirajzolásig.
+            deadline = time.perf_counter() + remaining
+            while not presented.is_set() and time.perf_counter() < deadline:
+                QCoreApplication.processEvents()
+                time.sleep(0.001)
+        else:
+            presented.wait(remaining)
+        if not presented.is_set():
+            # Nem várunk a grafikus szálra: ha az foglalt, ez is csak időtúllépéssel térne vissza.
+            self.post(lambda: self._stop_watching(widget))
+        return widget, presented.is_set()
+
+    def close(self, widget: QWidget) -> None:
+        """Hide and delete ``widget`` on the GUI thread without waiting for it."""
+
+        def dispose() -> None:
+            self._stop_watching(widget)
+            widget.hide()
+            widget.deleteLater()
+
+        self.post(dispose)
+
+    def _stop_watching(self, widget: QWidget) -> None:
+        if self._paint_waiters.pop(id(widget), None) is not None:
+            widget.removeEventFilter(self)
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:  # noqa: N802 - Qt API naming convention
+        if event.type() == QEvent.Paint:
+            callback = self._paint_waiters.pop(id(watched), None)
+            if callback is not None:
+                watched.removeEventFilter(self)
+                # A szűrő a rajzolás előtt fut; a 0 ms-os időzítő a rajzolás és a
+                # képernyőre írás (backing store flush) után jelez.
+                QTimer.singleShot(0, callback)
+        return False
+
+
+overlay_proxy = OverlayProxy()
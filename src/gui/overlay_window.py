@@ -2,29 +2,53 @@
 
 from __future__ import annotations
 
-from PySide6.QtCore import QPoint, Qt
+import threading
+
+from PySide6.QtCore import QPoint, Qt, QTimer, Signal
 from PySide6.QtGui import QMouseEvent
 from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QCheckBox,
+    QFileDialog,
     QHBoxLayout,
     QLabel,
+    QLineEdit,
+    QListView,
     QListWidget,
+    QListWidgetItem,
     QProgressBar,
     QPushButton,
     QVBoxLayout,
     QWidget,
 )
 
+from src.config import LOG_FLUSH_INTERVAL_MS, LOG_VIEW_CAPACITY
+from src.gui.capture_exclusion import capture_exclusion
+from src.gui.log_model import RingLogModel
+
 
 class OverlayWindow(QWidget):
-    """A small, always-on-top window showing task progress and logs."""
+    """A small, always-on-top window showing task progress, logs and the task queue."""
+
+    task_submitted = Signal(str, bool)
+    cancel_requested = Signal(int)
 
     def __init__(self, parent: QWidget | None = None) -> None:
         super().__init__(parent)
         self._drag_offset: QPoint | None = None
+        # A munkaszálról érkező állapot- és haladásjelzésekből csak a legutolsó számít.
+        self._latest_lock = threading.Lock()
+        self._latest_status: str | None = None
+        self._latest_progress: int | None = None
 
         self._configure_window_flags()
         self._setup_ui()
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(LOG_FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self.flush_updates)
         self.hide()
+        capture_exclusion.register(self)
 
     def _configure_window_flags(self) -> None:
         """Apply the overlay window behaviour flags."""
@@ -33,7 +57,7 @@ class OverlayWindow(QWidget):
         self.setWindowFlags(flags)
 
     def _setup_ui(self) -> None:
-        """Create the progress bar, status label, and log list."""
+        """Create the progress bar, status label, log list and queue controls."""
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(12, 12, 12, 12)
@@ -48,11 +72,42 @@ class OverlayWindow(QWidget):
         self.status_label.setObjectName("overlayStatusLabel")
         layout.addWidget(self.status_label)
 
-        self.log_list = QListWidget(self)
-        layout.addWidget(self.log_list)
+        self.log_model = RingLogModel(LOG_VIEW_CAPACITY, self)
+        self.log_view = QListView(self)
+        self.log_view.setModel(self.log_model)
+        self.log_view.setUniformItemSizes(True)
+        self.log_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        layout.addWidget(self.log_view)
+
+        self.queue_label = QLabel("", self)
+        self.queue_label.setObjectName("overlayQueueLabel")
+        layout.addWidget(self.queue_label)
+
+        self.queue_list = QListWidget(self)
+        self.queue_list.setMaximumHeight(90)
+        layout.addWidget(self.queue_list)
+
+        queue_input_layout = QHBoxLayout()
+        self.queue_input = QLineEdit(self)
+        self.queue_input.setPlaceholderText("Következő feladat...")
+        self.urgent_check = QCheckBox("Sürgős", self)
+        self.cancel_queued_button = QPushButton("Mégse", self)
+        queue_input_layout.addWidget(self.queue_input)
+        queue_input_layout.addWidget(self.urgent_check)
+        queue_input_layout.addWidget(self.cancel_queued_button)
+        layout.addLayout(queue_input_layout)
+
+        self.queue_input.returnPressed.connect(self._on_queue_input)
+        self.cancel_queued_button.clicked.connect(self._on_cancel_queued)
 
         button_layout = QHBoxLayout()
+        self.export_log_button = QPushButton("Napló mentése", self)
+        self.export_log_button.clicked.connect(self._on_export_log)
+        button_layout.addWidget(self.export_log_button)
         button_layout.addStretch()
+        self.pause_button = QPushButton("Szünet / folytatás", self)
+        self.pause_button.setObjectName("overlayPauseButton")
+        button_layout.addWidget(self.pause_button)
         self.stop_button = QPushButton("Stop", self)
         self.stop_button.setObjectName("overlayStopButton")
         button_layout.addWidget(self.stop_button)
@@ -62,9 +117,96 @@ class OverlayWindow(QWidget):
 
     def prepare_ui(self):
         """Resets the UI elements to their initial state."""
+        self.flush_updates()
         self.progress_bar.setValue(0)
         self.status_label.clear()
-        self.log_list.clear()
+        self.log_model.clear()
+        self.queue_input.clear()
+        self.urgent_check.setChecked(False)
+
+    def append_log(self, text: str) -> None:
+        """Queue a log line; safe to call from any thread."""
+
+        self.log_model.append(text)
+
+    def set_status(self, text: str) -> None:
+        """Record the latest status; safe to call from any thread."""
+
+        with self._latest_lock:
+            self._latest_status = text
+
+    def set_progress(self, value: int) -> None:
+        """Record the latest progress value; safe to call from any thread."""
+
+        with self._latest_lock:
+            self._latest_progress = value
+
+    def flush_updates(self) -> None:
+        """Apply everything queued since the last tick in one batch (GUI thread)."""
+
+        with self._latest_lock:
+            status, self._latest_status = self._latest_status, None
+            progress, self._latest_progress = self._latest_progress, None
+        if status is not None:
+            self.status_label.setText(status)
+        if progress is not None:
+            self.progress_bar.setValue(progress)
+
+        scrollbar = self.log_view.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum()
+        if self.log_model.flush() and at_bottom:
+            # Csak akkor görgetünk, ha a felhasználó nem lapozott vissza a naplóban.
+            self.log_view.scrollToBottom()
+
+    def showEvent(self, event) -> None:  # noqa: N802 - Qt API naming convention
+        self._flush_timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event) -> None:  # noqa: N802 - Qt API naming convention
+        self._flush_timer.stop()
+        self.flush_updates()
+        super().hideEvent(event)
+
+    def _on_export_log(self) -> None:
+        path, _ = QFileDialog.getSaveFileName(self, "Napló mentése", "ordenador_naplo.txt", "Szövegfájl (*.txt)")
+        if not path:
+            return
+        try:
+            count = self.log_model.export(path)
+        except OSError as exc:
+            self.append_log(f"A napló mentése nem sikerült: {exc}")
+            return
+        self.append_log(f"Napló elmentve ({count} sor): {path}")
+
+    def set_queue(self, entries: list[tuple[int, str]], summary: str) -> None:
+        """Show the pending tasks as ``(id, text)`` pairs and keep the selection."""
+
+        selected = self.selected_queue_id()
+        self.queue_label.setText(summary)
+        self.queue_list.clear()
+        for task_id, text in entries:
+            item = QListWidgetItem(text, self.queue_list)
+            item.setData(Qt.UserRole, task_id)
+            if task_id == selected:
+                self.queue_list.setCurrentItem(item)
+        self.queue_list.setVisible(bool(entries))
+        self.cancel_queued_button.setEnabled(bool(entries))
+
+    def selected_queue_id(self) -> int | None:
+        item = self.queue_list.currentItem()
+        return item.data(Qt.UserRole) if item is not None else None
+
+    def _on_queue_input(self) -> None:
+        text = self.queue_input.text().strip()
+        if text:
+            self.task_submitted.emit(text, self.urgent_check.isChecked())
+            self.queue_input.clear()
+            self.urgent_check.setChecked(False)
+
+    def _on_cancel_queued(self) -> None:
+        task_id = self.selected_queue_id()
+        if task_id is not None:
+            self.cancel_requested.emit(task_id)
 
     def mousePressEvent(self, event: QMouseEvent) -> None:  # noqa: N802 - Qt API naming convention
         """Store the offset when the user starts dragging the window."""
@@ -2,12 +2,22 @@
 
 from __future__ import annotations
 
+from collections import deque
+
 from PySide6.QtCore import Qt, QTimer
 from PySide6.QtWidgets import QWidget
 
+from src.gui.capture_exclusion import capture_exclusion
+
+
+# Ennyi jelzőablak készül előre; gyors kattintássorozatnál a legrégebbi kerül újra felhasználásra.
+CLICK_INDICATOR_POOL_SIZE = 4
+CLICK_INDICATOR_DURATION_MS = 300
+CLICK_INDICATOR_DIAMETER = 30
+
 
 class ClickIndicator(QWidget):
-    """Transient circular widget that highlights AI click positions."""
+    """Reusable circular widget that highlights AI click positions."""
 
     def __init__(self, parent: QWidget | None = None) -> None:
         super().__init__(parent)
@@ -17,17 +27,61 @@ class ClickIndicator(QWidget):
             | Qt.FramelessWindowHint
             | Qt.WindowStaysOnTopHint
             | Qt.WindowDoesNotAcceptFocus
+            # A jelző közvetlenül a kattintás előtt jelenik meg a célpont fölött:
+            # a kattintásnak át kell rajta haladnia az alatta lévő elemre.
+            | Qt.WindowTransparentForInput
         )
         self.setAttribute(Qt.WA_ShowWithoutActivating)
         self.setAttribute(Qt.WA_TranslucentBackground)
-        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
         self.setFocusPolicy(Qt.NoFocus)
 
-        diameter = 30
+        diameter = CLICK_INDICATOR_DIAMETER
         self.setFixedSize(diameter, diameter)
         radius = diameter // 2
         self.setStyleSheet(
             f"background-color: rgba(255, 0, 0, 0.7); border-radius: {radius}px;"
         )
 
-        QTimer.singleShot(300, self.close)
+        self._hide_timer = QTimer(self)
+        self._hide_timer.setSingleShot(True)
+        self._hide_timer.timeout.connect(self.hide)
+
+        capture_exclusion.register(self)
+
+    def flash(self, x: int, y: int, duration_ms: int = CLICK_INDICATOR_DURATION_MS) -> None:
+        """Show the indicator centred on ``(x, y)`` for ``duration_ms``."""
+
+        self.move(x - self.width() // 2, y - self.height() // 2)
+        self.show()
+        self.raise_()
+        self._hide_timer.start(duration_ms)
+
+
+class ClickIndicatorPool:
+    """A few pre-created indicators reused round-robin instead of one window per click.
+
+    Must be created and used on the GUI thread.
+    """
+
+    _shared: ClickIndicatorPool | None = None
+
+    def __init__(self, size: int = CLICK_INDICATOR_POOL_SIZE) -> None:
+        self._indicators = deque(ClickIndicator() for _ in range(max(1, size)))
+
+    @classmethod
+    def shared(cls) -> ClickIndicatorPool:
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def flash(self, x: int, y: int) -> ClickIndicator:
+        # Elsőként egy rejtett jelzőt választunk; ha mind látszik, a legrégebben felvillantottat.
+        indicator = next((item for item in self._indicators if item.isHidden()), self._indicators[0])
+        self._indicators.remove(indicator)
+        self._indicators.append(indicator)
+        indicator.flash(x, y)
+        return indicator
+
+    def visible_count(self) -> int:
+        return sum(not item.isHidden() for item in self._indicators)
@@ -0,0 +1,214 @@
+"""Run tasks through ``DesktopAssistant`` without the Qt GUI.
+
+Usage::
+
+    python -m src.headless tasks.txt [more.jsonl ...] [--output results.jsonl]
+    cat tasks.txt | python -m src.headless -
+
+Input lines are either plain task texts or JSON objects with a ``task`` field
+and an optional ``id``. Every task produces one JSON line with its outcome,
+timings and usage. The exit code is 0 if every task completed, 1 if any did
+not, 2 if no task could be read, 3 if the assistant could not be set up
+(e.g. no display) and 130 if the run was interrupted.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import signal
+import sys
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from src.assistant import DesktopAssistant
+
+EXIT_OK = 0
+EXIT_TASK_FAILED = 1
+EXIT_NO_TASKS = 2
+EXIT_SETUP_FAILED = 3
+EXIT_INTERRUPTED = 130
+
+
+@dataclass
+class TaskSpec:
+    """One task of a batch."""
+
+    id: str
+    task: str
+
+
+def read_tasks(lines: Iterable[str], source: str = "stdin") -> Iterator[TaskSpec]:
+    """Parse plain-text or JSON lines; blank lines and ``#`` comments are skipped."""
+
+    for number, raw_line in enumerate(lines, start=1):
+        line = raw_line.strip()
+        if not line or line.startswith("#"):
+            continue
+        task_id = f"{source}:{number}"
+        if line.startswith("{"):
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError:
+                print(f"Hibás JSON sor kihagyva ({task_id})", file=sys.stderr)
+                continue
+            task = (data.get("task") or data.get("feladat")) if isinstance(data, dict) else None
+            if not isinstance(task, str) or not task.strip():
+                print(f"Feladat nélküli sor kihagyva ({task_id})", file=sys.stderr)
+                continue
+            yield TaskSpec(id=str(data.get("id", task_id)), task=task.strip())
+        else:
+            yield TaskSpec(id=task_id, task=line)
+
+
+class _LogCollector:
+    """Receives ``log_message``; kept separate so the assistant and runner form no cycle."""
+
+    def __init__(self, verbose: bool) -> None:
+        self.verbose = verbose
+        self.messages: list[str] = []
+
+    def append(self, message: str) -> None:
+        self.messages.append(message)
+        if self.verbose:
+            print(message, file=sys.stderr)
+
+
+class HeadlessRunner:
+    """Execute tasks one after another on a single assistant and collect their results."""
+
+    def __init__(
+        self,
+        assistant_factory: Callable[[], DesktopAssistant] | None = None,
+        verbose: bool = False,
+    ) -> None:
+        self._assistant_factory = assistant_factory
+        self._assistant: DesktopAssistant | None = None
+        self._log = _LogCollector(verbose)
+
+    @property
+    def assistant(self) -> DesktopAssistant:
+        if self._assistant is None:
+            if self._assistant_factory is not None:
+                self._assistant = self._assistant_factory()
+            else:
+                from src.assistant import DesktopAssistant
+
+                self._assistant = DesktopAssistant(listen_for_keyboard=False)
+            self._assistant.log_message.connect(self._log.append)
+        return self._assistant
+
+    def close(self) -> None:
+        """Disconnect from the assistant; PySide can crash collecting live connections at exit."""
+
+        if self._assistant is not None:
+            self._assistant.log_message.disconnect(self._log.append)
+            self._assistant = None
+
+    def stop(self) -> None:
+        if self._assistant is not None:
+            self._assistant.request_stop()
+
+    def run(self, spec: TaskSpec) -> dict[str, Any]:
+        assistant = self.assistant
+        self._log.messages = []
+        started_at = datetime.now().isoformat(timespec="seconds")
+        started = time.perf_counter()
+        assistant.start_task(spec.task)
+        wall_time = time.perf_counter() - started
+
+        outcome = dict(assistant.last_outcome)
+        return {
+            "id": spec.id,
+            "task": spec.task,
+            "started_at": started_at,
+            "wall_time": round(wall_time, 3),
+            "success": outcome.get("status") == "completed",
+            **outcome,
+            "log": self._log.messages,
+        }
+
+
+def iter_task_sources(paths: list[str]) -> Iterator[TaskSpec]:
+    """Yield the tasks of every file in ``paths``; ``-`` stands for stdin."""
+
+    for path in paths:
+        if path == "-":
+            yield from read_tasks(sys.stdin, "stdin")
+            continue
+        with Path(path).open("r", encoding="utf-8") as file:
+            yield from read_tasks(file, path)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Feladatok futtatása grafikus felület nélkül.")
+    parser.add_argument("tasks", nargs="*", default=["-"], help="Feladatfájlok, '-' = szabványos bemenet")
+    parser.add_argument("--output", type=Path, default=None, help="JSON lines eredményfájl (alapból stdout)")
+    parser.add_argument("--stop-on-failure", action="store_true", help="Az első sikertelen feladat után leáll")
+    parser.add_argument("--verbose", action="store_true", help="A napló sorai a stderr-re is kikerülnek")
+    args = parser.parse_args(argv)
+
+    runner = HeadlessRunner(verbose=args.verbose)
+    interrupted = False
+
+    def handle_interrupt(signum: int, frame: Any) -> None:
+        nonlocal interrupted
+        if interrupted:
+            raise KeyboardInterrupt
+        # Az első Ctrl+C a futó feladatot állítja le, a második azonnal kilép.
+        interrupted = True
+        print("Megszakítás kérése...", file=sys.stderr)
+        runner.stop()
+
+    signal.signal(signal.SIGINT, handle_interrupt)
+
+    output: IO[str] = args.output.open("a", encoding="utf-8") if args.output else sys.stdout
+    total = completed = 0
+    started = time.perf_counter()
+    try:
+        # Az asszisztens print-jei a stderr-re mennek, hogy a stdout tiszta JSON lines maradjon.
+        with contextlib.redirect_stdout(sys.stderr):
+            for spec in iter_task_sources(args.tasks):
+                if interrupted:
+                    break
+                try:
+                    runner.assistant
+                except Exception as exc:
+                    print(f"Nem sikerült elindítani az asszisztenst: {exc}", file=sys.stderr)
+                    return EXIT_SETUP_FAILED
+                result = runner.run(spec)
+                total += 1
+                completed += result["success"]
+                output.write(json.dumps(result, ensure_ascii=False) + "\n")
+                output.flush()
+                if args.stop_on_failure and not result["success"]:
+                    break
+    except KeyboardInterrupt:
+        interrupted = True
+    finally:
+        runner.close()
+        if output is not sys.stdout:
+            output.close()
+
+    elapsed = time.perf_counter() - started
+    if total:
+        print(
+            f"{completed}/{total} feladat sikeres, {elapsed:.1f} mp "
+            f"({total / elapsed * 60 if elapsed else 0:.1f} feladat/perc)",
+            file=sys.stderr,
+        )
+    if interrupted:
+        return EXIT_INTERRUPTED
+    if not total:
+        return EXIT_NO_TASKS
+    return EXIT_OK if completed == total else EXIT_TASK_FAILED
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""Application-wide global hotkeys shared by every assistant worker.
+
+A single ``pynput`` listener is started when the application launches and
+kept until it exits, so no per-task listener start-up or tear-down is paid
+and no key press between tasks is missed. Bindings:
+
+* ``HOTKEY_STOP`` (ESC by default) stops the running task,
+* ``HOTKEY_PAUSE`` pauses or resumes it at the next iteration boundary,
+* every entry of ``hotkeys.json`` (``{"<ctrl>+<alt>+1": "kattints a Mentés gombra"}``)
+  queues the given task text as an urgent task; texts that point at a
+  memorised element run instantly without asking the model.
+
+Handlers run on the listener thread and must only do thread-safe work. Key
+presses injected by the assistant itself (the model may send ``esc`` to close
+a dialog) are ignored, see ``injection_tracker``.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from src.config import HOTKEY_PAUSE, HOTKEY_STOP, HOTKEYS_PATH
+from src.input_backends import injection_tracker
+
+DEFAULT_HOTKEYS_PATH = Path(__file__).resolve().parent.parent / "hotkeys.json"
+
+
+def load_macros(path: str | Path | None = None) -> dict[str, str]:
+    """Read the ``hotkey -> task text`` map; a missing or invalid file means no macros."""
+
+    macro_path = Path(path or HOTKEYS_PATH or DEFAULT_HOTKEYS_PATH)
+    if not macro_path.exists():
+        return {}
+    try:
+        data = json.loads(macro_path.read_text(encoding="utf-8"))
+    except (json.JSONDecodeError, OSError) as exc:
+        print(f"Hiba a {macro_path.name} betöltése közben: {exc}")
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {str(key): text.strip() for key, text in data.items() if isinstance(text, str) and text.strip()}
+
+
+class HotkeyService:
+    """One global listener dispatching to handlers registered by the app and its workers."""
+
+    def __init__(
+        self,
+        stop_key: str = HOTKEY_STOP,
+        pause_key: str = HOTKEY_PAUSE,
+        macros: dict[str, str] | None = None,
+    ) -> None:
+        self.stop_key = stop_key
+        self.pause_key = pause_key
+        self.macros = macros
+        self._lock = threading.Lock()
+        self._stop_handlers: list[Callable[[], None]] = []
+        self._pause_handlers: list[Callable[[], None]] = []
+        self._macro_handlers: list[Callable[[str], None]] = []
+        self._listener: Any = None
+
+    @property
+    def running(self) -> bool:
+        return self._listener is not None
+
+    def add_stop_handler(self, handler: Callable[[], None]) -> None:
+        with self._lock:
+            self._stop_handlers.append(handler)
+
+    def add_pause_handler(self, handler: Callable[[], None]) -> None:
+        with self._lock:
+            self._pause_handlers.append(handler)
+
+    def add_macro_handler(self, handler: Callable[[str], None]) -> None:
+        with self._lock:
+            self._macro_handlers.append(handler)
+
+    def remove_handlers(self, *handlers: Callable[..., None]) -> None:
+        with self._lock:
+            for handlers_list in (self._stop_handlers, self._pause_handlers, self._macro_handlers):
+                handlers_list[:] = [item for item in handlers_list if item not in handlers]
+
+    def bindings(self) -> dict[str, Callable[[], None]]:
+        """The ``pynput`` hotkey map; an empty key string disables that binding."""
+
+        bindings: dict[str, Callable[[], None]] = {}
+        macros = self.macros if self.macros is not None else load_macros()
+        for key, text in macros.items():
+            bindings[key] = lambda text=text: self._dispatch(self._macro_handlers, text)
+        if self.pause_key:
+            bindings[self.pause_key] = lambda: self._dispatch(self._pause_handlers)
+        if self.stop_key:
+            bindings[self.stop_key] = lambda: self._dispatch(self._stop_handlers)
+        return bindings
+
+    def _dispatch(self, handlers: list[Callable[..., None]], *args: Any) -> None:
+        if injection_tracker.recent:
+            # A saját bevitelünk (pl. a modell által küldött ESC) nem állíthatja le a feladatot.
+            return
+        with self._lock:
+            targets = list(handlers)
+        for handler in targets:
+            try:
+                handler(*args)
+            except Exception as exc:  # pragma: no cover - egy hibás kezelő ne állítsa le a figyelőt
+                print(f"Hiba a gyorsbillentyű kezelése közben: {exc}")
+
+    def start(self) -> bool:
+        """Start the listener once; return whether global hotkeys are available."""
+
+        if self._listener is not None:
+            return True
+        try:
+            from pynput.keyboard import GlobalHotKeys
+
+            listener = GlobalHotKeys(self.bindings())
+            listener.daemon = True
+            listener.start()
+        except Exception as exc:  # pragma: no cover - kijelző vagy jogosultság hiánya
+            print(f"A globális gyorsbillentyűk nem érhetők el: {exc}")
+            return False
+        self._listener = listener
+        return True
+
+    def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+
+hotkey_service = HotkeyService()
@@ -0,0 +1,367 @@
+"""Input backends used by ``ComputerInterface`` to inject mouse and keyboard events."""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from src.config import (
+    INPUT_BACKEND,
+    INPUT_CLICK_DELAY_MS,
+    INPUT_KEY_DELAY_MS,
+    INPUT_MOVE_SETTLE_MS,
+)
+
+
+@dataclass
+class InputTiming:
+    """Explicit delays (in seconds) inserted between low-level input events."""
+
+    key_delay: float = INPUT_KEY_DELAY_MS / 1000
+    click_delay: float = INPUT_CLICK_DELAY_MS / 1000
+    move_settle: float = INPUT_MOVE_SETTLE_MS / 1000
+
+    @staticmethod
+    def wait(seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class InjectionTracker:
+    """Tells global hotkey listeners that a key event came from our own injection.
+
+    Injected keys reach the ``pynput`` listener as well, and a little later
+    than the injecting call returns, so a short ``grace`` period follows
+    every injection.
+    """
+
+    def __init__(self, grace: float = 0.3) -> None:
+        self.grace = grace
+        self._lock = threading.Lock()
+        self._active = 0
+        self._finished_at = float("-inf")
+
+    @contextmanager
+    def injecting(self) -> Iterator[None]:
+        with self._lock:
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._finished_at = time.monotonic()
+
+    @property
+    def recent(self) -> bool:
+        with self._lock:
+            return self._active > 0 or time.monotonic() - self._finished_at < self.grace
+
+
+injection_tracker = InjectionTracker()
+
+
+class InputBackend(ABC):
+    """Base class describing the input operations the assistant relies on."""
+
+    name = "base"
+
+    def __init__(self, timing: InputTiming | None = None) -> None:
+        self.timing = timing or InputTiming()
+
+    def screen_size(self) -> tuple[int, int]:
+        return 0, 0
+
+    @abstractmethod
+    def click(self, x: int, y: int, button: str = "left", clicks: int = 1) -> None: ...
+
+    @abstractmethod
+    def type_text(self, text: str) -> None: ...
+
+    @abstractmethod
+    def press_keys(self, keys: list[str]) -> None:
+        """Press a combination of canonical key names (see ``src.shortcuts``)."""
+
+
+class PyAutoGUIBackend(InputBackend):
+    """Backend built on PyAutoGUI, without its global ``PAUSE`` between calls."""
+
+    name = "pyautogui"
+
+    def __init__(self, timing: InputTiming | None = None) -> None:
+        super().__init__(timing)
+        import pyautogui
+
+        self._pyautogui = pyautogui
+
+    def screen_size(self) -> tuple[int, int]:
+        width, height = self._pyautogui.size()
+        return int(width), int(height)
+
+    def click(self, x: int, y: int, button: str = "left", clicks: int = 1) -> None:
+        self._pyautogui.moveTo(x, y, _pause=False)
+        self.timing.wait(self.timing.move_settle)
+        for index in range(clicks):
+            if index:
+                self.timing.wait(self.timing.click_delay)
+            self._pyautogui.mouseDown(button=button, _pause=False)
+            self.timing.wait(self.timing.click_delay)
+            self._pyautogui.mouseUp(button=button, _pause=False)
+
+    def type_text(self, text: str) -> None:
+        for char in text:
+            self._pyautogui.write(char, _pause=False)
+            self.timing.wait(self.timing.key_delay)
+
+    def press_keys(self, keys: list[str]) -> None:
+        for key in keys:
+            self._pyautogui.keyDown(key, _pause=False)
+            self.timing.wait(self.timing.key_delay)
+        for key in reversed(keys):
+            self._pyautogui.keyUp(key, _pause=False)
+            self.timing.wait(self.timing.key_delay)
+
+
+class XTestBackend(InputBackend):
+    """Direct event injection into the X server through the XTEST extension."""
+
+    name = "xtest"
+
+    _BUTTONS = {"left": 1, "middle": 2, "right": 3}
+    _SPECIAL_KEYSYMS = {"\n": "Return", "\r": "Return", "\t": "Tab", " ": "space"}
+    _NAMED_KEYSYMS = {
+        "ctrl": "Control_L",
+        "alt": "Alt_L",
+        "altright": "ISO_Level3_Shift",
+        "shift": "Shift_L",
+        "win": "Super_L",
+        "enter": "Return",
+        "esc": "Escape",
+        "tab": "Tab",
+        "space": "space",
+        "backspace": "BackSpace",
+        "delete": "Delete",
+        "insert": "Insert",
+        "home": "Home",
+        "end": "End",
+        "pageup": "Prior",
+        "pagedown": "Next",
+        "up": "Up",
+        "down": "Down",
+        "left": "Left",
+        "right": "Right",
+        "printscreen": "Print",
+        **{f"f{index}": f"F{index}" for index in range(1, 13)},
+    }
+    # Ha a kiosztásban nincs harmadik szint (AltGr), a jobb Alt a legközelebbi megfelelő.
+    _FALLBACK_KEYSYMS = {"altright": "Alt_R"}
+    # A kiosztás módosítását a kliensek a MappingNotify feldolgozása után látják; ennyit
+    # várunk az átírás után és a visszaállítás előtt, hogy ne a régi vagy üres jel jelenjen meg.
+    _REMAP_SETTLE_S = 0.02
+
+    def __init__(
+        self, display_name: str | None = None, timing: InputTiming | None = None
+    ) -> None:
+        super().__init__(timing)
+        from Xlib import X, XK, display
+        from Xlib.ext import xtest
+
+        self._X = X
+        self._XK = XK
+        self._xtest = xtest
+        self._display = display.Display(display_name)
+        if not self._display.has_extension("XTEST"):
+            raise RuntimeError("Az X szerver nem támogatja az XTEST kiterjesztést.")
+        self._shift_keycode = self._display.keysym_to_keycode(XK.string_to_keysym("Shift_L"))
+        self._spare_keycode = self._find_spare_keycode()
+        self._spare_keysym: int | None = None
+
+    def _find_spare_keycode(self) -> int | None:
+        """Return an unmapped keycode usable for characters missing from the layout."""
+
+        min_keycode = self._display.display.info.min_keycode
+        max_keycode = self._display.display.info.max_keycode
+        mapping = self._display.get_keyboard_mapping(min_keycode, max_keycode - min_keycode + 1)
+        for offset, keysyms in enumerate(reversed(mapping)):
+            if not any(keysyms):
+                return max_keycode - offset
+        return None
+
+    def screen_size(self) -> tuple[int, int]:
+        screen = self._display.screen()
+        return int(screen.width_in_pixels), int(screen.height_in_pixels)
+
+    def _fake(self, event_type: int, detail: int = 0, **kwargs: Any) -> None:
+        self._xtest.fake_input(self._display, event_type, detail, **kwargs)
+        self._display.sync()
+
+    def click(self, x: int, y: int, button: str = "left", clicks: int = 1) -> None:
+        button_code = self._BUTTONS.get(button, 1)
+        self._fake(self._X.MotionNotify, x=int(x), y=int(y))
+        self.timing.wait(self.timing.move_settle)
+        for index in range(clicks):
+            if index:
+                self.timing.wait(self.timing.click_delay)
+            self._fake(self._X.ButtonPress, button_code)
+            self.timing.wait(self.timing.click_delay)
+            self._fake(self._X.ButtonRelease, button_code)
+
+    def _keysym_for_char(self, char: str) -> int:
+        special = self._SPECIAL_KEYSYMS.get(char)
+        if special:
+            return self._XK.string_to_keysym(special)
+        codepoint = ord(char)
+        # Latin-1 karakterek keysym értéke megegyezik a kódponttal, a többi Unicode
+        # karakter az X11 konvenció szerint a 0x01000000 tartományba esik.
+        return codepoint if codepoint < 0x100 else 0x01000000 | codepoint
+
+    def _tap_keycode(self, keycode: int, shift: bool = False) -> None:
+        if shift:
+            self._fake(self._X.KeyPress, self._shift_keycode)
+        self._fake(self._X.KeyPress, keycode)
+        self._fake(self._X.KeyRelease, keycode)
+        if shift:
+            self._fake(self._X.KeyRelease, self._shift_keycode)
+
+    def _type_keysym(self, keysym: int) -> None:
+        keycode = self._display.keysym_to_keycode(keysym)
+        if keycode:
+            if self._display.keycode_to_keysym(keycode, 0) == keysym:
+                self._tap_keycode(keycode)
+                return
+            if self._display.keycode_to_keysym(keycode, 1) == keysym:
+                self._tap_keycode(keycode, shift=True)
+                return
+
+        if self._spare_keycode is None:
+            raise RuntimeError(f"A(z) {keysym:#x} keysym nem gépelhető az aktuális kiosztással.")
+
+        # A hiányzó karaktert ideiglenesen egy szabad billentyűkódhoz rendeljük; a
+        # hozzárendelés a gépelés végéig marad, így az ismételt karakterek nem írják át.
+        if self._spare_keysym != keysym:
+            self._remap_spare_keycode(keysym)
+        self._tap_keycode(self._spare_keycode)
+
+    def _remap_spare_keycode(self, keysym: int) -> None:
+        if self._spare_keysym is not None:
+            # Az előző leütés még a régi hozzárendeléssel érkezzen meg.
+            self.timing.wait(self._REMAP_SETTLE_S)
+        self._display.change_keyboard_mapping(self._spare_keycode, [(keysym, keysym)])
+        self._display.sync()
+        self._spare_keysym = keysym or None
+        if keysym:
+            self.timing.wait(self._REMAP_SETTLE_S)
+
+    def type_text(self, text: str) -> None:
+        try:
+            for char in text:
+                self._type_keysym(self._keysym_for_char(char))
+                self.timing.wait(self.timing.key_delay)
+        finally:
+            if self._spare_keysym is not None:
+                self._remap_spare_keycode(0)
+
+    def press_keys(self, keys: list[str]) -> None:
+        keycodes = []
+        for key in keys:
+            keysym_name = self._NAMED_KEYSYMS.get(key)
+            if keysym_name:
+                keysym = self._XK.string_to_keysym(keysym_name)
+            else:
+                # Kombinációban a kisbetűs változatot nyomjuk, a Shift külön módosító.
+                keysym = self._keysym_for_char(key.lower())
+            keycode = self._display.keysym_to_keycode(keysym)
+            if not keycode and key in self._FALLBACK_KEYSYMS:
+                keycode = self._display.keysym_to_keycode(self._XK.string_to_keysym(self._FALLBACK_KEYSYMS[key]))
+            if not keycode:
+                raise RuntimeError(f"A(z) '{key}' billentyű nem érhető el az aktuális kiosztásban.")
+            keycodes.append(keycode)
+
+        for keycode in keycodes:
+            self._fake(self._X.KeyPress, keycode)
+            self.timing.wait(self.timing.key_delay)
+        for keycode in reversed(keycodes):
+            self._fake(self._X.KeyRelease, keycode)
+            self.timing.wait(self.timing.key_delay)
+
+
+@dataclass
+class InputEvent:
+    """A single input operation captured by ``RecordingBackend``."""
+
+    kind: str
+    payload: dict[str, Any]
+    timestamp: float
+
+
+@dataclass
+class RecordingBackend(InputBackend):
+    """Fake backend that records every operation instead of touching the desktop.
+
+    Useful for headless tests and for measuring action throughput; ``latency``
+    simulates the cost of a real injection per recorded event.
+    """
+
+    name = "recording"
+
+    size: tuple[int, int] = (1920, 1080)
+    latency: float = 0.0
+    on_event: Callable[[InputEvent], None] | None = None
+    events: list[InputEvent] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        super().__init__(InputTiming(key_delay=0.0, click_delay=0.0, move_settle=0.0))
+
+    def _record(self, kind: str, **payload: Any) -> None:
+        InputTiming.wait(self.latency)
+        event = InputEvent(kind=kind, payload=payload, timestamp=time.perf_counter())
+        self.events.append(event)
+        if self.on_event is not None:
+            self.on_event(event)
+
+    def screen_size(self) -> tuple[int, int]:
+        return self.size
+
+    def click(self, x: int, y: int, button: str = "left", clicks: int = 1) -> None:
+        self._record("click", x=int(x), y=int(y), button=button, clicks=clicks)
+
+    def type_text(self, text: str) -> None:
+        self._record("type", text=text)
+
+    def press_keys(self, keys: list[str]) -> None:
+        self._record("keys", keys=list(keys))
+
+    def clear(self) -> None:
+        self.events.clear()
+
+    def throughput(self) -> float:
+        """Return the recorded actions per second between the first and last event."""
+
+        if len(self.events) < 2:
+            return 0.0
+        elapsed = self.events[-1].timestamp - self.events[0].timestamp
+        return (len(self.events) - 1) / elapsed if elapsed > 0 else float("inf")
+
+
+def create_input_backend(name: str | None = None) -> InputBackend:
+    """Build the configured backend, falling back to PyAutoGUI when needed."""
+
+    backend_name = (name or INPUT_BACKEND or "auto").lower()
+
+    if backend_name == "recording":
+        return RecordingBackend()
+
+    if backend_name in ("auto", "xtest") and (backend_name == "xtest" or os.getenv("DISPLAY")):
+        try:
+            return XTestBackend()
+        except Exception as exc:  # pragma: no cover - környezetfüggő
+            if backend_name == "xtest":
+                print(f"Az XTEST bemeneti háttér nem érhető el, PyAutoGUI használata: {exc}")
+
+    return PyAutoGUIBackend()
@@ -0,0 +1,230 @@
+"""Language model providers used by ``AIHandler``."""
+
+from __future__ import annotations
+
+import json
+import random
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from src.config import (
+    API_TIMEOUT_S,
+    LLM_BASE_URL,
+    LLM_LATENCY_JITTER_MS,
+    LLM_LATENCY_MS,
+    LLM_LOCAL_MODEL,
+    LLM_PROVIDER,
+    LLM_SCRIPT_PATH,
+    OPENAI_API_KEY,
+)
+
+REQUEST_HISTORY = 8
+
+
+@dataclass
+class LLMResponse:
+    """Provider independent result of a single completion request."""
+
+    content: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    model: str = ""
+    raw: Any = None
+
+
+class LLMProvider(ABC):
+    """Base class of the chat completion backends."""
+
+    name = "base"
+    # Csak a távoli, kvótás API-k kérései mennek át a közös sebességkorláton.
+    rate_limited = False
+
+    @abstractmethod
+    def complete(
+        self,
+        model: str,
+        messages: list[dict],
+        response_format: dict | None = None,
+    ) -> LLMResponse: ...
+
+
+class OpenAIProvider(LLMProvider):
+    """Chat completions through the official OpenAI API."""
+
+    name = "openai"
+    rate_limited = True
+
+    def __init__(self, api_key: str | None = OPENAI_API_KEY, base_url: str | None = None) -> None:
+        if not api_key:
+            raise ValueError(
+                "Az OPENAI_API_KEY nincs beállítva! Hozd létre a .env fájlt a .env.example alapján."
+            )
+        from openai import OpenAI
+
+        # Az újrapróbálást az AIHandler végzi, az SDK saját ismétlései ezt megdupláznák.
+        self.client = OpenAI(api_key=api_key, base_url=base_url, max_retries=0, timeout=API_TIMEOUT_S)
+
+    def _model_for(self, model: str) -> str:
+        return model
+
+    def complete(
+        self,
+        model: str,
+        messages: list[dict],
+        response_format: dict | None = None,
+    ) -> LLMResponse:
+        request: dict[str, Any] = {"model": self._model_for(model), "messages": messages}
+        if response_format is not None:
+            request["response_format"] = response_format
+        response = self.client.chat.completions.create(**request)
+
+        usage = getattr(response, "usage", None)
+        details = getattr(usage, "prompt_tokens_details", None)
+        return LLMResponse(
+            content=response.choices[0].message.content or "",
+            prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+            cached_tokens=getattr(details, "cached_tokens", 0) or 0,
+            model=getattr(response, "model", request["model"]),
+            raw=response,
+        )
+
+
+class OpenAICompatibleProvider(OpenAIProvider):
+    """Any local OpenAI-compatible endpoint (llama.cpp, vLLM, Ollama, LM Studio)."""
+
+    name = "local"
+    rate_limited = False
+
+    def __init__(
+        self,
+        base_url: str = LLM_BASE_URL,
+        api_key: str | None = None,
+        model_override: str = LLM_LOCAL_MODEL,
+    ) -> None:
+        # A helyi szerverek többsége nem ellenőrzi a kulcsot, de a kliens megköveteli.
+        super().__init__(api_key=api_key or OPENAI_API_KEY or "local", base_url=base_url)
+        self.model_override = model_override
+
+    def _model_for(self, model: str) -> str:
+        return self.model_override or model
+
+
+@dataclass
+class ScriptedProvider(LLMProvider):
+    """Deterministic provider that replays a fixed list of responses.
+
+    ``latency`` and ``jitter`` (seconds) inject a reproducible delay per call, so
+    the assistant loop can be benchmarked without a real model. An exception
+    in ``responses`` is raised instead of answering, e.g. a recorded API error.
+    """
+
+    name = "scripted"
+
+    responses: Sequence[str | dict | Exception] = ()
+    latency: float = LLM_LATENCY_MS / 1000
+    jitter: float = LLM_LATENCY_JITTER_MS / 1000
+    seed: int = 0
+    loop: bool = False
+    request_count: int = 0
+    # Csak a legutóbbi kérések maradnak meg (képekkel együtt): hosszú terheléses
+    # futásoknál a memória nem nőhet lépésenként.
+    requests: deque[dict] = field(default_factory=lambda: deque(maxlen=REQUEST_HISTORY))
+
+    def __post_init__(self) -> None:
+        self._random = random.Random(self.seed)
+        self._index = 0
+        self._previous_prompt = ""
+
+    @classmethod
+    def from_file(cls, path: str | Path, **kwargs: Any) -> ScriptedProvider:
+        """Load responses from a JSON list, ``{"responses": [...]}`` or JSON lines."""
+
+        text = Path(path).read_text(encoding="utf-8")
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            data = [json.loads(line) for line in text.splitlines() if line.strip()]
+        if isinstance(data, dict):
+            data = data.get("responses", [])
+        return cls(responses=list(data), **kwargs)
+
+    @staticmethod
+    def _prompt_text(messages: list[dict]) -> str:
+        parts = []
+        for message in messages:
+            content = message.get("content")
+            if isinstance(content, str):
+                parts.append(content)
+            elif isinstance(content, list):
+                parts.extend(
+                    part.get("text", "<kép>") for part in content if isinstance(part, dict)
+                )
+        return "\x00".join(parts)
+
+    def _cached_tokens(self, prompt: str) -> int:
+        """Mimic provider prefix caching: 128-token blocks of a shared prefix of 1024+ tokens."""
+
+        shared = 0
+        for previous, current in zip(self._previous_prompt, prompt):
+            if previous != current:
+                break
+            shared += 1
+        self._previous_prompt = prompt
+        tokens = shared // 4
+        return tokens // 128 * 128 if tokens >= 1024 else 0
+
+    def _next_response(self) -> str | dict | Exception:
+        if self._index >= len(self.responses):
+            if not self.loop or not self.responses:
+                return {"command": "feladat_befejezve", "arguments": {"uzenet": "A szkript véget ért."}}
+            self._index = 0
+        response = self.responses[self._index]
+        self._index += 1
+        return response
+
+    def complete(
+        self,
+        model: str,
+        messages: list[dict],
+        response_format: dict | None = None,
+    ) -> LLMResponse:
+        self.request_count += 1
+        self.requests.append({"model": model, "messages": messages})
+        delay = self.latency + (self._random.uniform(-self.jitter, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+        response = self._next_response()
+        if isinstance(response, Exception):
+            raise response
+        content = response if isinstance(response, str) else json.dumps(response, ensure_ascii=False)
+        prompt = self._prompt_text(messages)
+        return LLMResponse(
+            content=content,
+            prompt_tokens=len(prompt) // 4,
+            cached_tokens=self._cached_tokens(prompt),
+            completion_tokens=len(content) // 4,
+            model=model,
+        )
+
+
+def create_provider(name: str | None = None) -> LLMProvider:
+    """Build the provider selected by ``LLM_PROVIDER``."""
+
+    provider_name = (name or LLM_PROVIDER or "openai").lower()
+    if provider_name == "local":
+        return OpenAICompatibleProvider()
+    if provider_name == "scripted":
+        if LLM_SCRIPT_PATH:
+            return ScriptedProvider.from_file(LLM_SCRIPT_PATH)
+        return ScriptedProvider()
+    if provider_name != "openai":
+        raise ValueError(f"Ismeretlen LLM_PROVIDER: {provider_name}")
+    return OpenAIProvider()
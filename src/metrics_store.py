@@ -0,0 +1,184 @@
+"""Per-call usage accounting, per-task budgets and a local metrics store."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import threading
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from src.config import (
+    METRICS_PATH,
+    TASK_BUDGET_ACTION,
+    TASK_COST_BUDGET_USD,
+    TASK_TOKEN_BUDGET,
+)
+
+DEFAULT_METRICS_PATH = Path(__file__).resolve().parent.parent / "usage_metrics.jsonl"
+
+
+@dataclass
+class CallRecord:
+    """Usage of a single model request."""
+
+    task_id: str
+    model: str
+    route: str
+    detail: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    image_bytes: int = 0
+    latency: float = 0.0
+    retries: int = 0
+    cost_usd: float = 0.0
+    success: bool = True
+    timestamp: str = field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+
+
+@dataclass
+class TaskUsage:
+    """Running totals of one task, used to enforce its budget."""
+
+    task_id: str
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    cost_usd: float = 0.0
+    latency: float = 0.0
+    retries: int = 0
+    image_bytes: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def cache_hit_rate(self) -> float:
+        """Share of prompt tokens served from the provider's prompt cache."""
+
+        return self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+
+    def add(self, record: CallRecord) -> None:
+        self.calls += 1
+        self.prompt_tokens += record.prompt_tokens
+        self.completion_tokens += record.completion_tokens
+        self.cached_tokens += record.cached_tokens
+        self.cost_usd += record.cost_usd
+        self.latency += record.latency
+        self.retries += record.retries
+        if record.image_bytes:
+            self.image_bytes[record.detail] = self.image_bytes.get(record.detail, 0) + record.image_bytes
+
+
+@dataclass
+class TaskBudget:
+    """Per-task token and cost limits; 0 means unlimited."""
+
+    max_tokens: int = TASK_TOKEN_BUDGET
+    max_cost_usd: float = TASK_COST_BUDGET_USD
+    action: str = TASK_BUDGET_ACTION
+
+    def check(self, usage: TaskUsage) -> str:
+        """Return ``"ok"``, ``"downgrade"`` or ``"abort"`` for the current usage."""
+
+        exceeded = (self.max_tokens and usage.total_tokens >= self.max_tokens) or (
+            self.max_cost_usd and usage.cost_usd >= self.max_cost_usd
+        )
+        if not exceeded:
+            return "ok"
+        return "abort" if self.action == "abort" else "downgrade"
+
+
+class MetricsStore:
+    """Append-only JSON lines store of ``CallRecord`` entries with summaries."""
+
+    def __init__(self, path: str | Path | None = None) -> None:
+        self.path = Path(path or METRICS_PATH or DEFAULT_METRICS_PATH)
+        self._lock = threading.Lock()
+
+    def append(self, record: CallRecord) -> None:
+        line = json.dumps(asdict(record), ensure_ascii=False)
+        with self._lock:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with self.path.open("a", encoding="utf-8") as file:
+                    file.write(line + "\n")
+            except OSError as exc:
+                print(f"Nem sikerült menteni a használati adatokat: {exc}")
+
+    def records(self) -> Iterator[CallRecord]:
+        try:
+            with self.path.open("r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        data = json.loads(line)
+                        yield CallRecord(**data)
+                    except (json.JSONDecodeError, TypeError):
+                        continue
+        except OSError:
+            return
+
+    def summary(self, group_by: str = "day") -> dict[str, dict[str, Any]]:
+        """Aggregate the stored records by ``"day"``, ``"task"`` or ``"model"``."""
+
+        groups: dict[str, TaskUsage] = {}
+        for record in self.records():
+            if group_by == "task":
+                key = record.task_id
+            elif group_by == "model":
+                key = record.model
+            else:
+                key = record.timestamp[:10]
+            groups.setdefault(key, TaskUsage(task_id=key)).add(record)
+
+        return {
+            key: {
+                "calls": usage.calls,
+                "prompt_tokens": usage.prompt_tokens,
+                "completion_tokens": usage.completion_tokens,
+                "cached_tokens": usage.cached_tokens,
+                "cache_hit_rate": round(usage.cache_hit_rate, 3),
+                "image_bytes": usage.image_bytes,
+                "avg_latency": round(usage.latency / usage.calls, 3) if usage.calls else 0.0,
+                "retries": usage.retries,
+                "cost_usd": round(usage.cost_usd, 6),
+            }
+            for key, usage in sorted(groups.items())
+        }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Token-, képméret- és költségösszesítő.")
+    parser.add_argument("--by", choices=("day", "task", "model"), default="day")
+    parser.add_argument("--path", default=None, help="A metrikafájl helye")
+    parser.add_argument("--json", action="store_true", help="Gépi feldolgozásra szánt kimenet")
+    args = parser.parse_args(argv)
+
+    summary = MetricsStore(args.path).summary(args.by)
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+        return 0
+
+    print(
+        f"{args.by:<28} {'hívás':>6} {'prompt tok.':>12} {'gyorsítótár':>12} "
+        f"{'válasz tok.':>12} {'kép (KiB)':>10} {'átl. mp':>8} {'USD':>10}"
+    )
+    for key, row in summary.items():
+        image_kib = sum(row["image_bytes"].values()) / 1024
+        print(
+            f"{key[:28]:<28} {row['calls']:>6} {row['prompt_tokens']:>12} {row['cache_hit_rate']:>12.0%} "
+            f"{row['completion_tokens']:>12} {image_kib:>10.1f} {row['avg_latency']:>8.2f} "
+            f"{row['cost_usd']:>10.4f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""Per-step selection of the model and image detail used for AI decisions."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, replace
+
+from src.config import (
+    MODEL_ROUTES,
+    ROUTE_CACHE_CONFIDENCE,
+    ROUTE_ESCALATE_AFTER_FAILURES,
+    ROUTE_LONG_HISTORY,
+)
+
+CACHED_INPUT_DISCOUNT = 0.5
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    """A model/detail combination together with its token prices (USD per 1M tokens)."""
+
+    name: str
+    model: str
+    detail: str
+    input_price: float
+    output_price: float
+
+    def cost(self, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+        # A gyorsítótárból kiszolgált prompt tokenek fele áron számolódnak.
+        input_tokens = prompt_tokens - cached_tokens * CACHED_INPUT_DISCOUNT
+        return (input_tokens * self.input_price + completion_tokens * self.output_price) / 1_000_000
+
+
+DEFAULT_ROUTES: dict[str, ModelRoute] = {
+    "fast": ModelRoute("fast", "gpt-4o-mini", "low", 0.15, 0.60),
+    "detailed": ModelRoute("detailed", "gpt-4o-mini", "high", 0.15, 0.60),
+    "strong": ModelRoute("strong", "gpt-4o", "high", 2.50, 10.00),
+    "calibration": ModelRoute("calibration", "gpt-4o", "high", 2.50, 10.00),
+}
+
+
+@dataclass
+class StepSignals:
+    """Signals already available in the task loop that describe a step's difficulty."""
+
+    failure_count: int = 0
+    high_detail_requested: bool = False
+    history_length: int = 0
+    cache_confidence: float | None = None
+    budget_exceeded: bool = False
+
+
+@dataclass
+class RouteStats:
+    """Accumulated latency, token usage and cost of one route."""
+
+    calls: int = 0
+    total_latency: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    cost: float = 0.0
+
+    @property
+    def average_latency(self) -> float:
+        return self.total_latency / self.calls if self.calls else 0.0
+
+
+def load_routes(overrides: str = MODEL_ROUTES) -> dict[str, ModelRoute]:
+    """Return the default routes updated with the JSON overrides from the config."""
+
+    routes = dict(DEFAULT_ROUTES)
+    if not overrides.strip():
+        return routes
+    try:
+        data = json.loads(overrides)
+    except json.JSONDecodeError as exc:
+        print(f"Hibás MODEL_ROUTES beállítás, az alapértelmezett útvonalak maradnak: {exc}")
+        return routes
+    if not isinstance(data, dict):
+        return routes
+
+    for name, values in data.items():
+        if not isinstance(values, dict):
+            continue
+        base = routes.get(name, DEFAULT_ROUTES["fast"])
+        known = {key: value for key, value in values.items() if key in ModelRoute.__dataclass_fields__}
+        routes[name] = replace(base, **{**known, "name": name})
+    return routes
+
+
+class ModelRouter:
+    """Pick a route for every step and record how each route performs."""
+
+    def __init__(
+        self,
+        routes: dict[str, ModelRoute] | None = None,
+        escalate_after_failures: int = ROUTE_ESCALATE_AFTER_FAILURES,
+        long_history: int = ROUTE_LONG_HISTORY,
+        cache_confidence: float = ROUTE_CACHE_CONFIDENCE,
+    ) -> None:
+        self.routes = routes or load_routes()
+        self.escalate_after_failures = escalate_after_failures
+        self.long_history = long_history
+        self.cache_confidence = cache_confidence
+        self.stats: dict[str, RouteStats] = {}
+
+    def route(self, name: str) -> ModelRoute:
+        return self.routes.get(name) or DEFAULT_ROUTES[name]
+
+    def select(self, signals: StepSignals) -> ModelRoute:
+        """Choose the cheapest route that is still likely to handle the step."""
+
+        # Elfogyott feladatkeret esetén már csak a legolcsóbb útvonal jöhet szóba.
+        if signals.budget_exceeded:
+            return self.route("fast")
+        if (
+            signals.cache_confidence is not None
+            and signals.cache_confidence >= self.cache_confidence
+            and signals.failure_count == 0
+        ):
+            return self.route("fast")
+        if signals.failure_count >= self.escalate_after_failures:
+            return self.route("strong")
+        if signals.high_detail_requested:
+            return self.route("detailed")
+        if signals.history_length >= self.long_history:
+            # A hosszú előzmény önmagában nem jelent nehéz lépést: csak a részletesebb kép
+            # jár érte, az erős modell akkor, ha közben hiba is történt.
+            return self.route("strong" if signals.failure_count else "detailed")
+        return self.route("fast")
+
+    def record(
+        self,
+        route: ModelRoute,
+        latency: float,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        cached_tokens: int = 0,
+    ) -> None:
+        stats = self.stats.setdefault(route.name, RouteStats())
+        stats.calls += 1
+        stats.total_latency += latency
+        stats.prompt_tokens += prompt_tokens
+        stats.completion_tokens += completion_tokens
+        stats.cached_tokens += cached_tokens
+        stats.cost += route.cost(prompt_tokens, completion_tokens, cached_tokens)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        return {
+            name: {
+                "calls": stats.calls,
+                "avg_latency": round(stats.average_latency, 3),
+                "prompt_tokens": stats.prompt_tokens,
+                "completion_tokens": stats.completion_tokens,
+                "cached_tokens": stats.cached_tokens,
+                "cost_usd": round(stats.cost, 6),
+            }
+            for name, stats in self.stats.items()
+        }
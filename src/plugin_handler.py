@@ -26,8 +26,15 @@ class PluginHandler:
     """Load and expose plugin functions located in ``src/plugins``."""
 
     def __init__(self) -> None:
-        self.plugins: Dict[str, PluginInfo] = {}
-        self._load_plugins()
+        self._plugins: Dict[str, PluginInfo] | None = None
+
+    @property
+    def plugins(self) -> Dict[str, PluginInfo]:
+        # A plugin-modulok csak az első használatkor töltődnek be, nem az indításkor.
+        if self._plugins is None:
+            self._plugins = {}
+            self._load_plugins()
+        return self._plugins
 
     def _load_plugins(self) -> None:
         package = PLUGIN_PACKAGE
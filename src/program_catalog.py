@@ -0,0 +1,369 @@
+"""Indexed, disk-cached catalogue of launchable programs with fuzzy lookup."""
+
+from __future__ import annotations
+
+import difflib
+import functools
+import json
+import os
+import re
+import shlex
+import sys
+import threading
+import unicodedata
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+CACHE_VERSION = 1
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+_FIELD_CODE = re.compile(r"^%[a-zA-Z]$")
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_name(name: str) -> str:
+    """Accent- and case-insensitive form of a program name ("Böngésző" -> "bongeszo")."""
+
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _NON_ALNUM.sub(" ", stripped.casefold()).strip()
+
+
+@dataclass
+class ProgramEntry:
+    """A launchable program and the command used to start it."""
+
+    name: str
+    command: list[str]
+    source: str
+
+
+def _default_desktop_dirs() -> list[Path]:
+    data_home = os.getenv("XDG_DATA_HOME") or str(Path.home() / ".local" / "share")
+    data_dirs = os.getenv("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+    dirs = [Path(data_home) / "applications"]
+    dirs.extend(Path(entry) / "applications" for entry in data_dirs.split(os.pathsep) if entry)
+    dirs.append(Path("/var/lib/flatpak/exports/share/applications"))
+    return dirs
+
+
+def _default_start_menu_dirs() -> list[Path]:
+    if sys.platform != "win32":
+        return []
+    roots = [os.getenv("APPDATA"), os.getenv("PROGRAMDATA")]
+    return [
+        Path(root) / "Microsoft" / "Windows" / "Start Menu" / "Programs"
+        for root in roots
+        if root
+    ]
+
+
+class ProgramCatalog:
+    """Build and query an index of PATH executables, ``.desktop`` entries and aliases.
+
+    The index is built in a background thread and cached on disk together with
+    the modification times of every scanned source, so it is only rebuilt when
+    one of them changes.
+    """
+
+    def __init__(
+        self,
+        aliases_path: Path,
+        cache_path: Path,
+        path_dirs: Sequence[Path] | None = None,
+        desktop_dirs: Sequence[Path] | None = None,
+        start_menu_dirs: Sequence[Path] | None = None,
+    ) -> None:
+        self._aliases_path = aliases_path
+        self._cache_path = cache_path
+        self._path_dirs = list(path_dirs) if path_dirs is not None else [
+            Path(entry) for entry in os.getenv("PATH", "").split(os.pathsep) if entry
+        ]
+        self._desktop_dirs = (
+            list(desktop_dirs) if desktop_dirs is not None else _default_desktop_dirs()
+        )
+        self._start_menu_dirs = (
+            list(start_menu_dirs) if start_menu_dirs is not None else _default_start_menu_dirs()
+        )
+        self._entries: dict[str, ProgramEntry] = {}
+        self._sources: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._build_thread: threading.Thread | None = None
+
+    # -- Index építése -----------------------------------------------------
+
+    def _source_paths(self) -> list[Path]:
+        return [
+            self._aliases_path,
+            *self._path_dirs,
+            *self._desktop_dirs,
+            *self._start_menu_dirs,
+        ]
+
+    def _source_mtimes(self) -> dict[str, float]:
+        mtimes: dict[str, float] = {}
+        for path in self._source_paths():
+            try:
+                mtimes[str(path)] = path.stat().st_mtime
+            except OSError:
+                mtimes[str(path)] = 0.0
+        return mtimes
+
+    def start_background_build(self) -> None:
+        """Load the cached index, rebuilding it in a background thread when stale."""
+
+        if self._build_thread is not None:
+            return
+        self._build_thread = threading.Thread(
+            target=self._load_or_build, name="program-catalog", daemon=True
+        )
+        self._build_thread.start()
+
+    def refresh_if_stale(self) -> bool:
+        """Rebuild synchronously if any scanned source changed since the last build."""
+
+        if self._source_mtimes() == self._sources:
+            return False
+        self._build()
+        return True
+
+    def _load_or_build(self) -> None:
+        try:
+            if self._load_cache() is None:
+                self._build()
+        except Exception as exc:  # pragma: no cover - defensive logging
+            print(f"Hiba a programkatalógus építése közben: {exc}")
+        finally:
+            self._ready.set()
+
+    def _load_cache(self) -> dict[str, ProgramEntry] | None:
+        try:
+            with self._cache_path.open("r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return None
+        sources = self._source_mtimes()
+        if data.get("sources") != sources:
+            return None
+
+        try:
+            entries = {
+                key: ProgramEntry(**value)
+                for key, value in data.get("entries", {}).items()
+                if isinstance(value, dict)
+            }
+        except (AttributeError, KeyError, TypeError):
+            # Sérült vagy régi szerkezetű bejegyzések: újraépítjük a katalógust.
+            return None
+        with self._lock:
+            self._entries = entries
+            self._sources = sources
+        return entries
+
+    def _build(self) -> None:
+        sources = self._source_mtimes()
+        entries: dict[str, ProgramEntry] = {}
+
+        # A későbbi források nem írják felül a korábbiakat: az aliasok élveznek elsőbbséget.
+        for entry in [
+            *self._scan_aliases(),
+            *self._scan_desktop_entries(),
+            *self._scan_start_menu(),
+            *self._scan_path(),
+        ]:
+            key = normalize_name(entry.name)
+            if key and key not in entries:
+                entries[key] = entry
+
+        with self._lock:
+            self._entries = entries
+            self._sources = sources
+        self._save_cache(entries, sources)
+
+    def _save_cache(self, entries: dict[str, ProgramEntry], sources: dict[str, float]) -> None:
+        payload = {
+            "version": CACHE_VERSION,
+            "sources": sources,
+            "entries": {key: asdict(entry) for key, entry in entries.items()},
+        }
+        temp_path = self._cache_path.with_suffix(".tmp")
+        try:
+            with temp_path.open("w", encoding="utf-8") as file:
+                json.dump(payload, file, ensure_ascii=False)
+            temp_path.replace(self._cache_path)
+        except OSError as exc:
+            print(f"Nem sikerült menteni a programkatalógust: {exc}")
+
+    def _scan_aliases(self) -> list[ProgramEntry]:
+        try:
+            with self._aliases_path.open("r", encoding="utf-8") as file:
+                aliases = json.load(file)
+        except (OSError, json.JSONDecodeError):
+            return []
+        if not isinstance(aliases, dict):
+            return []
+
+        entries = []
+        for name, target in aliases.items():
+            if isinstance(target, str):
+                command = [target]
+            elif isinstance(target, list):
+                command = [str(part) for part in target]
+            else:
+                continue
+            entries.append(ProgramEntry(name=str(name), command=command, source="programs.json"))
+        return entries
+
+    def _scan_desktop_entries(self) -> list[ProgramEntry]:
+        entries = []
+        for directory in self._desktop_dirs:
+            if not directory.is_dir():
+                continue
+            for desktop_file in sorted(directory.rglob("*.desktop")):
+                entries.extend(self._parse_desktop_file(desktop_file))
+        return entries
+
+    @staticmethod
+    def _parse_desktop_file(path: Path) -> list[ProgramEntry]:
+        fields: dict[str, str] = {}
+        in_main_section = False
+        try:
+            with path.open("r", encoding="utf-8", errors="replace") as file:
+                for raw_line in file:
+                    line = raw_line.strip()
+                    if line.startswith("["):
+                        in_main_section = line == "[Desktop Entry]"
+                        continue
+                    if in_main_section and "=" in line and not line.startswith("#"):
+                        key, value = line.split("=", 1)
+                        fields[key.strip()] = value.strip()
+        except OSError:
+            return []
+
+        if fields.get("Type", "Application") != "Application":
+            return []
+        if fields.get("Hidden", "").lower() == "true":
+            return []
+        exec_line = fields.get("Exec")
+        if not exec_line:
+            return []
+        try:
+            command = [part for part in shlex.split(exec_line) if not _FIELD_CODE.match(part)]
+        except ValueError:
+            return []
+        if not command:
+            return []
+
+        names = [
+            value
+            for key, value in fields.items()
+            if value and (key in ("Name", "GenericName") or key.startswith(("Name[", "GenericName[")))
+        ]
+        names.append(path.stem)
+        return [ProgramEntry(name=name, command=command, source="desktop") for name in names]
+
+    def _scan_start_menu(self) -> list[ProgramEntry]:
+        entries = []
+        for directory in self._start_menu_dirs:
+            if not directory.is_dir():
+                continue
+            for shortcut in sorted(directory.rglob("*.lnk")):
+                entries.append(
+                    ProgramEntry(
+                        name=shortcut.stem,
+                        command=["cmd", "/c", "start", "", str(shortcut)],
+                        source="start_menu",
+                    )
+                )
+        return entries
+
+    def _scan_path(self) -> list[ProgramEntry]:
+        windows = sys.platform == "win32"
+        extensions = {
+            ext.lower() for ext in os.getenv("PATHEXT", ".EXE;.BAT;.CMD").split(";") if ext
+        }
+        entries = []
+        for directory in self._path_dirs:
+            try:
+                candidates = sorted(directory.iterdir())
+            except OSError:
+                continue
+            for candidate in candidates:
+                if windows:
+                    if candidate.suffix.lower() not in extensions:
+                        continue
+                    name = candidate.stem
+                elif not os.access(candidate, os.X_OK) or candidate.is_dir():
+                    continue
+                else:
+                    name = candidate.name
+                entries.append(ProgramEntry(name=name, command=[str(candidate)], source="PATH"))
+        return entries
+
+    # -- Keresés -----------------------------------------------------------
+
+    def wait_until_ready(self, timeout: float | None = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def resolve(self, alias: str, timeout: float = 2.0) -> ProgramEntry | None:
+        """Return the best matching program for ``alias`` or ``None``."""
+
+        if self._build_thread is not None:
+            self.wait_until_ready(timeout)
+
+        key = normalize_name(alias)
+        if not key:
+            return None
+
+        entry = self._match(key)
+        if entry is None and self._ready.is_set() and self.refresh_if_stale():
+            entry = self._match(key)
+        return entry
+
+    def _match(self, key: str) -> ProgramEntry | None:
+        with self._lock:
+            entries = self._entries
+
+        if key in entries:
+            return entries[key]
+
+        # Szavas egyezés: "chrome" -> "google chrome", ha minden találat ugyanazt indítja.
+        # Fordítva ("firefox böngésző" -> "firefox") csak menübejegyzésre engedjük: a PATH
+        # egyszavas parancsai ("file", "top", "editor") különben elvinnék a többszavas neveket.
+        words = key.split()
+        token_matches = [
+            name
+            for name, entry in entries.items()
+            if key in name.split() or (entry.source != "PATH" and name in words)
+        ]
+        if token_matches and len({tuple(entries[name].command) for name in token_matches}) == 1:
+            return entries[token_matches[0]]
+
+        # Rövid neveknél a hasonlóság félrevezető (pl. "xyz" -> "xz"), ott nem tippelünk.
+        if len(key) < 4:
+            return None
+        close = difflib.get_close_matches(key, list(entries), n=1, cutoff=0.85)
+        if close:
+            return entries[close[0]]
+        return None
+
+    def suggestions(self, alias: str, limit: int = 3) -> list[str]:
+        """Return the names of programs resembling ``alias`` for error messages."""
+
+        with self._lock:
+            entries = self._entries
+        keys = difflib.get_close_matches(normalize_name(alias), list(entries), n=limit, cutoff=0.5)
+        return [entries[key].name for key in keys]
+
+
+@functools.lru_cache(maxsize=1)
+def default_catalog() -> ProgramCatalog:
+    """Return the process-wide catalogue, starting its background build once."""
+
+    catalog = ProgramCatalog(ROOT_DIR / "programs.json", ROOT_DIR / "program_index.json")
+    catalog.start_background_build()
+    return catalog
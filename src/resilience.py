@@ -0,0 +1,283 @@
+"""Retries with jittered backoff, a shared rate limiter and a circuit breaker for API calls."""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections.abc import Callable, MutableSequence
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, TypeVar
+
+from src.config import (
+    API_BACKOFF_BASE_S,
+    API_BACKOFF_MAX_S,
+    API_CIRCUIT_FAILURES,
+    API_CIRCUIT_RESET_S,
+    API_MAX_RETRIES,
+    API_RATE_LIMIT_PER_MIN,
+)
+
+T = TypeVar("T")
+
+# Ezeknél a hibáknál érdemes később újra próbálkozni.
+TRANSIENT_KINDS = frozenset({"rate_limit", "timeout", "connection", "server"})
+
+
+class ApiError(Exception):
+    """A classified API failure; ``kind`` tells the caller how to react."""
+
+    def __init__(self, kind: str, message: str, retry_after: float | None = None) -> None:
+        super().__init__(message)
+        self.kind = kind
+        self.retry_after = retry_after
+        self.retries = 0
+
+    @property
+    def transient(self) -> bool:
+        return self.kind in TRANSIENT_KINDS or self.kind == "circuit_open"
+
+
+def _retry_after(exc: BaseException) -> float | None:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    milliseconds = headers.get("retry-after-ms")
+    if milliseconds:
+        try:
+            return float(milliseconds) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+def classify_error(exc: BaseException) -> ApiError:
+    """Map an SDK or network exception to an ``ApiError`` without importing the SDK."""
+
+    if isinstance(exc, ApiError):
+        return exc
+    names = {cls.__name__ for cls in type(exc).__mro__}
+    status = getattr(exc, "status_code", None)
+    message = str(exc) or type(exc).__name__
+
+    if "RateLimitError" in names or status == 429:
+        return ApiError("rate_limit", message, _retry_after(exc))
+    if names & {"APITimeoutError", "TimeoutError", "ReadTimeout", "ConnectTimeout"}:
+        return ApiError("timeout", message)
+    if names & {"APIConnectionError", "ConnectionError", "ConnectError"}:
+        return ApiError("connection", message)
+    if names & {"AuthenticationError", "PermissionDeniedError"} or status in (401, 403):
+        return ApiError("auth", message)
+    if isinstance(status, int) and status >= 500 or "InternalServerError" in names:
+        return ApiError("server", message, _retry_after(exc))
+    if isinstance(status, int) and 400 <= status < 500:
+        return ApiError("bad_request", message)
+    return ApiError("unknown", message)
+
+
+def backoff_delay(attempt: int, base: float, cap: float, rng: random.Random | None = None) -> float:
+    """Full-jitter exponential backoff for the ``attempt``-th retry (1-based)."""
+
+    return (rng or random).uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class TokenBucket:
+    """Thread-safe client-side rate limiter: ``rate`` requests per second, ``capacity`` burst.
+
+    The state (tokens, last refill) normally lives in this process; ``attach``
+    moves it into a ``multiprocessing`` array made by ``new_shared_state``, so
+    that worker processes draw from one common bucket.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._state: MutableSequence[float] = [self.capacity, time.monotonic()]
+        self._lock: Any = threading.Lock()
+
+    def new_shared_state(self, context: Any) -> Any:
+        return context.Array("d", [self.capacity, time.monotonic()])
+
+    def attach(self, state: Any) -> None:
+        # A time.monotonic rendszerszintű óra, így az időbélyeg folyamatok között is összevethető.
+        self._state = state
+        self._lock = state.get_lock()
+
+    def acquire(self, timeout: float | None = None) -> bool:
+        """Take one token, sleeping until one is available; ``False`` on timeout."""
+
+        if self.rate <= 0:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens = min(self.capacity, self._state[0] + (now - self._state[1]) * self.rate)
+                self._state[1] = now
+                if tokens >= 1:
+                    self._state[0] = tokens - 1
+                    return True
+                self._state[0] = tokens
+                wait = (1 - tokens) / self.rate
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def penalize(self, seconds: float) -> None:
+        """Drain the bucket after a rate-limit answer so every task slows down together."""
+
+        with self._lock:
+            self._state[0] = min(self._state[0], -seconds * self.rate)
+            self._state[1] = time.monotonic()
+
+
+class CircuitBreaker:
+    """Stop calling a failing API for ``reset_timeout`` seconds after repeated failures.
+
+    Like ``TokenBucket``, the state can be shared between processes with
+    ``new_shared_state`` and ``attach``.
+    """
+
+    STATES = ("closed", "open", "half_open")
+
+    def __init__(
+        self,
+        failure_threshold: int = API_CIRCUIT_FAILURES,
+        reset_timeout: float = API_CIRCUIT_RESET_S,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        # [állapot indexe a STATES-ben, egymást követő hibák, megnyitás ideje]
+        self._state: MutableSequence[float] = [0, 0, 0.0]
+        self._lock: Any = threading.Lock()
+
+    def new_shared_state(self, context: Any) -> Any:
+        return context.Array("d", list(self._state))
+
+    def attach(self, state: Any) -> None:
+        self._state = state
+        self._lock = state.get_lock()
+
+    @property
+    def state(self) -> str:
+        return self.STATES[int(self._state[0])]
+
+    def _set_state(self, state: str) -> None:
+        self._state[0] = self.STATES.index(state)
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self._state[2] >= self.reset_timeout:
+                # Egyetlen próbakérés mehet át; ennek eredménye dönt a továbbiakról.
+                self._set_state("half_open")
+                return True
+            return self.state == "closed"
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._set_state("closed")
+            self._state[1] = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._state[1] += 1
+            if self.state == "half_open" or (
+                self.failure_threshold and self._state[1] >= self.failure_threshold
+            ):
+                self._set_state("open")
+                self._state[2] = time.monotonic()
+
+    @property
+    def retry_in(self) -> float:
+        if self.state != "open":
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self._state[2]))
+
+
+@dataclass
+class RetryPolicy:
+    """How often and how patiently transient failures are retried."""
+
+    max_retries: int = API_MAX_RETRIES
+    base_delay: float = API_BACKOFF_BASE_S
+    max_delay: float = API_BACKOFF_MAX_S
+
+
+class ResilientCaller:
+    """Run a call through the rate limiter, circuit breaker and retry policy."""
+
+    def __init__(
+        self,
+        policy: RetryPolicy | None = None,
+        limiter: TokenBucket | None = None,
+        breaker: CircuitBreaker | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: random.Random | None = None,
+    ) -> None:
+        self.policy = policy or RetryPolicy()
+        self.limiter = limiter or shared_rate_limiter
+        self.breaker = breaker or shared_circuit_breaker
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+        self.should_abort: Callable[[], bool] = lambda: False
+
+    def call(self, function: Callable[[], T]) -> tuple[T, int]:
+        """Return ``(result, retries)`` or raise the last ``ApiError``."""
+
+        retries = 0
+        while True:
+            if not self.breaker.allow():
+                error = ApiError(
+                    "circuit_open",
+                    f"Az API átmenetileg nem elérhető, újrapróbálás {self.breaker.retry_in:.0f} mp múlva.",
+                    self.breaker.retry_in,
+                )
+                error.retries = retries
+                raise error
+            self.limiter.acquire()
+            try:
+                result = function()
+            except Exception as exc:
+                error = classify_error(exc)
+                if error.kind in TRANSIENT_KINDS:
+                    self.breaker.record_failure()
+                else:
+                    # Az API válaszolt (pl. hibás kérésre): a szolgáltatás elérhető, így a
+                    # félig nyitott megszakító próbakérése is lezárul.
+                    self.breaker.record_success()
+                if error.kind == "rate_limit":
+                    self.limiter.penalize(error.retry_after or self.policy.base_delay)
+                error.retries = retries
+                if error.kind not in TRANSIENT_KINDS or retries >= self.policy.max_retries:
+                    raise error from exc
+                retries += 1
+                delay = backoff_delay(retries, self.policy.base_delay, self.policy.max_delay, self.rng)
+                if error.retry_after is not None:
+                    delay = max(delay, min(error.retry_after, self.policy.max_delay))
+                print(
+                    f"⏳ API hiba ({error.kind}), újrapróbálás {delay:.1f} mp múlva "
+                    f"({retries}/{self.policy.max_retries})..."
+                )
+                if self.should_abort():
+                    error.retries = retries
+                    raise error from exc
+                self.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result, retries
+
+
+# Folyamatszintű példányok: minden feladat és AIHandler ugyanazon a kereten osztozik.
+shared_rate_limiter = TokenBucket(API_RATE_LIMIT_PER_MIN / 60, capacity=max(1.0, API_RATE_LIMIT_PER_MIN / 6))
+shared_circuit_breaker = CircuitBreaker()
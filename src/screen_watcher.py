@@ -0,0 +1,173 @@
+"""Local polling of screen conditions using cheap, downscaled frame diffs."""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from PIL import Image, ImageChops, ImageStat
+
+Region = tuple[int, int, int, int]
+ScreenGrabber = Callable[[Region | None], Image.Image]
+
+# A diff-hez használt képkockák szélessége; ennél nagyobb felbontás csak lassít.
+SIGNATURE_WIDTH = 96
+# A 'varj' parancs 'minta' feltételéhez használható mintaképek helye.
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates"
+TEMPLATE_SUFFIXES = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+def available_templates(directory: Path = TEMPLATE_DIR) -> list[str]:
+    """File names of the template images in ``directory``, sorted."""
+
+    try:
+        return sorted(
+            path.name
+            for path in directory.iterdir()
+            if path.is_file() and path.suffix.lower() in TEMPLATE_SUFFIXES
+        )
+    except OSError:
+        return []
+
+
+@dataclass
+class WaitResult:
+    """Outcome of a wait: whether the condition held and how long it took."""
+
+    satisfied: bool
+    elapsed: float
+    frames: int
+    detail: str = ""
+
+
+class ScreenWatcher:
+    """Poll screen regions at a high frame rate until a condition holds."""
+
+    def __init__(
+        self,
+        grab: ScreenGrabber,
+        poll_interval: float = 1 / 30,
+        change_threshold: float = 2.0,
+        should_abort: Callable[[], bool] | None = None,
+        signature_width: int = SIGNATURE_WIDTH,
+    ) -> None:
+        self._grab = grab
+        self.poll_interval = poll_interval
+        self.change_threshold = change_threshold
+        self.should_abort = should_abort
+        self.signature_width = signature_width
+
+    @staticmethod
+    def signature(frame: Image.Image, max_width: int = SIGNATURE_WIDTH) -> Image.Image:
+        """Return a small greyscale version of ``frame`` used for diffing."""
+
+        grey = frame.convert("L")
+        width, height = grey.size
+        if width > max_width:
+            scaled_height = max(1, round(height * max_width / width))
+            grey = grey.resize((max_width, scaled_height), Image.Resampling.BOX)
+        return grey
+
+    @staticmethod
+    def difference(first: Image.Image, second: Image.Image) -> float:
+        """Mean absolute pixel difference (0-255) between two signatures."""
+
+        if first.size != second.size:
+            return 255.0
+        return float(ImageStat.Stat(ImageChops.difference(first, second)).mean[0])
+
+    @staticmethod
+    def peak_difference(first: Image.Image, second: Image.Image) -> float:
+        """Largest pixel difference (0-255); sensitive to small, local changes."""
+
+        if first.size != second.size:
+            return 255.0
+        return float(ImageChops.difference(first, second).getextrema()[1])
+
+    def _poll(
+        self,
+        region: Region | None,
+        timeout: float,
+        check: Callable[[Image.Image], bool],
+    ) -> WaitResult:
+        start = time.perf_counter()
+        frames = 0
+        while True:
+            frame = self._grab(region)
+            frames += 1
+            if check(frame):
+                return WaitResult(True, time.perf_counter() - start, frames)
+            elapsed = time.perf_counter() - start
+            if elapsed >= timeout:
+                return WaitResult(False, elapsed, frames, "időtúllépés")
+            if self.should_abort is not None and self.should_abort():
+                return WaitResult(False, elapsed, frames, "megszakítva")
+            time.sleep(min(self.poll_interval, max(0.0, timeout - elapsed)))
+
+    def wait_for_change(
+        self,
+        region: Region | None,
+        timeout: float,
+        baseline: Image.Image | None = None,
+        peak: bool = False,
+    ) -> WaitResult:
+        """Wait until the region differs noticeably from ``baseline`` (a signature).
+
+        Without a baseline the first captured frame is used. With ``peak`` the
+        largest pixel difference is compared instead of the mean.
+        """
+
+        if baseline is None:
+            baseline = self.signature(self._grab(region), self.signature_width)
+        difference = self.peak_difference if peak else self.difference
+        return self._poll(
+            region,
+            timeout,
+            lambda frame: difference(baseline, self.signature(frame, self.signature_width))
+            > self.change_threshold,
+        )
+
+    def wait_for_stable(
+        self, region: Region | None, timeout: float, stable_for: float = 0.5
+    ) -> WaitResult:
+        """Wait until consecutive frames stay unchanged for ``stable_for`` seconds."""
+
+        state = {"previous": self.signature(self._grab(region), self.signature_width), "since": time.perf_counter()}
+
+        def is_stable(frame: Image.Image) -> bool:
+            current = self.signature(frame, self.signature_width)
+            now = time.perf_counter()
+            if self.difference(state["previous"], current) > self.change_threshold:
+                state["since"] = now
+            state["previous"] = current
+            return now - state["since"] >= stable_for
+
+        return self._poll(region, timeout, is_stable)
+
+    def wait_for_template(
+        self,
+        template: Image.Image,
+        region: Region | None,
+        timeout: float,
+        confidence: float = 0.9,
+    ) -> WaitResult:
+        """Wait until ``template`` is visible inside the region."""
+
+        import pyscreeze
+
+        def template_visible(frame: Image.Image) -> bool:
+            try:
+                try:
+                    location = pyscreeze.locate(
+                        template, frame, grayscale=True, confidence=confidence
+                    )
+                except NotImplementedError:
+                    # OpenCV nélkül csak pontos egyezést tudunk keresni.
+                    location = pyscreeze.locate(template, frame, grayscale=True)
+            except pyscreeze.ImageNotFoundException:
+                return False
+            return location is not None
+
+        return self._poll(region, timeout, template_visible)
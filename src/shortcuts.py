@@ -0,0 +1,177 @@
+"""Key name normalisation and the table of known application shortcuts."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+# A kanonikus billentyűnevek a PyAutoGUI elnevezéseit követik. Az AltGr (jobb Alt)
+# külön billentyű: magyar kiosztáson pl. altgr+v a "@", nem menü-gyorsbillentyű.
+MODIFIER_KEYS = ("ctrl", "alt", "altright", "shift", "win")
+
+NAMED_KEYS = {
+    "enter",
+    "esc",
+    "tab",
+    "space",
+    "backspace",
+    "delete",
+    "insert",
+    "home",
+    "end",
+    "pageup",
+    "pagedown",
+    "up",
+    "down",
+    "left",
+    "right",
+    "printscreen",
+    *(f"f{index}" for index in range(1, 13)),
+}
+
+KEY_ALIASES = {
+    "control": "ctrl",
+    "ctl": "ctrl",
+    "strg": "ctrl",
+    "option": "alt",
+    "altgr": "altright",
+    "ralt": "altright",
+    "rightalt": "altright",
+    "cmd": "win",
+    "command": "win",
+    "meta": "win",
+    "super": "win",
+    "windows": "win",
+    "return": "enter",
+    "escape": "esc",
+    "del": "delete",
+    "ins": "insert",
+    "pgup": "pageup",
+    "pgdn": "pagedown",
+    "pagedn": "pagedown",
+    "szokoz": "space",
+    "szóköz": "space",
+    "spacebar": "space",
+    "fel": "up",
+    "le": "down",
+    "balra": "left",
+    "jobbra": "right",
+    "arrowup": "up",
+    "arrowdown": "down",
+    "arrowleft": "left",
+    "arrowright": "right",
+    "bksp": "backspace",
+    "prtsc": "printscreen",
+}
+
+APPLICATION_SHORTCUTS: dict[str, dict[str, str]] = {
+    "Általános": {
+        "ctrl+s": "mentés",
+        "ctrl+shift+s": "mentés másként",
+        "ctrl+o": "megnyitás",
+        "ctrl+n": "új dokumentum / ablak",
+        "ctrl+p": "nyomtatás",
+        "ctrl+a": "összes kijelölése",
+        "ctrl+c": "másolás",
+        "ctrl+v": "beillesztés",
+        "ctrl+x": "kivágás",
+        "ctrl+z": "visszavonás",
+        "ctrl+y": "újra",
+        "ctrl+f": "keresés",
+        "alt+f4": "aktív ablak bezárása",
+        "alt+tab": "váltás az ablakok között",
+        "enter": "párbeszédablak alapértelmezett gombja (OK / Mentés)",
+        "esc": "párbeszédablak bezárása / megszakítás",
+    },
+    "Windows": {
+        "win": "Start menü",
+        "win+d": "asztal megjelenítése",
+        "win+e": "Fájlkezelő megnyitása",
+        "win+r": "Futtatás párbeszédablak",
+    },
+    "Böngésző (Chrome, Firefox, Edge)": {
+        "ctrl+l": "címsor kijelölése",
+        "ctrl+t": "új lap",
+        "ctrl+w": "aktuális lap bezárása",
+        "ctrl+shift+t": "bezárt lap visszaállítása",
+        "ctrl+tab": "következő lap",
+        "f5": "oldal frissítése",
+        "alt+left": "vissza",
+        "alt+right": "előre",
+    },
+    "Jegyzettömb / szövegszerkesztők": {
+        "ctrl+home": "ugrás a dokumentum elejére",
+        "ctrl+end": "ugrás a dokumentum végére",
+        "ctrl+h": "csere",
+        "ctrl+b": "félkövér (Word, LibreOffice)",
+    },
+    "Fájlkezelő": {
+        "f2": "kijelölt elem átnevezése",
+        "ctrl+shift+n": "új mappa",
+        "alt+up": "szülőmappa",
+        "delete": "kijelölt elem törlése",
+    },
+}
+
+
+def normalize_key(name: str) -> str:
+    """Return the canonical name of a single key or raise ``ValueError``."""
+
+    key = name.strip().lower().replace(" ", "").replace("_", "")
+    key = KEY_ALIASES.get(key, key)
+    if key in MODIFIER_KEYS or key in NAMED_KEYS or len(key) == 1:
+        return key
+    raise ValueError(f"Ismeretlen billentyű: '{name}'")
+
+
+def parse_key_combo(combo: str | Sequence[str]) -> list[str]:
+    """Parse ``"ctrl+s"`` or ``["ctrl", "s"]`` into a list of canonical key names."""
+
+    if isinstance(combo, str):
+        stripped = combo.strip()
+        # A "+" billentyű önmagában vagy kombináció végén is megadható (pl. "ctrl++").
+        parts = [part for part in stripped.split("+") if part.strip()]
+        if stripped.endswith("+") and (stripped == "+" or stripped.endswith("++")):
+            parts.append("+")
+    else:
+        parts = [str(part) for part in combo]
+
+    keys = [normalize_key(part) if part != "+" else "+" for part in parts]
+    if not keys:
+        raise ValueError("Üres billentyűkombináció.")
+    if all(key in MODIFIER_KEYS for key in keys) and len(keys) > 1:
+        raise ValueError(f"A kombináció csak módosító billentyűkből áll: '{combo}'")
+    return keys
+
+
+def parse_key_sequence(value: object) -> list[list[str]]:
+    """Parse one combo or a list of combos pressed one after another."""
+
+    if isinstance(value, str):
+        combos: list[object] = [value]
+    elif isinstance(value, Sequence) and value:
+        # ["ctrl", "s"] egyetlen kombináció, ["ctrl+l", "enter"] egy sorozat.
+        if all(isinstance(item, str) and "+" not in item for item in value) and any(
+            isinstance(item, str) and normalize_key(item) in MODIFIER_KEYS for item in value
+        ):
+            combos = [list(value)]
+        else:
+            combos = list(value)
+    else:
+        raise ValueError("A billentyűk megadása kötelező.")
+
+    sequence = []
+    for combo in combos:
+        if not isinstance(combo, (str, Sequence)):
+            raise ValueError(f"Érvénytelen billentyűkombináció: {combo!r}")
+        sequence.append(parse_key_combo(combo))
+    return sequence
+
+
+def format_shortcut_table() -> str:
+    """Render the known shortcuts as compact prompt text."""
+
+    lines = []
+    for application, shortcuts in APPLICATION_SHORTCUTS.items():
+        entries = "; ".join(f"{combo} = {meaning}" for combo, meaning in shortcuts.items())
+        lines.append(f"- {application}: {entries}")
+    return "\n".join(lines)
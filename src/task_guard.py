@@ -0,0 +1,180 @@
+"""Iteration, wall-clock, phase-deadline and loop limits for a single task."""
+
+from __future__ import annotations
+
+import json
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from PIL import Image
+
+from src.config import (
+    LOOP_REPEAT_LIMIT,
+    PHASE_DEADLINE_DECISION_S,
+    PHASE_DEADLINE_EXECUTE_S,
+    PHASE_DEADLINE_SCREEN_S,
+    TASK_MAX_ITERATIONS,
+    TASK_TIME_BUDGET_S,
+    WAIT_CHANGE_THRESHOLD,
+)
+from src.screen_watcher import ScreenWatcher
+from src.tracing import tracer
+
+DEFAULT_PHASE_DEADLINES = {
+    "screen": PHASE_DEADLINE_SCREEN_S,
+    "decision": PHASE_DEADLINE_DECISION_S,
+    "execute": PHASE_DEADLINE_EXECUTE_S,
+}
+
+
+@dataclass
+class GuardEvent:
+    """A limit that was hit, kept for telemetry and the task outcome."""
+
+    kind: str
+    detail: str
+    iteration: int
+    elapsed: float
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class TaskGuard:
+    """Track one task's limits; the assistant decides how to degrade when one is hit.
+
+    * ``max_iterations`` and ``time_budget`` end the task,
+    * a phase running past its deadline is reported so the next step can use
+      a cheaper capture or route,
+    * ``loop_repeat_limit`` identical actions on an unchanged screen count as a
+      failed step with feedback to the model; a second loop ends the task.
+      Screens are compared by ``ScreenWatcher`` signature, so a blinking caret
+      or a clock below ``screen_change_threshold`` does not count as a change.
+    """
+
+    max_iterations: int = TASK_MAX_ITERATIONS
+    time_budget: float = TASK_TIME_BUDGET_S
+    phase_deadlines: dict[str, float] = field(default_factory=lambda: dict(DEFAULT_PHASE_DEADLINES))
+    loop_repeat_limit: int = LOOP_REPEAT_LIMIT
+    screen_change_threshold: float = WAIT_CHANGE_THRESHOLD
+    clock: Callable[[], float] = time.monotonic
+    events: list[GuardEvent] = field(default_factory=list)
+    iteration: int = 0
+    loops_detected: int = 0
+    _started: float = 0.0
+    _overruns: set[str] = field(default_factory=set)
+    _last_action: str | None = None
+    _last_screen: Image.Image | None = None
+    _repeats: int = 0
+
+    def start(self) -> None:
+        self._started = self.clock()
+        self.iteration = 0
+        self.loops_detected = 0
+        self.events.clear()
+        self._overruns.clear()
+        self._last_action = None
+        self._last_screen = None
+        self._repeats = 0
+
+    @property
+    def elapsed(self) -> float:
+        return self.clock() - self._started
+
+    def exclude(self, seconds: float) -> None:
+        """Leave ``seconds`` (e.g. time spent paused) out of the wall-clock budget."""
+
+        self._started += max(0.0, seconds)
+
+    def _report(self, kind: str, detail: str) -> GuardEvent:
+        event = GuardEvent(kind, detail, self.iteration, round(self.elapsed, 3))
+        self.events.append(event)
+        tracer.instant("guard", kind=kind, detail=detail, iteration=self.iteration)
+        return event
+
+    # -- Feladatszintű korlátok ---------------------------------------------
+
+    def next_iteration(self) -> GuardEvent | None:
+        """Advance the counter; return an event if the task must stop before this step."""
+
+        if self.time_expired():
+            return self._report("time_budget", f"{self.time_budget:g} mp időkeret elfogyott")
+        if self.max_iterations and self.iteration >= self.max_iterations:
+            return self._report("max_iterations", f"{self.max_iterations} lépés után leállítva")
+        self.iteration += 1
+        return None
+
+    def time_expired(self) -> bool:
+        return bool(self.time_budget) and self.elapsed >= self.time_budget
+
+    # -- Fázishatáridők -------------------------------------------------------
+
+    @contextmanager
+    def phase(self, name: str, allowance: float = 0.0) -> Iterator[None]:
+        """Time a phase and report it when it runs past its deadline.
+
+        ``allowance`` extends the deadline by time the phase was asked to take,
+        e.g. the timeout of a requested wait.
+        """
+
+        started = self.clock()
+        try:
+            yield
+        finally:
+            duration = self.clock() - started
+            deadline = self.phase_deadlines.get(name, 0.0)
+            if deadline:
+                deadline += max(0.0, allowance)
+            if deadline and duration > deadline:
+                self._overruns.add(name)
+                self._report("phase_deadline", f"{name}: {duration:.2f} mp (határidő {deadline:g} mp)")
+
+    def overran(self, name: str) -> bool:
+        """Whether ``name`` missed its deadline since the last ``take_overruns``."""
+
+        return name in self._overruns
+
+    def take_overruns(self) -> set[str]:
+        """Return and forget the phases that missed their deadline since the last call."""
+
+        overruns, self._overruns = self._overruns, set()
+        return overruns
+
+    # -- Ismétlődés-észlelés --------------------------------------------------
+
+    def observe_action(self, screen: Image.Image | None, command: str | None, arguments: Any) -> bool:
+        """Return ``True`` once the same action was chosen on the same screen too often.
+
+        ``screen`` is a ``ScreenWatcher.signature`` of the screenshot the action
+        was chosen on; without one, screens always count as unchanged.
+        """
+
+        try:
+            action = json.dumps([command, arguments], sort_keys=True, ensure_ascii=False)
+        except (TypeError, ValueError):
+            action = repr((command, arguments))
+        unchanged = (
+            screen is None
+            or self._last_screen is None
+            or ScreenWatcher.difference(self._last_screen, screen) <= self.screen_change_threshold
+        )
+
+        if action == self._last_action and unchanged:
+            self._repeats += 1
+        else:
+            self._last_action = action
+            self._repeats = 1
+        self._last_screen = screen
+
+        if self.loop_repeat_limit and self._repeats >= self.loop_repeat_limit:
+            self.loops_detected += 1
+            self._report("loop", f"'{command}' {self._repeats}x ismételve változatlan képernyőn")
+            self._last_action = None
+            self._last_screen = None
+            self._repeats = 0
+            return True
+        return False
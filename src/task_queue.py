@@ -0,0 +1,289 @@
+"""Priority task queue and the long-lived worker service that drains it.
+
+The GUI enqueues from its own thread while the service runs tasks on the
+worker thread, so every queue operation takes the lock. Identical pending
+tasks are merged, queued items can be cancelled, and a running task yields
+at its next iteration boundary when a task with a higher priority arrives;
+the interrupted task goes back to the front of its priority class together
+with its history, and resumes from there when it is picked up again.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from PySide6.QtCore import QMetaObject, QObject, Qt, Signal, Slot
+
+if TYPE_CHECKING:
+    from src.assistant import DesktopAssistant
+
+PRIORITY_LOW = -10
+PRIORITY_NORMAL = 0
+PRIORITY_URGENT = 10
+
+TASK_KIND_TASK = "task"
+TASK_KIND_CALIBRATION = "calibration"
+
+
+@dataclass
+class QueuedTask:
+    """One queued request; ``sequence`` keeps FIFO order within a priority."""
+
+    id: int
+    kind: str
+    text: str
+    priority: int = PRIORITY_NORMAL
+    enqueued_at: float = field(default_factory=time.monotonic)
+    sequence: int = 0
+    started_at: float | None = None
+    preemptions: int = 0
+    # A megszakított feladat előzményei (ContextHandler.snapshot), ebből folytatódik.
+    resume_context: dict[str, Any] | None = None
+
+    @property
+    def key(self) -> tuple[str, str]:
+        return self.kind, " ".join(self.text.lower().split())
+
+    def wait_time(self, now: float | None = None) -> float:
+        end = self.started_at if self.started_at is not None else (now or time.monotonic())
+        return max(0.0, end - self.enqueued_at)
+
+    def label(self) -> str:
+        if self.kind == TASK_KIND_CALIBRATION:
+            return "Kalibráció"
+        return self.text
+
+
+class TaskQueue:
+    """Thread-safe priority queue with deduplication and cancellation."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._heap: list[tuple[int, int, int]] = []
+        self._tasks: dict[int, QueuedTask] = {}
+        self._ids = itertools.count(1)
+        self._sequence = itertools.count()
+
+    def push(
+        self, kind: str, text: str = "", priority: int = PRIORITY_NORMAL
+    ) -> tuple[QueuedTask, bool]:
+        """Queue a task; return ``(task, merged)`` where ``merged`` marks a duplicate."""
+
+        with self._lock:
+            candidate = QueuedTask(id=0, kind=kind, text=text.strip(), priority=priority)
+            for task in self._tasks.values():
+                if task.key == candidate.key:
+                    if priority > task.priority:
+                        # A sürgősebb ismétlés előrébb sorolja a már várakozó példányt.
+                        task.priority = priority
+                        heapq.heappush(self._heap, (-task.priority, task.sequence, task.id))
+                    return task, True
+            candidate.id = next(self._ids)
+            candidate.sequence = next(self._sequence)
+            candidate.enqueued_at = self._clock()
+            self._add(candidate)
+            return candidate, False
+
+    def requeue(self, task: QueuedTask) -> None:
+        """Put a preempted task back, keeping its original place and wait time."""
+
+        with self._lock:
+            task.started_at = None
+            task.preemptions += 1
+            self._add(task)
+
+    def _add(self, task: QueuedTask) -> None:
+        self._tasks[task.id] = task
+        heapq.heappush(self._heap, (-task.priority, task.sequence, task.id))
+
+    def pop(self) -> QueuedTask | None:
+        with self._lock:
+            while self._heap:
+                neg_priority, _, task_id = heapq.heappop(self._heap)
+                task = self._tasks.get(task_id)
+                # Törölt vagy átsorolt elemek elavult bejegyzései.
+                if task is None or -neg_priority != task.priority:
+                    continue
+                del self._tasks[task_id]
+                task.started_at = self._clock()
+                return task
+            return None
+
+    def cancel(self, task_id: int) -> bool:
+        with self._lock:
+            return self._tasks.pop(task_id, None) is not None
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._tasks)
+            self._tasks.clear()
+            self._heap.clear()
+            return count
+
+    def highest_priority(self) -> int | None:
+        with self._lock:
+            if not self._tasks:
+                return None
+            return max(task.priority for task in self._tasks.values())
+
+    def snapshot(self) -> list[QueuedTask]:
+        """Pending tasks in the order they will run."""
+
+        with self._lock:
+            return sorted(self._tasks.values(), key=lambda task: (-task.priority, task.sequence))
+
+    def position(self, task_id: int) -> int | None:
+        """1-based place of a pending task, or ``None`` once it has started or was removed."""
+
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return None
+            rank = (-task.priority, task.sequence)
+            return 1 + sum((-other.priority, other.sequence) < rank for other in self._tasks.values())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._tasks)
+
+
+class TaskQueueService(QObject):
+    """Runs queued tasks one by one on a single, persistent assistant.
+
+    The service lives on the worker thread and builds the assistant there on
+    first use (or in ``warm_up``), so the heavy imports and handler set-up
+    never block the GUI thread. ``on_assistant_created`` runs on the worker
+    thread right after construction, before any task, and is the place to
+    wire the assistant's signals. ``enqueue`` and ``cancel`` may be called
+    from the GUI thread.
+    """
+
+    queue_changed = Signal()
+    task_started = Signal(object)
+    task_done = Signal(object, str)
+    idle = Signal()
+    ready = Signal()
+
+    def __init__(
+        self,
+        assistant_factory: Callable[[], DesktopAssistant] | None = None,
+        task_queue: TaskQueue | None = None,
+        on_assistant_created: Callable[[DesktopAssistant], None] | None = None,
+    ) -> None:
+        super().__init__()
+        self._assistant_factory = assistant_factory
+        self._on_assistant_created = on_assistant_created
+        self._assistant: DesktopAssistant | None = None
+        self.queue = task_queue or TaskQueue()
+        self.current: QueuedTask | None = None
+
+    @property
+    def assistant(self) -> DesktopAssistant:
+        if self._assistant is None:
+            if self._assistant_factory is not None:
+                assistant = self._assistant_factory()
+            else:
+                from src.assistant import DesktopAssistant
+
+                assistant = DesktopAssistant()
+            assistant.preemption_check = self._should_preempt
+            if self._on_assistant_created is not None:
+                self._on_assistant_created(assistant)
+            self._assistant = assistant
+            self.ready.emit()
+        return self._assistant
+
+    @property
+    def assistant_ready(self) -> bool:
+        return self._assistant is not None
+
+    @Slot()
+    def warm_up(self) -> None:
+        """Build the assistant ahead of the first task."""
+
+        try:
+            self.assistant
+        except Exception as exc:  # noqa: BLE001 - az első feladat újra megpróbálja és jelzi
+            print(f"Az asszisztens előkészítése nem sikerült: {exc}")
+
+    @property
+    def busy(self) -> bool:
+        return self.current is not None
+
+    def enqueue(
+        self, kind: str, text: str = "", priority: int = PRIORITY_NORMAL
+    ) -> tuple[QueuedTask, bool]:
+        task, merged = self.queue.push(kind, text, priority)
+        self.queue_changed.emit()
+        QMetaObject.invokeMethod(self, "process_next", Qt.QueuedConnection)
+        return task, merged
+
+    def cancel(self, task_id: int) -> bool:
+        cancelled = self.queue.cancel(task_id)
+        if cancelled:
+            self.queue_changed.emit()
+        return cancelled
+
+    def clear(self) -> int:
+        count = self.queue.clear()
+        if count:
+            self.queue_changed.emit()
+        return count
+
+    def _should_preempt(self) -> bool:
+        current = self.current
+        if current is None or current.kind != TASK_KIND_TASK:
+            return False
+        highest = self.queue.highest_priority()
+        return highest is not None and highest > current.priority
+
+    @Slot()
+    def process_next(self) -> None:
+        """Run the next queued task; reschedules itself until the queue is empty."""
+
+        if self.current is not None:
+            return
+        task = self.queue.pop()
+        if task is None:
+            self.idle.emit()
+            return
+
+        self.current = task
+        self.queue_changed.emit()
+        self.task_started.emit(task)
+        status = "completed"
+        try:
+            assistant = self.assistant
+        except Exception as exc:  # noqa: BLE001 - pl. hiányzó API-kulcs vagy kijelző
+            print(f"Az asszisztens nem indítható el: {exc}")
+            self.current = None
+            self.task_done.emit(task, "setup_error")
+            QMetaObject.invokeMethod(self, "process_next", Qt.QueuedConnection)
+            return
+        try:
+            if task.kind == TASK_KIND_CALIBRATION:
+                assistant.start_calibration_task()
+            else:
+                assistant.start_task(task.text, task.resume_context)
+                status = assistant.last_outcome.get("status", "incomplete")
+        except Exception as exc:  # noqa: BLE001 - a sor többi feladata ettől még lefut
+            print(f"A feladat futtatása hibával leállt: {exc}")
+            status = "error"
+        finally:
+            self.current = None
+        if status == "preempted":
+            task.resume_context = assistant.context_handler.snapshot()
+            self.queue.requeue(task)
+            self.queue_changed.emit()
+        else:
+            task.resume_context = None
+        self.task_done.emit(task, status)
+        # Sorban hagyjuk az eseményhurkot, hogy a közben érkezett jelek (pl. leállítás) feldolgozódjanak.
+        QMetaObject.invokeMethod(self, "process_next", Qt.QueuedConnection)
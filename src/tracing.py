@@ -0,0 +1,121 @@
+"""Lightweight span tracing exported in the Chrome / Perfetto trace format."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from src.config import TRACE_DIR
+
+class _Span:
+    __slots__ = ("_tracer", "_name", "_args", "_start")
+
+    def __init__(self, tracer: Tracer, name: str, args: dict[str, Any]) -> None:
+        self._tracer = tracer
+        self._name = name
+        self._args = args
+        self._start = 0
+
+    def __enter__(self) -> _Span:
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, *_: object) -> None:
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            # A kivétellel megszakadt szakasz a nyomképen is látszik.
+            self._args["error"] = exc_type.__name__
+        self._tracer._add(
+            {
+                "name": self._name,
+                "cat": "ordenador",
+                "ph": "X",
+                "ts": (self._start - self._tracer.origin) / 1000,
+                "dur": (end - self._start) / 1000,
+                "pid": self._tracer.pid,
+                "tid": threading.get_ident(),
+                "args": self._args,
+            }
+        )
+
+    def set(self, **args: Any) -> None:
+        """Attach extra arguments (e.g. byte counts) known only inside the span."""
+
+        self._args.update(args)
+
+
+class _NullSpan:
+    """Span of a disabled tracer: same interface, records nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> _NullSpan:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        return None
+
+    def set(self, **args: Any) -> None:
+        return None
+
+
+# Kikapcsolt állapotban minden span ugyanazt a megosztott, üres példányt kapja.
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """Collect timed spans; does nothing unless ``enabled`` is set."""
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.origin = time.perf_counter_ns()
+        self.pid = os.getpid()
+        self.events: list[dict[str, Any]] = []
+
+    def span(self, name: str, **args: Any) -> _Span | _NullSpan:
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def instant(self, name: str, **args: Any) -> None:
+        if not self.enabled:
+            return
+        self._add(
+            {
+                "name": name,
+                "cat": "ordenador",
+                "ph": "i",
+                "s": "t",
+                "ts": (time.perf_counter_ns() - self.origin) / 1000,
+                "pid": self.pid,
+                "tid": threading.get_ident(),
+                "args": args,
+            }
+        )
+
+    def _add(self, event: dict[str, Any]) -> None:
+        self.events.append(event)
+
+    def export(self, path: str | Path) -> Path:
+        """Write the collected events as Chrome trace JSON and clear the buffer."""
+
+        events, self.events = self.events, []
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with target.open("w", encoding="utf-8") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file, ensure_ascii=False)
+        return target
+
+    def export_to_directory(self, directory: str | Path, prefix: str = "trace") -> Path | None:
+        if not self.events:
+            return None
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        return self.export(Path(directory) / f"{prefix}-{stamp}.json")
+
+
+tracer = Tracer(enabled=bool(TRACE_DIR))
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+from PIL import Image
+
+from src.ai_handler import AIHandler
+from src.assistant import DesktopAssistant
+from src.computer_interface import ComputerInterface
+from src.input_backends import RecordingBackend
+from src.llm_providers import ScriptedProvider
+from src.memory_handler import MemoryHandler
+from src.metrics_store import MetricsStore
+from src.program_catalog import ProgramCatalog
+
+
+def make_assistant(tmp_path: Path, responses: list[dict]) -> DesktopAssistant:
+    computer_interface = ComputerInterface(
+        input_backend=RecordingBackend(size=(640, 480)),
+        screen_grabber=lambda region: Image.new("RGB", (640, 480)),
+        program_catalog=ProgramCatalog(
+            tmp_path / "programs.json",
+            tmp_path / "program_index.json",
+            path_dirs=[],
+            desktop_dirs=[],
+            start_menu_dirs=[],
+        ),
+    )
+    computer_interface.verify_actions = False
+    return DesktopAssistant(
+        ai_handler=AIHandler(
+            provider=ScriptedProvider(responses=responses, latency=0.0, jitter=0.0),
+            metrics_store=MetricsStore(tmp_path / "usage_metrics.jsonl"),
+        ),
+        computer_interface=computer_interface,
+        memory_handler=MemoryHandler(tmp_path / "gui_elements.json"),
+        listen_for_keyboard=False,
+    )
+
+
+def test_pause_while_idle_does_not_block_the_next_task(tmp_path: Path) -> None:
+    assistant = make_assistant(
+        tmp_path, [{"command": "feladat_befejezve", "arguments": {"uzenet": "kész"}}]
+    )
+    assistant.toggle_pause()
+
+    worker = threading.Thread(target=assistant.start_task, args=("Zárd be az ablakot",), daemon=True)
+    worker.start()
+    worker.join(timeout=5)
+
+    assert not worker.is_alive()
+    assert assistant.last_outcome["status"] == "completed"
+
+
+def test_region_transform_warns_once_without_calibration(tmp_path: Path) -> None:
+    assistant = make_assistant(tmp_path, [])
+    messages: list[str] = []
+    assistant.log_message.connect(messages.append)
+
+    region = assistant._transform_region(
+        {"x": 10, "y": 10, "szelesseg": 100, "magassag": 50}, {"width": 320, "height": 240}
+    )
+
+    assert region == {"x": 20, "y": 20, "szelesseg": 200, "magassag": 100}
+    assert len(messages) == 1
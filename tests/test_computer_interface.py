@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from src.computer_interface import ComputerInterface
+from src.config import ACTION_VERIFY_OFFSET_PX
+
+
+def test_plain_click_retries_are_offsets_only() -> None:
+    attempts = ComputerInterface._retry_attempts(100, 100, "OK gomb")
+    assert attempts == [
+        (100 + ACTION_VERIFY_OFFSET_PX, 100 + ACTION_VERIFY_OFFSET_PX, 1),
+        (100 - ACTION_VERIFY_OFFSET_PX, 100 - ACTION_VERIFY_OFFSET_PX, 1),
+    ]
+    assert all(clicks == 1 for _, _, clicks in ComputerInterface._retry_attempts(5, 5, None))
+
+
+def test_icons_are_double_clicked_first() -> None:
+    assert ComputerInterface._retry_attempts(100, 100, "Jegyzettömb ikon")[0] == (100, 100, 2)
+
+
+def test_text_fields_are_not_retried() -> None:
+    assert ComputerInterface._retry_attempts(100, 100, "Fájlnév mező") == []
+    assert ComputerInterface._retry_attempts(100, 100, "search input") == []
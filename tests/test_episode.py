@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import json
+
+from src.episode import EpisodeReplayer
+
+
+def decision(raw: dict | None, **payload) -> dict:
+    return {"type": "decision", "raw": json.dumps(raw) if raw is not None else None, "decision": {}, **payload}
+
+
+def test_recorded_api_error_replays_as_error() -> None:
+    episode = {
+        "task": "Írd be: abc",
+        "memory": {},
+        "blobs": {},
+        "events": [
+            decision(None, error={"kind": "server", "message": "503"}),
+            decision({"command": "gepelj", "arguments": {"szoveg": "abc"}}),
+            {"type": "execute", "command": "gepelj", "arguments": {"szoveg": "abc"}, "result": {"success": True}},
+            decision({"command": "feladat_befejezve", "arguments": {"uzenet": "kész"}}),
+        ],
+    }
+
+    report = EpisodeReplayer(episode).run()
+
+    assert report.divergences == []
+    assert report.iterations == 3
+
+
+def test_recorded_click_results_are_replayed() -> None:
+    episode = {
+        "task": "Kattints az OK gombra",
+        "memory": {},
+        "blobs": {},
+        "screen_size": [1024, 576],
+        "events": [
+            {"type": "screen", "width": 1024, "height": 576},
+            decision({"command": "kattints", "arguments": {"x": 100, "y": 50, "leiras": "OK gomb"}}),
+            {"type": "click", "x": 100, "y": 50, "result": {"success": False, "error": "nem reagált"}},
+            {"type": "screen", "width": 1024, "height": 576},
+            decision({"command": "feladat_befejezve", "arguments": {"uzenet": "kész"}}),
+        ],
+    }
+
+    report = EpisodeReplayer(episode).run()
+
+    assert report.divergences == []
+
+    episode["events"][2]["x"] = 101
+    assert EpisodeReplayer(episode).run().divergences
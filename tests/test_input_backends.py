@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from src.input_backends import InputTiming, RecordingBackend, XTestBackend, create_input_backend
+
+
+def test_recording_backend_records_operations() -> None:
+    backend = create_input_backend("recording")
+    assert isinstance(backend, RecordingBackend)
+
+    backend.click(10, 20)
+    backend.type_text("abc")
+    backend.press_keys(["ctrl", "s"])
+
+    assert [(event.kind, event.payload) for event in backend.events] == [
+        ("click", {"x": 10, "y": 20, "button": "left", "clicks": 1}),
+        ("type", {"text": "abc"}),
+        ("keys", {"keys": ["ctrl", "s"]}),
+    ]
+    assert backend.screen_size() == (1920, 1080)
+
+
+class FakeDisplay:
+    """Keyboard with no keysyms at all, so every character needs the spare keycode."""
+
+    def __init__(self) -> None:
+        self.log: list[tuple] = []
+
+    def keysym_to_keycode(self, keysym: int) -> int:
+        return 0
+
+    def change_keyboard_mapping(self, keycode: int, keysyms: list[tuple[int, int]]) -> None:
+        self.log.append(("map", keycode, keysyms[0][0]))
+
+    def sync(self) -> None:
+        pass
+
+
+def make_xtest_backend() -> tuple[XTestBackend, FakeDisplay]:
+    display = FakeDisplay()
+    backend = object.__new__(XTestBackend)
+    backend.timing = InputTiming(key_delay=0.0, click_delay=0.0, move_settle=0.0)
+    backend._REMAP_SETTLE_S = 0.0
+    backend._X = SimpleNamespace(KeyPress=2, KeyRelease=3)
+    backend._display = display
+    backend._xtest = SimpleNamespace(
+        fake_input=lambda _, event_type, detail, **__: display.log.append(("key", event_type, detail))
+    )
+    backend._shift_keycode = 50
+    backend._spare_keycode = 255
+    backend._spare_keysym = None
+    return backend, display
+
+
+def test_spare_keycode_stays_mapped_until_typing_ends() -> None:
+    backend, display = make_xtest_backend()
+
+    backend.type_text("őőű")
+
+    maps = [entry for entry in display.log if entry[0] == "map"]
+    assert maps == [("map", 255, 0x01000151), ("map", 255, 0x01000171), ("map", 255, 0)]
+    assert display.log[-1] == ("map", 255, 0)
+    assert backend._spare_keysym is None
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from src.model_router import DEFAULT_ROUTES, ModelRouter, StepSignals
+
+
+def make_router() -> ModelRouter:
+    return ModelRouter(routes=dict(DEFAULT_ROUTES), escalate_after_failures=2, long_history=16, cache_confidence=0.9)
+
+
+def test_default_step_is_fast() -> None:
+    assert make_router().select(StepSignals()).name == "fast"
+
+
+def test_repeated_failures_escalate_to_strong() -> None:
+    assert make_router().select(StepSignals(failure_count=2)).name == "strong"
+
+
+def test_long_history_alone_only_raises_detail() -> None:
+    router = make_router()
+    assert router.select(StepSignals(history_length=30)).name == "detailed"
+    assert router.select(StepSignals(history_length=30, failure_count=1)).name == "strong"
+
+
+def test_budget_and_confident_cache_stay_fast() -> None:
+    router = make_router()
+    assert router.select(StepSignals(failure_count=5, budget_exceeded=True)).name == "fast"
+    assert router.select(StepSignals(history_length=30, cache_confidence=0.95)).name == "fast"
+
+
+def test_route_cost_counts_cached_tokens() -> None:
+    router = make_router()
+    route = router.route("fast")
+    router.record(route, 0.5, prompt_tokens=2048, completion_tokens=100, cached_tokens=1024)
+    assert router.stats["fast"].cost == route.cost(2048, 100, 1024)
+    assert router.summary()["fast"]["cached_tokens"] == 1024
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from PySide6.QtCore import QCoreApplication
+from PySide6.QtWidgets import QApplication, QWidget
+
+from src.gui.overlay_proxy import OverlayProxy
+
+
+def test_busy_gui_thread_returns_not_presented() -> None:
+    QApplication.instance() or QApplication([])
+    proxy = OverlayProxy()
+    created: list[QWidget] = []
+    results: list[tuple] = []
+
+    def factory() -> QWidget:
+        widget = QWidget()
+        created.append(widget)
+        return widget
+
+    worker = threading.Thread(target=lambda: results.append(proxy.show_and_wait(factory, timeout=0.1)))
+    worker.start()
+    # A grafikus szál foglalt, amíg a munkaszál időkorlátja le nem jár.
+    time.sleep(0.3)
+    worker.join(timeout=1)
+    QCoreApplication.processEvents()
+
+    assert results == [(None, False)]
+    assert created == []
+    assert proxy._paint_waiters == {}
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from src.program_catalog import CACHE_VERSION, ProgramCatalog
+
+
+def make_catalog(tmp_path: Path) -> ProgramCatalog:
+    aliases = tmp_path / "programs.json"
+    if not aliases.exists():
+        aliases.write_text(json.dumps({"jegyzet": "notepad.exe"}), encoding="utf-8")
+    return ProgramCatalog(aliases, tmp_path / "program_index.json", path_dirs=[], desktop_dirs=[], start_menu_dirs=[])
+
+
+def test_builds_and_reuses_cache(tmp_path: Path) -> None:
+    catalog = make_catalog(tmp_path)
+    catalog.start_background_build()
+    assert catalog.resolve("Jegyzet").command == ["notepad.exe"]
+
+    cached = make_catalog(tmp_path)
+    assert cached._load_cache() is not None
+
+
+def test_corrupt_cache_entries_trigger_rebuild(tmp_path: Path) -> None:
+    catalog = make_catalog(tmp_path)
+    (tmp_path / "program_index.json").write_text(
+        json.dumps(
+            {
+                "version": CACHE_VERSION,
+                "sources": catalog._source_mtimes(),
+                "entries": {"jegyzet": {"name": "jegyzet", "unexpected": 1}},
+            }
+        ),
+        encoding="utf-8",
+    )
+    assert catalog._load_cache() is None
+
+    catalog.start_background_build()
+    entry = catalog.resolve("jegyzet")
+    assert entry is not None and entry.command == ["notepad.exe"]
+
+
+def test_path_binaries_do_not_capture_multi_word_aliases(tmp_path: Path) -> None:
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    for name in ("file", "top", "editor", "chrome"):
+        binary = bin_dir / name
+        binary.write_text("#!/bin/sh\n", encoding="utf-8")
+        binary.chmod(0o755)
+    (tmp_path / "programs.json").write_text("{}", encoding="utf-8")
+    catalog = ProgramCatalog(
+        tmp_path / "programs.json",
+        tmp_path / "program_index.json",
+        path_dirs=[bin_dir],
+        desktop_dirs=[],
+        start_menu_dirs=[],
+    )
+    catalog.start_background_build()
+
+    for alias in ("file explorer", "file manager", "text editor", "top secret app"):
+        assert catalog.resolve(alias) is None, alias
+    assert catalog.resolve("chrome").command == [str(bin_dir / "chrome")]
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import multiprocessing
+
+import pytest
+
+from src.resilience import ApiError, CircuitBreaker, ResilientCaller, RetryPolicy, TokenBucket
+
+
+class FakeApiError(Exception):
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def make_caller(breaker: CircuitBreaker, max_retries: int = 0) -> ResilientCaller:
+    return ResilientCaller(
+        policy=RetryPolicy(max_retries=max_retries, base_delay=0, max_delay=0),
+        limiter=TokenBucket(0),
+        breaker=breaker,
+        sleep=lambda _: None,
+    )
+
+
+def fail(status_code: int):
+    def function():
+        raise FakeApiError(status_code)
+
+    return function
+
+
+def test_breaker_opens_after_threshold() -> None:
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.retry_in > 0
+
+
+def test_half_open_probe_success_closes() -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_half_open_probe_failure_reopens() -> None:
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=0)
+    for _ in range(5):
+        breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_transient_probe_failure_reopens_through_caller() -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    caller = make_caller(breaker)
+    with pytest.raises(ApiError) as first:
+        caller.call(fail(503))
+    assert first.value.kind == "server"
+    assert breaker.state == "open"
+    with pytest.raises(ApiError):
+        caller.call(fail(503))
+    assert breaker.state == "open"
+
+
+@pytest.mark.parametrize("status_code, kind", [(400, "bad_request"), (401, "auth")])
+def test_non_transient_probe_settles_half_open(status_code: int, kind: str) -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    caller = make_caller(breaker)
+    with pytest.raises(ApiError):
+        caller.call(fail(503))
+    assert breaker.state == "open"
+
+    with pytest.raises(ApiError) as probe:
+        caller.call(fail(status_code))
+    assert probe.value.kind == kind
+    assert breaker.state == "closed"
+    assert caller.call(lambda: "ok") == ("ok", 0)
+
+
+def test_unknown_error_does_not_wedge_breaker() -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    caller = make_caller(breaker)
+    with pytest.raises(ApiError):
+        caller.call(fail(500))
+
+    def broken():
+        raise ValueError("parse error")
+
+    with pytest.raises(ApiError) as probe:
+        caller.call(broken)
+    assert probe.value.kind == "unknown"
+    assert breaker.allow()
+
+
+def test_retries_transient_errors_then_succeeds() -> None:
+    breaker = CircuitBreaker(failure_threshold=10, reset_timeout=60)
+    caller = make_caller(breaker, max_retries=2)
+    answers = iter([FakeApiError(500), FakeApiError(429), "ok"])
+
+    def flaky():
+        answer = next(answers)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    assert caller.call(flaky) == ("ok", 2)
+    assert breaker.state == "closed"
+
+
+def test_attached_buckets_share_one_budget() -> None:
+    context = multiprocessing.get_context("spawn")
+    first, second = TokenBucket(0.001, capacity=2), TokenBucket(0.001, capacity=2)
+    state = first.new_shared_state(context)
+    first.attach(state)
+    second.attach(state)
+    assert first.acquire(timeout=0)
+    assert second.acquire(timeout=0)
+    assert not first.acquire(timeout=0)
+    assert not second.acquire(timeout=0)
+
+
+def test_attached_breakers_share_state() -> None:
+    context = multiprocessing.get_context("spawn")
+    first, second = CircuitBreaker(failure_threshold=2), CircuitBreaker(failure_threshold=2)
+    state = first.new_shared_state(context)
+    first.attach(state)
+    second.attach(state)
+    first.record_failure()
+    second.record_failure()
+    assert first.state == second.state == "open"
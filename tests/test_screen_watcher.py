@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from src.ai_handler import _template_note
+from src.screen_watcher import available_templates
+
+
+def test_available_templates_lists_images_only(tmp_path: Path) -> None:
+    (tmp_path / "mentes_kesz.png").write_bytes(b"")
+    (tmp_path / "Betoltes.JPG").write_bytes(b"")
+    (tmp_path / "README.md").write_text("", encoding="utf-8")
+    assert available_templates(tmp_path) == ["Betoltes.JPG", "mentes_kesz.png"]
+    assert available_templates(tmp_path / "hianyzik") == []
+
+
+def test_template_note_names_the_templates() -> None:
+    assert "mentes_kesz.png" in _template_note(["mentes_kesz.png"])
+    assert "ne használd" in _template_note([])
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import pytest
+
+from src.shortcuts import parse_key_combo, parse_key_sequence
+
+
+def test_aliases_are_normalised() -> None:
+    assert parse_key_combo("Control+Shift+S") == ["ctrl", "shift", "s"]
+    assert parse_key_combo("escape") == ["esc"]
+
+
+def test_altgr_is_distinct_from_alt() -> None:
+    assert parse_key_combo("altgr+v") == ["altright", "v"]
+    assert parse_key_combo("alt+f4") == ["alt", "f4"]
+
+
+def test_plus_key_and_sequences() -> None:
+    assert parse_key_combo("ctrl++") == ["ctrl", "+"]
+    assert parse_key_sequence(["ctrl", "s"]) == [["ctrl", "s"]]
+    assert parse_key_sequence(["ctrl+l", "enter"]) == [["ctrl", "l"], ["enter"]]
+
+
+def test_invalid_combos_are_rejected() -> None:
+    with pytest.raises(ValueError):
+        parse_key_combo("ctrl+alt")
+    with pytest.raises(ValueError):
+        parse_key_combo("hyperkey")
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from PIL import Image, ImageDraw
+
+from src.screen_watcher import ScreenWatcher
+from src.task_guard import TaskGuard
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def run_phase(guard: TaskGuard, clock: FakeClock, seconds: float, allowance: float = 0.0) -> None:
+    with guard.phase("execute", allowance):
+        clock.now += seconds
+
+
+def test_execute_overrun_is_reported() -> None:
+    clock = FakeClock()
+    guard = TaskGuard(phase_deadlines={"execute": 20.0}, clock=clock)
+    guard.start()
+
+    run_phase(guard, clock, 25.0)
+
+    assert guard.take_overruns() == {"execute"}
+
+
+def test_requested_wait_extends_the_execute_deadline() -> None:
+    clock = FakeClock()
+    guard = TaskGuard(phase_deadlines={"execute": 20.0}, clock=clock)
+    guard.start()
+
+    run_phase(guard, clock, 45.0, allowance=40.0)
+
+    assert guard.take_overruns() == set()
+
+
+def screen(caret: bool = False, dialog: bool = False) -> Image.Image:
+    image = Image.new("RGB", (1024, 576), "white")
+    draw = ImageDraw.Draw(image)
+    if caret:
+        draw.line((200, 100, 200, 114), fill="black")
+    if dialog:
+        draw.rectangle((300, 150, 700, 400), fill="grey")
+    return ScreenWatcher.signature(image)
+
+
+def test_loop_is_detected_despite_a_blinking_caret() -> None:
+    guard = TaskGuard(loop_repeat_limit=3)
+    guard.start()
+    action = ("kattints", {"x": 10, "y": 20})
+
+    assert not guard.observe_action(screen(caret=True), *action)
+    assert not guard.observe_action(screen(caret=False), *action)
+    assert guard.observe_action(screen(caret=True), *action)
+
+
+def test_changing_screen_is_not_a_loop() -> None:
+    guard = TaskGuard(loop_repeat_limit=3)
+    guard.start()
+    action = ("kattints", {"x": 10, "y": 20})
+
+    assert not guard.observe_action(screen(), *action)
+    assert not guard.observe_action(screen(dialog=True), *action)
+    assert not guard.observe_action(screen(), *action)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from PySide6.QtCore import QCoreApplication
+from PySide6.QtWidgets import QApplication
+
+from src.context_handler import ContextHandler
+from src.task_queue import PRIORITY_URGENT, TASK_KIND_TASK, TaskQueue, TaskQueueService
+
+
+def push(queue: TaskQueue, text: str, priority: int = 0):
+    task, _ = queue.push(TASK_KIND_TASK, text, priority)
+    return task
+
+
+def test_urgent_tasks_run_first_fifo_within_priority() -> None:
+    queue = TaskQueue()
+    push(queue, "a")
+    push(queue, "b")
+    push(queue, "c", PRIORITY_URGENT)
+    assert [queue.pop().text for _ in range(3)] == ["c", "a", "b"]
+    assert queue.pop() is None
+
+
+def test_duplicate_is_merged_and_bumped() -> None:
+    queue = TaskQueue()
+    first = push(queue, "nyisd meg a jegyzettömböt")
+    push(queue, "b")
+    task, merged = queue.push(TASK_KIND_TASK, "  Nyisd meg a  jegyzettömböt ", PRIORITY_URGENT)
+    assert merged and task is first
+    assert queue.pop() is first
+    assert len(queue) == 1
+
+
+def test_cancel_and_position() -> None:
+    queue = TaskQueue()
+    a, b, c = push(queue, "a"), push(queue, "b"), push(queue, "c", PRIORITY_URGENT)
+    assert [queue.position(task.id) for task in (a, b, c)] == [2, 3, 1]
+    assert queue.cancel(a.id)
+    assert queue.position(a.id) is None
+    assert queue.pop() is c
+    assert queue.position(c.id) is None
+    assert queue.position(b.id) == 1
+
+
+def test_requeued_task_keeps_its_place() -> None:
+    queue = TaskQueue()
+    a = push(queue, "a")
+    push(queue, "b")
+    assert queue.pop() is a
+    queue.requeue(a)
+    assert a.preemptions == 1
+    assert queue.pop() is a
+
+
+class FakeAssistant:
+    def __init__(self) -> None:
+        self.context_handler = ContextHandler()
+        self.last_outcome: dict = {}
+        self.runs: list[tuple[str, dict | None]] = []
+        self.preemption_check = None
+
+    def start_task(self, text: str, resume_context: dict | None = None) -> None:
+        self.runs.append((text, resume_context))
+        if text == "hiba":
+            raise TimeoutError("A grafikus szál nem válaszolt időben.")
+        if resume_context is None:
+            self.context_handler.start_new_task(text)
+        self.context_handler.add_assistant_action({"command": "gepelj", "arguments": {"szoveg": text}})
+        status = "preempted" if text == "hosszú" and resume_context is None else "completed"
+        self.last_outcome = {"status": status}
+
+
+def run_service(texts: list[str]) -> tuple[FakeAssistant, list[tuple[str, str]]]:
+    QApplication.instance() or QApplication([])
+    assistant = FakeAssistant()
+    service = TaskQueueService(assistant_factory=lambda: assistant)
+    done: list[tuple[str, str]] = []
+    service.task_done.connect(lambda task, status: done.append((task.text, status)))
+    for text in texts:
+        service.queue.push(TASK_KIND_TASK, text)
+    for _ in range(10):
+        service.process_next()
+        QCoreApplication.processEvents()
+    return assistant, done
+
+
+def test_failing_task_does_not_stall_the_queue() -> None:
+    _, done = run_service(["hiba", "a"])
+    assert done == [("hiba", "error"), ("a", "completed")]
+
+
+def test_preempted_task_resumes_with_its_history() -> None:
+    assistant, done = run_service(["hosszú"])
+    assert done == [("hosszú", "preempted"), ("hosszú", "completed")]
+    resumed = assistant.runs[1][1]
+    assert resumed is not None and resumed["step_count"] == 1
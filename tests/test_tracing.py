@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import pytest
+
+from src.tracing import Tracer
+
+
+def test_disabled_tracer_span_accepts_set() -> None:
+    tracer = Tracer(enabled=False)
+    with tracer.span("encode") as span:
+        span.set(bytes=10)
+    assert tracer.events == []
+
+
+def test_span_records_args_and_errors() -> None:
+    tracer = Tracer(enabled=True)
+    with tracer.span("encode", detail="low") as span:
+        span.set(bytes=10)
+    with pytest.raises(ValueError), tracer.span("task"):
+        raise ValueError("hiba")
+    assert [event["args"] for event in tracer.events] == [
+        {"detail": "low", "bytes": 10},
+        {"error": "ValueError"},
+    ]
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QApplication
+
+from src.gui.widgets import ClickIndicator
+
+
+def test_click_indicator_lets_clicks_through() -> None:
+    QApplication.instance() or QApplication([])
+    indicator = ClickIndicator()
+    assert indicator.windowFlags() & Qt.WindowTransparentForInput
+    assert indicator.testAttribute(Qt.WA_TransparentForMouseEvents)